@@ -93,7 +93,10 @@ class ImageAnimation:
             self.load_textures()
 
         if self._sound_effect is not ...:
-            self._sound_effect().play()
+            self._sound_effect.from_pool().play(
+                position=position if position is not ...
+                else position_reference.position
+            )
 
         play_animation(
             self._sizes if size is ... else len(self._sizes) * [size],
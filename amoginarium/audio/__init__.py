@@ -2,4 +2,5 @@ from ._background import BackgroundPlayer
 from ._effect import Minigun, Shotgun, ContinuousSoundEffect, PresetEffect
 from ._effect import sound_effects, SoundEffect, ThreeStageSoundEffect
 from ._effect import LargeExplosion, SmallExplosion, sound_effect_wrapper
-from ._sounds import sounds
+from ._sounds import sounds, init_mixer
+from ._voices import voices
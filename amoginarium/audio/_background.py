@@ -2,40 +2,165 @@
 _background.py
 22. March 2024
 
-background music
+background music, streamed from disk
 
 Author:
 Nilusink
 """
-from random import randint
+from ..debugging import print_ic_style, get_fg_color
+from random import choice
 import pygame as pg
+import zipfile
+import io
+import os
 
 from ._sounds import sounds
+from ._voices import voices
+
+
+# zip file or directory, file
+type track_t = tuple[str, str]
 
 
 class BackgroundPlayer:
+    """
+    plays the tracks one after another using `pg.mixer.music`, so only
+    the track that is currently playing is decoded (chunk by chunk),
+    the next track is started by the music end event (see `voices`)
+
+    tracks added with `queue` are played first, afterwards random tracks
+    from the playlist are played
+    """
+    fade_ms: int = 5000
+    debug: int = 1
+
     def __init__(self) -> None:
-        self._sound_files: list[pg.mixer.Sound] = []
-        self._playing: pg.Channel = ...
-        self.volume = 1
+        self._tracks: list[track_t] = []
+        self._queue: list[track_t] = []
+        self._current: track_t | None = None
+        self._stopped = False
+        self._volume = 1
+
+    @property
+    def volume(self) -> float:
+        return self._volume
+
+    @volume.setter
+    def volume(self, value: float) -> None:
+        self._volume = value
 
-    def assign_scope(self, scope: str) -> None:
+        if pg.mixer.get_init() is not None:
+            pg.mixer.music.set_volume(value)
+
+    @property
+    def current(self) -> str | None:
         """
-        select a scope to play background songs from
+        name of the track that is currently playing
         """
-        for sound in sounds.get_all_from_scope(scope):
-            self._sound_files.append(sound)
+        if self._current is None:
+            return None
 
-    def start(self) -> None:
-        sound = self._sound_files[
-            randint(0, len(self._sound_files) - 1)
+        return self._current[1].split(".")[-2]
+
+    @staticmethod
+    def _list_tracks(path: str) -> list[track_t]:
+        """
+        all tracks in a zip file or a directory
+        """
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{path} doesn't exist!")
+
+        path = path.rstrip("/")
+
+        if os.path.isfile(path):
+            with zipfile.ZipFile(path) as trackzip:
+                files = [f.filename for f in trackzip.infolist()]
+
+        else:
+            files = os.listdir(path)
+
+        return [
+            (path, f) for f in sorted(files)
+            if f.split(".")[-1].lower() in sounds.filetypes
         ]
-        sound.set_volume(self.volume)
-        self._playing = sound.play(fade_ms=5000)
+
+    def add_tracks(self, path: str) -> None:
+        """
+        add all tracks from a zip file or a directory to the playlist
+        (only lists them, nothing is decoded)
+        """
+        self._tracks.extend(self._list_tracks(path))
+
+    def queue(self, path: str) -> None:
+        """
+        play a track (file) next
+        """
+        self._queue.append(os.path.split(path))
+
+    def _next_track(self) -> track_t:
+        if self._queue:
+            return self._queue.pop(0)
+
+        # don't play the same track twice in a row (if possible)
+        options = [t for t in self._tracks if t != self._current]
+
+        return choice(options or self._tracks)
+
+    @staticmethod
+    def _load(track: track_t) -> None:
+        path, file = track
+
+        if os.path.isfile(path):
+            # compressed data only, decoding is still streamed
+            with zipfile.ZipFile(path) as trackzip:
+                data = io.BytesIO(trackzip.read(file))
+
+            pg.mixer.music.load(data, file)
+            return
+
+        pg.mixer.music.load(path + "/" + file)
+
+    def start(self) -> None:
+        """
+        start the next track (fading in)
+        """
+        self._current = self._next_track()
+        self._stopped = False
+
+        if self.debug:
+            print_ic_style(
+                f"playing {get_fg_color(36)}\"{self.current}\""
+            )
+
+        voices.on_music_end(self._on_end)
+        self._load(self._current)
+        pg.mixer.music.set_volume(self._volume)
+        pg.mixer.music.play(fade_ms=self.fade_ms)
+
+    def skip(self) -> None:
+        """
+        fade out the current track, the next one fades in afterwards
+        """
+        if pg.mixer.music.get_busy():
+            pg.mixer.music.fadeout(self.fade_ms)
+
+    def stop(self) -> None:
+        """
+        fade out and stop playing (until `start` is called)
+        """
+        self.skip()
+        self._stopped = True
+
+    def _on_end(self) -> None:
+        if not self._stopped:
+            self.start()
 
     def update(self) -> None:
         """
-        checks if the sound is done and plays another one
+        starts playing once tracks have been assigned
         """
-        if self._playing is ... or not self._playing.get_busy():
+        if self._current is not None or self._stopped:
+            return
+
+        if self._tracks or self._queue:
             self.start()
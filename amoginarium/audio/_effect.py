@@ -9,47 +9,69 @@ Nilusink
 """
 # from icecream import ic
 from ._sounds import sounds
+from ._voices import voices
+from ..logic import Vec2
+from time import perf_counter
 import typing as tp
 import pygame as pg
 
 
+type pool_key_t = tuple[tp.Any, ...]  # class, *args
+
+
 class _SoundEffects:
     """
-    a collection of all sound effects
+    a collection of all currently playing sound effects
+    and pools of idle ones
     """
     def __init__(self) -> None:
-        self._effects = []
+        # used as an ordered set
+        self._effects: dict["SoundEffect", None] = {}
+        self._pools: dict[pool_key_t, list["SoundEffect"]] = {}
+
+    def __len__(self) -> int:
+        return len(self._effects)
 
     def add(self, effect: "SoundEffect") -> None:
         """
         add a sound effect to the queue
         """
-        self._effects.append(effect)
+        self._effects[effect] = None
 
     def remove(self, effect: "SoundEffect") -> None:
         """
         remove a sound effect from the queue
         """
-        self._effects.remove(effect)
+        self._effects.pop(effect, None)
+
+    def acquire(self, key: pool_key_t) -> "SoundEffect | None":
+        """
+        get an idle effect from a pool
+        """
+        pool = self._pools.get(key)
+
+        if pool:
+            return pool.pop()
 
-    def update(self) -> None:
+        return None
+
+    def release(self, key: pool_key_t, effect: "SoundEffect") -> None:
         """
-        update all sound effects
+        return an effect to its pool
         """
-        for effect in self._effects:
-            effect.update()
+        self._pools.setdefault(key, []).append(effect)
 
 
 sound_effects = _SoundEffects()
 
 
 class SoundEffect:
+    """
+    only registered in `sound_effects` while playing, `on_finish_playing`
+    is called from the channels end event (see `voices`)
+    """
     volume: float = 1
-
-    def __new__(cls, *args, **kwargs):
-        instance = super(SoundEffect, cls).__new__(cls)
-        sound_effects.add(instance)
-        return instance
+    category: str = "effect"  # see `voices.categories`
 
     def __init__(
             self,
@@ -60,7 +82,32 @@ class SoundEffect:
         self._sound: pg.mixer.Sound = ...
         self._playing: pg.mixer.Channel = ...
         self._on_finish = on_finish_playing
-        self._last_playing = False
+        self._pool_key: pool_key_t | None = None
+
+    @classmethod
+    def from_pool(
+            cls,
+            *args,
+            volume: float = ...,
+            category: str = ...
+    ) -> tp.Self:
+        """
+        get an idle effect (or create a new one), it is returned to the
+        pool once it finished playing, so don't keep a reference to it
+
+        :param args: passed to `__init__`
+        """
+        key = (cls, *args)
+        effect = sound_effects.acquire(key)
+
+        if effect is None:
+            effect = cls(*args)
+            effect._pool_key = key
+
+        effect.volume = cls.volume if volume is ... else volume
+        effect.category = cls.category if category is ... else category
+
+        return effect
 
     @property
     def playing(self) -> bool:
@@ -74,9 +121,13 @@ class SoundEffect:
             loops: int = 0,
             maxtime: int = 0,
             fade_ms: int = 0,
+            position: Vec2 = ...
     ) -> None:
         """
         play the sound effect
+
+        :param position: where the sound comes from (sounds far away
+            from the view are quieter or skipped)
         """
         if self._sound is ...:
             self._sound = sounds.get_sound(self._sound_name)
@@ -84,34 +135,65 @@ class SoundEffect:
             if self._sound is None:
                 raise RuntimeError(f"Sound {self._sound_name} not found!")
 
-        elif self.playing:
-            self.stop()
-
-        self._sound.set_volume(self.volume)
-        tmp = self._sound.play(loops, maxtime, fade_ms)
+        elif self._playing is not ...:
+            # the end event of the old channel is ignored
+            channel, self._playing = self._playing, ...
+            channel.stop()
+
+        tmp = voices.play(
+            self._sound,
+            self._on_channel_end,
+            loops,
+            maxtime,
+            fade_ms,
+            volume=self.volume,
+            category=self.category,
+            position=position
+        )
+        # skipped (culled), counts as played right away so effects
+        # waiting for it (the stages of `ThreeStageSoundEffect`) continue
         if tmp is None:
+            if self._on_finish is not ...:
+                self._on_finish()
+
+            # may have been started again by `on_finish`
+            if self._playing is ...:
+                self._finished()
+
             return ...
 
         self._playing = tmp
+        sound_effects.add(self)
 
     def stop(self) -> None:
         """
         stop the sound effect if it is currently playing
+        (`on_finish_playing` is still called)
         """
         if self.playing:
             self._playing.stop()
-            self._playing = ...
 
-    def update(self) -> None:
-        """
-        updates called by the game loop
-        """
-        now = self.playing
+    def _on_channel_end(self, channel: pg.mixer.Channel) -> None:
+        if channel is not self._playing:
+            return
 
-        if self._last_playing and not now and self._on_finish is not ...:
+        self._playing = ...
+
+        if self._on_finish is not ...:
             self._on_finish()
 
-        self._last_playing = now
+        # may have been started again by `on_finish`
+        if self._playing is ...:
+            self._finished()
+
+    def _finished(self) -> None:
+        """
+        unregister and return to the pool
+        """
+        sound_effects.remove(self)
+
+        if self._pool_key is not None:
+            sound_effects.release(self._pool_key, self)
 
 
 class PresetEffect(SoundEffect):
@@ -122,10 +204,12 @@ class PresetEffect(SoundEffect):
 
 
 class LargeExplosion(PresetEffect):
+    category = "explosion"
     _sound_name = "explosion_large"
 
 
 class SmallExplosion(PresetEffect):
+    category = "explosion"
     _sound_name = "explosion_small"
 
 
@@ -134,13 +218,17 @@ class Shotgun(PresetEffect):
     _sound_name = "shotgun"
 
 
-def sound_effect_wrapper(sound_name: str, volume: float = 1) -> SoundEffect:
+def sound_effect_wrapper(
+        sound_name: str,
+        volume: float = 1,
+        category: str = "effect"
+) -> SoundEffect:
     """
     returns an already set sound effect
     """
-    effect = SoundEffect(sound_name)
-    effect.volume = volume
-    return effect
+    return SoundEffect.from_pool(
+        sound_name, volume=volume, category=category
+    )
 
 
 class ThreeStageSoundEffect:
@@ -149,25 +237,34 @@ class ThreeStageSoundEffect:
     _stage_three_name: str
     volume: float = 1
 
-    def __init__(self) -> None:
-        self._stage_three = SoundEffect(
-            self._stage_three_name,
-            self.stop
-        )
-        self._stage_three.volume = self.volume
-        self._stage_two = SoundEffect(
-            self._stage_two_name,
-            self._play_3
-        )
-        self._stage_two.volume = self.volume
-        self._stage_one = SoundEffect(
-            self._stage_one_name,
-            self._play_2
-        )
-        self._stage_one.volume = self.volume
+    def __init__(
+            self,
+            category: str = "effect",
+            position: Vec2 = ...
+    ) -> None:
+        """
+        :param position: where the sound comes from (for all stages)
+        """
+        self._category = category
+        self._position = position
+
+        self._stage_three = self._stage(self._stage_three_name, self.stop)
+        self._stage_two = self._stage(self._stage_two_name, self._play_3)
+        self._stage_one = self._stage(self._stage_one_name, self._play_2)
         self._playing = True
         self.play()
 
+    def _stage(
+            self,
+            sound_name: str,
+            on_finish_playing: tp.Callable[[], None] = ...
+    ) -> SoundEffect:
+        stage = SoundEffect(sound_name, on_finish_playing)
+        stage.volume = self.volume
+        stage.category = self._category
+
+        return stage
+
     @property
     def playing(self) -> bool:
         return self._playing
@@ -176,15 +273,15 @@ class ThreeStageSoundEffect:
         """
         play the sound effect
         """
-        self._stage_one.play()
+        self._stage_one.play(position=self._position)
 
     def _play_2(self) -> None:
         if self._playing:
-            self._stage_two.play()
+            self._stage_two.play(position=self._position)
 
     def _play_3(self) -> None:
         if self._playing:
-            self._stage_three.play()
+            self._stage_three.play(position=self._position)
 
     def stop(self) -> None:
         """
@@ -194,23 +291,33 @@ class ThreeStageSoundEffect:
 
 
 class ContinuousSoundEffect(ThreeStageSoundEffect):
-    def __init__(self) -> None:
-        super().__init__()
-        self._stage_two = SoundEffect(
-            self._stage_two_name,
-        )
-        self._stage_two.volume = self.volume
-        self._one_done = False
+    def __init__(
+            self,
+            category: str = "effect",
+            position: Vec2 = ...
+    ) -> None:
+        # stage one is timed without the audio, so a sound that is
+        # skipped (far away, too many playing) doesn't change gameplay
+        sound = sounds.get_sound(self._stage_one_name)
+        self._stage_one_length = 0 if sound is None else sound.get_length()
+        self._started = perf_counter()
+        self._one_done = False  # stage two is playing
+
+        super().__init__(category, position)
+        self._stage_two = self._stage(self._stage_two_name)
 
     @property
     def stage_one_done(self) -> bool:
-        return self._one_done
+        """
+        true once stage one would have finished playing
+        """
+        return perf_counter() - self._started >= self._stage_one_length
 
     def _play_2(self) -> None:
         self._one_done = True
 
         if self._playing:
-            self._stage_two.play(-1)
+            self._stage_two.play(-1, position=self._position)
 
     def done(self) -> None:
         """
@@ -218,7 +325,7 @@ class ContinuousSoundEffect(ThreeStageSoundEffect):
         """
         self._stage_two.stop()
 
-        if self.stage_one_done:
+        if self._one_done:
             if self._playing:
                 self._play_3()
 
@@ -8,9 +8,11 @@ Author:
 Nilusink
 """
 from ..debugging import print_ic_style, get_fg_color
+from ..logic import AssetPack
 import pygame as pg
 import typing as tp
 import zipfile
+import io
 import os
 
 
@@ -19,18 +21,71 @@ class NamedSound(tp.TypedDict):
     name: str
 
 
+class SoundFile(tp.TypedDict):
+    data: bytes | memoryview
+    name: str
+    raw: bool  # samples in the mixers format (baked)
+
+
+# baked sounds are stored in the mixers output format, so everything that
+# uses them has to initialize the mixer with `init_mixer`
+MIXER_SETTINGS: dict[str, int] = {
+    "frequency": 44100,
+    "size": -16,
+    "channels": 2,  # stereo (number of playing sounds: see `voices`)
+    "buffer": 1024
+}
+
+
+def init_mixer() -> None:
+    """
+    initialize pygame and the mixer (used by the game and bake_assets.py)
+    """
+    pg.mixer.pre_init(**MIXER_SETTINGS)
+    pg.init()
+
+    # pg.init ignores a missing audio device, this raises pg.error
+    pg.mixer.init()
+
+
+def mixer_format() -> str:
+    """
+    format baked sounds have to match (frequency, size, channels)
+    """
+    return "{}_{}_{}".format(*pg.mixer.get_init())
+
+
 class _Sounds:
     _sounds: dict[str, dict[str, NamedSound]]
     filetypes = ("mp3", "ogg", "wav")
     debug: int = 1
 
+    # baked packs (see bake_assets.py)
+    pack_dir: str | None = "assets/baked"
+
     def __init__(self) -> None:
         self._sounds = {}
 
+        # name: first scope containing it
+        self._name_index: dict[str, str] = {}
+
+        # lookup counters (for profiling)
+        self.hits = 0
+        self.misses = 0
+
     def load_sounds(self, path: str) -> None:
         """
         load all sounds from a zip file or a directory
         """
+        self.add_sounds(*self.read_sounds(path))
+
+    def read_sounds(self, path: str) -> tuple[str, list[SoundFile]]:
+        """
+        read all sound files from a zip file or a directory
+        without creating the sounds (thread safe)
+
+        :returns: scope, files
+        """
         if not os.path.exists(path):
             raise FileNotFoundError(f"{path} doesn't exist!")
 
@@ -50,6 +105,26 @@ class _Sounds:
         if self.debug >= 2:
             print_ic_style(f"loading audio scope {get_fg_color(36)}\"{scope}\"")
 
+        pack = None
+        if pg.mixer.get_init() is not None:
+            pack = AssetPack.open(
+                self.pack_dir, "sounds", scope, path, mixer_format()
+            )
+
+        # baked, no decoding needed
+        if pack is not None:
+            if is_zip:
+                soundzip.close()
+
+            return scope, [
+                {
+                    "name": sound["name"],
+                    "data": pack.get_sound(sound),
+                    "raw": True
+                } for sound in pack.manifest["sounds"]
+            ]
+
+        out: list[SoundFile] = []
         for f in files:
             parts = (f.filename if is_zip else f).split(".")
             ending = parts[-1]
@@ -65,20 +140,43 @@ class _Sounds:
                 )
 
             if is_zip:
-                file = soundzip.open(f)
+                data = soundzip.read(f)
 
             else:
-                file = path + "/" + f
+                with open(path + "/" + f, "rb") as file:
+                    data = file.read()
 
-            sound = pg.mixer.Sound(file)
+            out.append({
+                "name": filename,
+                "data": data,
+                "raw": False
+            })
 
-            if scope not in self._sounds:
-                self._sounds[scope] = {}
+        if is_zip:
+            soundzip.close()
 
-            self._sounds[scope][filename] = {
-                "name": filename,
+        return scope, out
+
+    def add_sounds(self, scope: str, files: list[SoundFile]) -> None:
+        """
+        create the sounds from files returned by `read_sounds`
+        (should be called from the main thread)
+        """
+        if scope not in self._sounds:
+            self._sounds[scope] = {}
+
+        for file in files:
+            if file["raw"]:
+                sound = pg.mixer.Sound(buffer=file["data"])
+
+            else:
+                sound = pg.mixer.Sound(io.BytesIO(file["data"]))
+
+            self._sounds[scope][file["name"]] = {
+                "name": file["name"],
                 "sound": sound
             }
+            self._name_index.setdefault(file["name"], scope)
 
         if self.debug:
             print_ic_style(
@@ -98,34 +196,37 @@ class _Sounds:
         if scope is not None and scope not in self._sounds:
             raise ValueError(f"scope \"{scope}\" not found")
 
-        for n_scope in self._sounds if scope is None else [scope]:
-            for sound in self._sounds[n_scope]:
-                # sound: NamedSound
-                if self._sounds[n_scope][sound]["name"] == name:
-                    if self.debug >= 3:
-                        print_ic_style(
-                            f"{get_fg_color(36)}\"{name}\"{get_fg_color(247)} "
-                            f"found in scope {get_fg_color(36)}\"{n_scope}\""
-                        )
+        n_scope = self._name_index.get(name) if scope is None else scope
+        sound = self._sounds.get(n_scope, {}).get(name)
 
-                    return self._sounds[n_scope][sound]["sound"]
+        if sound is None:
+            self.misses += 1
 
-        else:
             if self.debug >= 3:
                 if scope is None:
                     print_ic_style(
                         f"{get_fg_color(36)}\"{name}\"{get_fg_color(247)} "
-                        f"not found in scope {get_fg_color(36)}\"{scope}\""
+                        f"not found in any loaded scope"
                     )
 
                 else:
                     print_ic_style(
                         f"{get_fg_color(36)}\"{name}\"{get_fg_color(247)} "
-                        f"not found in any loaded scope"
+                        f"not found in scope {get_fg_color(36)}\"{scope}\""
                     )
 
             return None
 
+        self.hits += 1
+
+        if self.debug >= 3:
+            print_ic_style(
+                f"{get_fg_color(36)}\"{name}\"{get_fg_color(247)} "
+                f"found in scope {get_fg_color(36)}\"{n_scope}\""
+            )
+
+        return sound["sound"]
+
     def get_all_from_scope(
             self,
             scope: str,
@@ -0,0 +1,261 @@
+"""
+_voices.py
+19. October 2026
+
+assigns mixer channels to sounds and calls back once they ended
+(using channel end events instead of polling)
+
+Author:
+Nilusink
+"""
+from time import perf_counter
+import pygame as pg
+import typing as tp
+
+from ..logic import Vec2
+
+
+type end_callback_t = tp.Callable[[pg.mixer.Channel], tp.Any]
+
+# view position, view size (world units)
+type view_getter_t = tp.Callable[[], tuple[Vec2, Vec2]]
+
+
+class VoiceCategory(tp.TypedDict):
+    priority: int  # may take channels from lower priorities
+    max_instances: int  # of the same sound at once (per category)
+    reserved: bool  # may use the reserved channels
+
+
+class _Voice(tp.TypedDict):
+    sound: pg.mixer.Sound
+    category: str
+    started: float
+    on_end: end_callback_t
+
+
+class _Voices:
+    """
+    every channel posts its own event type when it ends, the events
+    have to be passed to `handle_event` (see `BaseGame.handle_events`)
+
+    sounds with a position are attenuated by their distance to the view
+    and skipped if they would be inaudible
+    """
+    n_channels: int = 32
+    n_reserved: int = 4  # only used by reserved categories
+
+    # world units outside the view until a sound is silent
+    falloff: float = 960
+    min_volume: float = .02
+
+    categories: dict[str, VoiceCategory] = {
+        "player": {"priority": 3, "max_instances": 4, "reserved": True},
+        "explosion": {"priority": 2, "max_instances": 3, "reserved": False},
+        "effect": {"priority": 1, "max_instances": 4, "reserved": False},
+    }
+
+    def __init__(self) -> None:
+        self._channels: list[pg.mixer.Channel] = []
+
+        # event type: channel index (-1 for music)
+        self._event_types: dict[int, int] = {}
+        self._voices: dict[int, _Voice] = {}
+
+        # end events of channels that were taken over
+        self._ignore: dict[int, int] = {}
+
+        self._music_event: int | None = None
+        self._on_music_end: tp.Callable[[], tp.Any] = ...
+
+        self._get_view: view_getter_t = ...
+
+        # counters (for profiling)
+        self.n_skipped = 0
+        self.n_stolen = 0
+
+    def __contains__(self, event_type: int) -> bool:
+        return event_type in self._event_types
+
+    @property
+    def n_playing(self) -> int:
+        return len(self._voices)
+
+    def set_view(self, get_view: view_getter_t) -> None:
+        """
+        :param get_view: returns the views position and size
+            (world units)
+        """
+        self._get_view = get_view
+
+    def _ensure_channels(self) -> None:
+        """
+        set the end event of all (new) mixer channels
+        """
+        if pg.mixer.get_num_channels() < self.n_channels:
+            pg.mixer.set_num_channels(self.n_channels)
+
+        while len(self._channels) < pg.mixer.get_num_channels():
+            index = len(self._channels)
+            event_type = pg.event.custom_type()
+
+            channel = pg.mixer.Channel(index)
+            channel.set_endevent(event_type)
+
+            self._channels.append(channel)
+            self._event_types[event_type] = index
+
+    def _attenuation(self, position: Vec2) -> float:
+        """
+        volume factor depending on the distance to the view
+        """
+        if position is ... or self._get_view is ...:
+            return 1
+
+        view_position, view_size = self._get_view()
+
+        dx = max(
+            view_position.x - position.x,
+            position.x - view_position.x - view_size.x,
+            0
+        )
+        dy = max(
+            view_position.y - position.y,
+            position.y - view_position.y - view_size.y,
+            0
+        )
+
+        return max(1 - (dx**2 + dy**2)**.5 / self.falloff, 0)
+
+    def _find_channel(self, category: VoiceCategory) -> int | None:
+        """
+        a channel that is neither playing nor waiting for its end event
+        """
+        start = 0 if category["reserved"] else self.n_reserved
+
+        for index in range(start, len(self._channels)):
+            if index not in self._voices \
+                    and not self._channels[index].get_busy():
+                return index
+
+        return None
+
+    def _find_victim(self, category: VoiceCategory) -> int | None:
+        """
+        the oldest voice of the lowest priority below `category`
+        """
+        start = 0 if category["reserved"] else self.n_reserved
+
+        candidates = [
+            (self.categories[voice["category"]]["priority"],
+             voice["started"],
+             index)
+            for index, voice in self._voices.items()
+            if index >= start and self.categories[voice["category"]][
+                "priority"
+            ] < category["priority"]
+        ]
+
+        if not candidates:
+            return None
+
+        return min(candidates)[2]
+
+    def play(
+            self,
+            sound: pg.mixer.Sound,
+            on_end: end_callback_t = ...,
+            loops: int = 0,
+            maxtime: int = 0,
+            fade_ms: int = 0,
+            volume: float = 1,
+            category: str = "effect",
+            position: Vec2 = ...
+    ) -> pg.mixer.Channel | None:
+        """
+        play a sound on a free channel (or take one from a lower priority)
+
+        :param on_end: called with the channel once the sound ended,
+            was stopped or its channel was taken
+        :param position: world position of the source (attenuated by
+            the distance to the view)
+        :returns: the channel or None if the sound was skipped
+        """
+        self._ensure_channels()
+
+        settings = self.categories[category]
+        volume *= self._attenuation(position)
+
+        # inaudible or too many of the same sound (in this category)
+        if volume < self.min_volume or sum(
+                voice["sound"] is sound and voice["category"] == category
+                for voice in self._voices.values()
+        ) >= settings["max_instances"]:
+            self.n_skipped += 1
+            return None
+
+        index = self._find_channel(settings)
+        victim: _Voice | None = None
+
+        if index is None:
+            index = self._find_victim(settings)
+
+            if index is None:
+                self.n_skipped += 1
+                return None
+
+            # playing over a busy channel still posts its end event
+            victim = self._voices.pop(index)
+            self._ignore[index] = self._ignore.get(index, 0) + 1
+            self.n_stolen += 1
+
+        channel = self._channels[index]
+        channel.play(sound, loops, maxtime, fade_ms)
+        channel.set_volume(volume)
+
+        self._voices[index] = {
+            "sound": sound,
+            "category": category,
+            "started": perf_counter(),
+            "on_end": on_end
+        }
+
+        if victim is not None and victim["on_end"] is not ...:
+            victim["on_end"](channel)
+
+        return channel
+
+    def on_music_end(self, callback: tp.Callable[[], tp.Any]) -> None:
+        """
+        call `callback` every time `pg.mixer.music` stops playing
+        """
+        if self._music_event is None:
+            self._music_event = pg.event.custom_type()
+            self._event_types[self._music_event] = -1
+
+        pg.mixer.music.set_endevent(self._music_event)
+        self._on_music_end = callback
+
+    def handle_event(self, event: pg.event.Event) -> None:
+        """
+        run the callback of the channel that ended
+        """
+        index = self._event_types[event.type]
+
+        if index == -1:
+            if self._on_music_end is not ...:
+                self._on_music_end()
+
+            return
+
+        if self._ignore.get(index, 0) > 0:
+            self._ignore[index] -= 1
+            return
+
+        voice = self._voices.pop(index, None)
+
+        if voice is not None and voice["on_end"] is not ...:
+            voice["on_end"](self._channels[index])
+
+
+voices = _Voices()
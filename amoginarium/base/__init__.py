@@ -1,4 +1,4 @@
 from ._groups import HasBars, WallBouncer, CollisionDestroyed, Bullets, Walls
 from ._groups import Updated, GravityAffected, Drawn, FrictionXAffected
-from ._groups import WallCollider, Players
+from ._groups import WallCollider, Players, Sleeping
 from ._basegame import BaseGame
@@ -0,0 +1,262 @@
+"""
+_asset_loader.py
+19. October 2026
+
+reads and decodes texture and sound packs in parallel
+
+Author:
+Nilusink
+"""
+from concurrent.futures import ThreadPoolExecutor, Future
+from time import perf_counter
+import typing as tp
+
+from ..debugging import print_ic_style, get_fg_color
+from ._textures import textures
+from ..audio import sounds
+
+
+type asset_kind_t = tp.Literal["images", "sounds"]
+
+
+class AssetEntry(tp.TypedDict):
+    kind: asset_kind_t
+    path: str
+    priority: int  # lower is loaded first
+    tags: tuple[str, ...]
+    lazy: tp.NotRequired[bool]  # images only, load on first use
+
+
+class AssetTiming(tp.TypedDict):
+    kind: asset_kind_t
+    path: str
+    scope: str
+    n_assets: int
+    read_time: float    # on the worker (read + decode)
+    add_time: float     # on the main thread (sound creation, registering)
+
+
+class _PendingAsset(tp.TypedDict):
+    kind: asset_kind_t
+    path: str
+    tags: tuple[str, ...]
+    future: Future
+
+
+class AssetLoader:
+    """
+    decodes asset packs on a worker pool, everything that has to happen
+    on the main thread (creating sounds, uploading textures) is done
+    in `poll` or `wait`
+    """
+    debug: int = 1
+
+    def __init__(self, max_workers: int | None = None) -> None:
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="asset_loader"
+        )
+        self._pending: list[_PendingAsset] = []
+        self._callbacks: list[tuple[str, tp.Callable[[], tp.Any]]] = []
+        self._n_total = 0
+        self._start = perf_counter()
+        self.timings: list[AssetTiming] = []
+
+    @property
+    def progress(self) -> float:
+        """
+        fraction of packs that have been loaded (0 - 1)
+        """
+        if self._n_total == 0:
+            return 1
+
+        return 1 - len(self._pending) / self._n_total
+
+    @property
+    def done(self) -> bool:
+        return len(self._pending) == 0
+
+    @staticmethod
+    def _timed[**A, R](
+            func: tp.Callable[A, R],
+            *args: A.args,
+            **kwargs: A.kwargs
+    ) -> tuple[R, float]:
+        start = perf_counter()
+        result = func(*args, **kwargs)
+
+        return result, perf_counter() - start
+
+    def _submit(
+            self,
+            kind: asset_kind_t,
+            path: str,
+            tags: tp.Iterable[str]
+    ) -> None:
+        if self.done:
+            self._start = perf_counter()
+
+        read = textures.read_images if kind == "images" \
+            else sounds.read_sounds
+
+        self._pending.append({
+            "kind": kind,
+            "path": path,
+            "tags": tuple(tags),
+            "future": self._pool.submit(self._timed, read, path)
+        })
+        self._n_total += 1
+
+    def add_images(
+            self,
+            path: str,
+            tags: tp.Iterable[str] = (),
+            lazy: bool = False
+    ) -> None:
+        """
+        read and decode a texture pack (zip or directory)
+
+        :param lazy: only register the pack, it is loaded by `textures`
+            the first time one of its textures is requested
+        """
+        if lazy:
+            textures.register_scope(path)
+            return
+
+        self._submit("images", path, tags)
+
+    def add_sounds(self, path: str, tags: tp.Iterable[str] = ()) -> None:
+        """
+        read a sound pack (zip or directory)
+        """
+        self._submit("sounds", path, tags)
+
+    def add_manifest(self, manifest: list[AssetEntry]) -> None:
+        """
+        add all packs of a manifest (lowest priority first)
+        """
+        for entry in sorted(manifest, key=lambda e: e["priority"]):
+            if entry["kind"] == "images":
+                self.add_images(
+                    entry["path"], entry["tags"], entry.get("lazy", False)
+                )
+
+            else:
+                self.add_sounds(entry["path"], entry["tags"])
+
+    def is_loaded(self, *tags: str) -> bool:
+        """
+        check if all packs with any of the tags have been loaded
+        (all packs if no tags are given)
+        """
+        return not any(self._matches(p, tags) for p in self._pending)
+
+    def when_loaded(self, tag: str, callback: tp.Callable[[], tp.Any]) -> None:
+        """
+        call `callback` (on the main thread) once all packs with `tag`
+        have been loaded
+        """
+        if self.is_loaded(tag):
+            callback()
+            return
+
+        self._callbacks.append((tag, callback))
+
+    @staticmethod
+    def _matches(pending: _PendingAsset, tags: tuple[str, ...]) -> bool:
+        return not tags or any(tag in pending["tags"] for tag in tags)
+
+    def _register(self, pending: _PendingAsset) -> AssetTiming:
+        """
+        finish loading a pack on the main thread
+        """
+        (scope, files), read_time = pending["future"].result()
+
+        if pending["kind"] == "images":
+            _, add_time = self._timed(textures.add_images, scope, files)
+
+        else:
+            _, add_time = self._timed(sounds.add_sounds, scope, files)
+
+        timing: AssetTiming = {
+            "kind": pending["kind"],
+            "path": pending["path"],
+            "scope": scope,
+            "n_assets": len(files),
+            "read_time": read_time,
+            "add_time": add_time
+        }
+
+        self._pending.remove(pending)
+        self.timings.append(timing)
+
+        # run callbacks that are now ready
+        ready = [c for c in self._callbacks if self.is_loaded(c[0])]
+        for callback in ready:
+            self._callbacks.remove(callback)
+            callback[1]()
+
+        if self.done and self.debug:
+            self.print_timings(self.timings, perf_counter() - self._start)
+
+        return timing
+
+    def poll(self, max_time: float = .005) -> bool:
+        """
+        register packs that have finished reading without blocking
+        must be called from the main thread
+
+        :param max_time: stop registering packs after this many seconds
+        :returns: true if everything has been loaded
+        """
+        start = perf_counter()
+
+        for pending in list(self._pending):
+            if perf_counter() - start > max_time:
+                break
+
+            if pending["future"].done():
+                self._register(pending)
+
+        return self.done
+
+    def wait(self, *tags: str) -> list[AssetTiming]:
+        """
+        block until all packs with any of the tags (all if no tags are
+        given) are loaded, must be called from the main thread
+
+        :returns: timings of all packs loaded by this call
+        """
+        return [
+            self._register(pending) for pending in list(self._pending)
+            if self._matches(pending, tags)
+        ]
+
+    def shutdown(self) -> None:
+        """
+        stop the worker pool
+        """
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    @staticmethod
+    def print_timings(timings: list[AssetTiming], total: float) -> None:
+        """
+        print the timings, slowest pack first
+        """
+        print_ic_style(
+            f"loaded {get_fg_color(37)}{len(timings)}{get_fg_color(247)} "
+            f"asset packs in {get_fg_color(37)}{total * 1000:.1f}ms"
+        )
+
+        for timing in sorted(
+                timings,
+                key=lambda t: t["read_time"] + t["add_time"],
+                reverse=True
+        ):
+            print_ic_style(
+                f"- {timing["kind"]} {get_fg_color(36)}\"{timing["scope"]}\""
+                f"{get_fg_color(247)} ({timing["n_assets"]}): "
+                f"read {get_fg_color(37)}{timing["read_time"] * 1000:.1f}ms"
+                f"{get_fg_color(247)}, add "
+                f"{get_fg_color(37)}{timing["add_time"] * 1000:.1f}ms"
+            )
@@ -0,0 +1,92 @@
+"""
+_asset_manifest.py
+19. October 2026
+
+all asset packs the game loads on startup
+
+Author:
+Nilusink
+"""
+from ._asset_loader import AssetEntry
+
+
+# core: required by every map
+# bg<n>: background layers (lazy, only loaded by maps using them)
+ASSET_MANIFEST: list[AssetEntry] = [
+    {
+        "kind": "images",
+        "path": "assets/images/textures.zip",
+        "priority": 0,
+        "tags": ("core",)
+    },
+    {
+        "kind": "images",
+        "path": "assets/images/dirt_islands.zip",
+        "priority": 0,
+        "tags": ("core",)
+    },
+    {
+        "kind": "sounds",
+        "path": "assets/audio/effects/minigun",
+        "priority": 1,
+        "tags": ("core",)
+    },
+    {
+        "kind": "sounds",
+        "path": "assets/audio/effects/explosions",
+        "priority": 1,
+        "tags": ("core",)
+    },
+    {
+        "kind": "sounds",
+        "path": "assets/audio/effects/shots",
+        "priority": 1,
+        "tags": ("core",)
+    },
+    {
+        "kind": "sounds",
+        "path": "assets/audio/effects/reloads",
+        "priority": 1,
+        "tags": ("core",)
+    },
+    {
+        "kind": "images",
+        "path": "assets/images/animations/explosion.zip",
+        "priority": 1,
+        "tags": ("core",)
+    },
+    {
+        "kind": "images",
+        "path": "assets/images/bg1.zip",
+        "priority": 2,
+        "tags": ("bg1",),
+        "lazy": True
+    },
+    {
+        "kind": "images",
+        "path": "assets/images/bg2.zip",
+        "priority": 2,
+        "tags": ("bg2",),
+        "lazy": True
+    },
+    {
+        "kind": "images",
+        "path": "assets/images/bg3.zip",
+        "priority": 2,
+        "tags": ("bg3",),
+        "lazy": True
+    },
+    {
+        "kind": "images",
+        "path": "assets/images/bg4.zip",
+        "priority": 2,
+        "tags": ("bg4",),
+        "lazy": True
+    },
+]
+
+
+# streamed by the BackgroundPlayer, never fully decoded
+MUSIC_PATHS: list[str] = [
+    "assets/audio/background"
+]
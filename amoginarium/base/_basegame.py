@@ -21,6 +21,7 @@ from OpenGL.GL import glClearColor
 
 from ._groups import HasBars, WallBouncer, CollisionDestroyed, Bullets, Players
 from ._groups import Updated, GravityAffected, Drawn, FrictionXAffected
+from ._groups import Sleeping
 from ..entities import SniperTurret, AkTurret, MinigunTurret, MortarTurret
 from ..entities import Player, Island, Bullet, BaseTurret, FlakTurret
 from ..entities import CRAMTurret, TextEntity
@@ -28,12 +29,15 @@ from ..controllers import Controllers, Controller, GameController
 from ..debugging import run_with_debug, print_ic_style, CC
 from ._scrolling_background import ParalaxBackground
 from ._linked import global_vars, Coalitions
-from ..logic import SimpleLock, Color, Vec2
-from ..audio import sounds, sound_effects
+from ..logic import Color, Vec2, MPSCQueue
+from ..audio import voices, init_mixer
 from ..render_bindings import renderer
 from ..audio import BackgroundPlayer
-from ..communications import TCPServer
+from ..communications import TCPServer, SpectatorPublisher
 from ..animations import explosion
+from ._static_layer import static_layer
+from ._asset_manifest import ASSET_MANIFEST, MUSIC_PATHS
+from ._asset_loader import AssetLoader
 from ._textures import textures
 from ..ui import Button
 
@@ -81,7 +85,10 @@ class BaseGame:
     def __init__(
             self,
             debug: bool = False,
+            game_host: str = "0.0.0.0",
             game_port: int = 12345,
+            udp_port: int | None = None,
+            spectator_port: int | None = None,
             show_targets: bool = False,
             time_multiplier: float = 1
     ) -> None:
@@ -102,6 +109,7 @@ class BaseGame:
         # debugging
         self._logic_loop_times: list[tuple[float, float]] = []
         self._pygame_loop_times: list[tuple[float, float]] = []
+        # time since start, input latency (socket -> screen)
         self._comms_loop_times: list[tuple[float, float]] = []
         self._total_loop_times: list[tuple[float, float]] = []
 
@@ -110,11 +118,10 @@ class BaseGame:
 
         self._pygame_fps: int = 0
         self._logic_fps: int = 0
-        self._comms_ping: int = 0
+        self._comms_ping: int = 0  # latest input latency (ms)
 
         # logic setup
-        self._new_controllers: list[Controller] = []
-        self._new_controllers_lock = SimpleLock()
+        self._new_controllers: MPSCQueue[Controller] = MPSCQueue()
 
         self._controllers_cid = Controllers.on_new_controller(
             self._add_controller
@@ -124,13 +131,25 @@ class BaseGame:
         # self._in_next_loop: list[BoundFunction] = []
 
         # server setup
-        self._server = TCPServer(("0.0.0.0", game_port))
+        self._server = TCPServer((game_host, game_port), udp_port)
+
+        # world state for spectator.py (local only)
+        self._spectators: SpectatorPublisher | None = None
+        if spectator_port is not None:
+            self._spectators = SpectatorPublisher(
+                ("127.0.0.1", spectator_port)
+            )
 
         # initialize pygame (logic) and renderer
-        pg.init()
-        pg.mixer.init(channels=32, buffer=1024)
+        init_mixer()
         renderer.init("amoginarium")
 
+        # sounds far outside the view are attenuated or skipped
+        voices.set_view(lambda: (
+            Updated.world_position,
+            global_vars.screen_size / global_vars.pixel_per_meter
+        ))
+
         # initialize background
         self._background = ...
         self._bg_color = (0, 0, 0)
@@ -171,7 +190,8 @@ class BaseGame:
             )
         ]
 
-        # load map
+        # start loading assets
+        self._loader = AssetLoader()
         self.preload()
 
         self._game_start = 0
@@ -179,25 +199,20 @@ class BaseGame:
     @run_with_debug(reraise_errors=True, show_finish=True)
     def preload(self) -> None:
         """
-        load all textures n stuff
+        start loading all textures n stuff (see ASSET_MANIFEST)
+        everything is streamed in while the menu is already shown
         """
-        # load sounds
-        sounds.load_sounds("assets/audio/background")
-        sounds.load_sounds("assets/audio/effects/minigun")
-        sounds.load_sounds("assets/audio/effects/explosions")
-        sounds.load_sounds("assets/audio/effects/shots")
-        sounds.load_sounds("assets/audio/effects/reloads")
-        self._background_player.assign_scope("background")
-
-        # load entity textures
-        textures.load_images("assets/images/textures.zip")
-        textures.load_images("assets/images/dirt_islands.zip")
-        textures.load_images("assets/images/bg1.zip")
-        textures.load_images("assets/images/bg2.zip")
-        textures.load_images("assets/images/bg3.zip")
-        textures.load_images("assets/images/bg4.zip")
-        textures.load_images("assets/images/animations/explosion.zip")
+        self._loader.add_manifest(ASSET_MANIFEST)
+        self._loader.when_loaded("core", self._load_core_textures)
+
+        for path in MUSIC_PATHS:
+            self._background_player.add_tracks(path)
 
+    @staticmethod
+    def _load_core_textures() -> None:
+        """
+        upload the textures used by all maps
+        """
         Island.load_textures()
         Player.load_textures()
         Bullet.load_textures()
@@ -212,9 +227,10 @@ class BaseGame:
     def root(self) -> tp.Self:
         return self
 
-    def load_map(self, map_path: tp.LiteralString) -> None:
+    @staticmethod
+    def _find_map(map_path: tp.LiteralString) -> str:
         """
-        load a map from a json file
+        find a map file (also checks the root program path)
         """
         if not os.path.isfile(map_path):
             # if the file wasn't found, try adding the root program path
@@ -223,6 +239,31 @@ class BaseGame:
             if not os.path.isfile(map_path):
                 raise FileNotFoundError(f"Couldn't find map \"{map_path}\"")
 
+        return map_path
+
+    def _get_map_background(self, data: dict) -> ParalaxBackground:
+        """
+        the background a map uses
+        """
+        if 0 <= data["background"]-1 <= len(self._backgrounds):
+            return self._backgrounds[data["background"]-1]
+
+        return self._backgrounds[0]
+
+    def map_assets(self, map_path: tp.LiteralString) -> tuple[str, ...]:
+        """
+        asset tags required by a map
+        """
+        data = json.load(open(self._find_map(map_path), "r"))
+
+        return "core", self._get_map_background(data).scope
+
+    def load_map(self, map_path: tp.LiteralString) -> None:
+        """
+        load a map from a json file
+        """
+        map_path = self._find_map(map_path)
+
         # load map data
         data = json.load(open(map_path, "r"))
         self._last_loaded = map_path
@@ -231,11 +272,10 @@ class BaseGame:
         Players.spawn_point = Vec2.from_cartesian(*data["spawn_pos"])
 
         # set background
-        if 0 <= data["background"]-1 <= len(self._backgrounds):
-            self._background = self._backgrounds[data["background"]-1]
+        self._background = self._get_map_background(data)
 
-        else:
-            self._background = self._backgrounds[0]
+        # only wait for the assets this map needs
+        self._loader.wait("core", self._background.scope)
 
         # check if background has been assigned
         if not self._background.loaded:
@@ -338,9 +378,7 @@ class BaseGame:
         """
         appends a new controller to the queue
         """
-        self._new_controllers_lock.aquire()
-        self._new_controllers.append(controller)
-        self._new_controllers_lock.release()
+        self._new_controllers.put(controller)
 
     def handle_events(self) -> list[str]:
         """
@@ -360,6 +398,10 @@ class BaseGame:
                     # re-assign pygame joystick instance
                     c.set_joystick(joy)
 
+                # sound effects and music that ended
+                case event_type if event_type in voices:
+                    voices.handle_event(event)
+
                 case pg.KEYDOWN:
                     match event.key:
                         case pg.K_ESCAPE:
@@ -383,11 +425,17 @@ class BaseGame:
 
         in_menu: bool = True
         has_started: bool = False
-        # self.load_map("assets/maps/tutorial.json")
-        self.load_map("assets/maps/test.json")
+        # default_map = "assets/maps/tutorial.json"
+        default_map = "assets/maps/test.json"
+        default_map_assets = self.map_assets(default_map)
 
         def start_game():
             nonlocal in_menu, has_started
+
+            # blocks until the maps assets are loaded
+            if self._last_loaded is ...:
+                self.load_map(default_map)
+
             # self._background.reset_scroll()
             widgets[0]._text = "Continue"
             in_menu = False
@@ -395,9 +443,14 @@ class BaseGame:
 
         def reset_game():
             nonlocal in_menu
-            for entity in Updated.sprites():
+            if self._last_loaded is ...:
+                return
+
+            for entity in Updated.sprites() + Sleeping.sprites():
                 entity.kill()
 
+            static_layer.clear()
+
             self._background.reset_scroll()
             global_vars.reset()
             Updated.world_position *= 0
@@ -455,10 +508,28 @@ class BaseGame:
                 except pg.error:
                     break
 
-                self._background.scroll(delta / 200)
-                self._background.draw(delta)
+                # stream in the remaining assets
+                if not self._loader.done:
+                    self._loader.poll()
+
+                    if self._last_loaded is ... \
+                            and self._loader.is_loaded(*default_map_assets):
+                        self.load_map(default_map)
+
+                if self._last_loaded is not ...:
+                    self._background.scroll(delta / 200)
+                    self._background.draw(delta)
+
+                else:
+                    renderer.draw_rect(
+                        (0, 0),
+                        global_vars.screen_size,
+                        (0, 0, 0, 1),
+                        convert_global=False
+                    )
 
                 if has_started:
+                    static_layer.gl_draw()
                     Drawn.gl_draw()
                     HasBars.gl_draw()
 
@@ -468,6 +539,9 @@ class BaseGame:
                 else:
                     widgets[0].gl_draw()
 
+                if not self._loader.done:
+                    self._draw_loading_bar()
+
                 pg.display.flip()
                 clock.tick(global_vars.max_fps)
 
@@ -491,6 +565,10 @@ class BaseGame:
             if "escape" in pressed:
                 in_menu = True
 
+            # backgrounds and music that are still streaming in
+            if not self._loader.done:
+                self._loader.poll()
+
             # update background music
             try:  # throws error on game end
                 self._background_player.update()
@@ -545,6 +623,7 @@ class BaseGame:
             # global_vars.pixel_per_meter *= .999
 
             # handle groups
+            static_layer.gl_draw()
             Drawn.gl_draw()
             HasBars.gl_draw()
 
@@ -578,6 +657,17 @@ class BaseGame:
 
             pg.display.flip()
 
+            # input latency (socket -> screen)
+            shown = perf_counter()
+            for controller in Controllers.controllers:
+                latency = controller.latency.display(shown)
+
+                if latency is not None:
+                    self._comms_loop_times.append(
+                        (now - self._game_start, latency)
+                    )
+                    self._comms_ping = int(latency * 1000)
+
             self._pygame_loop_times.append(
                 (now - self._game_start, perf_counter() - start)
             )
@@ -590,6 +680,21 @@ class BaseGame:
 
         ic("pygame end")
 
+    def _draw_loading_bar(self) -> None:
+        """
+        show the asset loading progress
+        """
+        renderer.draw_rect(
+            (760, 800),
+            (400, 10),
+            (0, 0, 0, .5)
+        )
+        renderer.draw_rect(
+            (760, 800),
+            (400 * self._loader.progress, 10),
+            (.55, .55, 1, 1)
+        )
+
     def _run_logic(self) -> None:
         """
         start game logic
@@ -619,30 +724,36 @@ class BaseGame:
     def _update_logic(self, delta, now) -> float:
         start = perf_counter()
 
-        # check for new controllers
-        if len(self._new_controllers) > 0:
-            self._new_controllers_lock.aquire()
-            tmp = self._new_controllers.copy()
-            self._new_controllers.clear()
-            self._new_controllers_lock.release()
-
-            for new_controller in tmp:
-                # spawn new player
-                Player(coalition=Coalitions.blue, controller=new_controller)
-                ic(new_controller, Player)
+        # check for new controllers (only read by this thread)
+        for new_controller in self._new_controllers.drain():
+            # spawn new player
+            Player(coalition=Coalitions.blue, controller=new_controller)
+            ic(new_controller, Player)
 
-        # update sounds
-        sound_effects.update()
+        # inputs received until now are used by this tick
+        consumed = perf_counter()
+        for controller in Controllers.controllers:
+            controller.latency.consume(consumed)
 
         # update entities
         GravityAffected.calculate_gravity(delta)
         FrictionXAffected.calculate_friction(delta)
         WallBouncer.update()
 
-        Updated.update(delta)
+        # used by explosions and turret target acquisition, built before
+        # the update so every query of this tick sees the same positions
+        CollisionDestroyed.rebuild_index()
 
+        Updated.update(delta)
         CollisionDestroyed.update()
 
+        if self._spectators is not None:
+            view = global_vars.screen_size / global_vars.pixel_per_meter
+            self._spectators.publish(
+                Updated.sprites() + Sleeping.sprites(),
+                (*Updated.world_position.xy, *view.xy)
+            )
+
         logic_time = perf_counter() - start
         self._logic_loop_times.append(
             (now - self._game_start, logic_time)
@@ -660,10 +771,6 @@ class BaseGame:
         asyncio.run(self._server.run())
         ic("comms end")
 
-        # TODO: controller latency in graph
-
-        return
-
     def mainloop(self) -> None:
         """
         run the game
@@ -690,6 +797,18 @@ class BaseGame:
         #with suppress(RuntimeError):
         self._server.close()
 
+        if self._spectators is not None:
+            self._spectators.close()
+
+        self._loader.shutdown()
+
+        # remember which textures were used for bake_assets.py
+        textures.save_variants()
+
+        # drop textures that haven't been used for a long time
+        if textures.cache is not None:
+            textures.cache.prune()
+
         ic("stopping game...")
 
         # quit pygame
@@ -703,7 +822,11 @@ class BaseGame:
                 "comms": self._comms_loop_times,
                 "bullets": self._n_bullets_times,
                 "pygame": self._pygame_loop_times,
-                "total": self._total_loop_times
+                "total": self._total_loop_times,
+                "latency": {
+                    controller.id: controller.latency.summary()
+                    for controller in Controllers.controllers
+                }
             }, out)
 
         ic("done writing debug data")
@@ -13,12 +13,55 @@ import pygame as pg
 import typing as tp
 import numpy as np
 
-from ..logic import Vec2, is_related, Color, coord_t, convert_coord
+from ..logic import Vec2, Color, coord_t, convert_coord, SpatialGrid
+from ..logic import interaction_matrix, can_interact
 from ..render_bindings import renderer
 # from ..debugging import run_with_debug
 
 
 class _BaseGroup(pg.sprite.Group):
+    _index: SpatialGrid = ...
+    _static_index: SpatialGrid = ...
+
+    def __init__(self, *sprites) -> None:
+        # resting (static or sleeping) sprites are indexed separately
+        self._resting: set[pg.sprite.Sprite] = set()
+        self._static_dirty = True
+
+        # max. distance between a resting sprites position and its rect
+        self._resting_extent = 0.0
+
+        super().__init__(*sprites)
+
+    def add_internal(self, sprite, layer=None) -> None:
+        super().add_internal(sprite, layer)
+
+        if getattr(sprite, "resting", False):
+            self._resting.add(sprite)
+            self._static_dirty = True
+
+    def remove_internal(self, sprite) -> None:
+        super().remove_internal(sprite)
+
+        if sprite in self._resting:
+            self._resting.discard(sprite)
+            self._static_dirty = True
+
+    def update_resting(self, sprite) -> None:
+        """
+        call if a sprite went to sleep or woke up
+        """
+        if sprite not in self:
+            return
+
+        if getattr(sprite, "resting", False):
+            self._resting.add(sprite)
+
+        else:
+            self._resting.discard(sprite)
+
+        self._static_dirty = True
+
     def gl_draw(self) -> None:
         """
         draw sprites using the .gl_draw function
@@ -38,22 +81,118 @@ class _BaseGroup(pg.sprite.Group):
         out = []
 
         for sprite in entities:
-            delta = sprite.position - center
+            distance = (sprite.position - center).length
 
-            if delta.length <= radius:
-                out.append((delta.length, sprite))
+            if distance <= radius:
+                out.append((distance, sprite))
 
         return sorted(out, key=lambda r: r[0])
 
+    def rebuild_index(self, cell_size: float = 256) -> None:
+        """
+        rebuild the spatial index used for circle and nearest queries
+        (should be called once per tick)
+
+        resting sprites are only re-indexed if they changed
+        """
+        if self._index is ... or self._index.cell_size != cell_size:
+            self._index = SpatialGrid(cell_size)
+            self._static_index = SpatialGrid(cell_size)
+            self._static_dirty = True
+
+        if len(self._resting) < len(self):
+            self._index.rebuild(
+                s for s in self.sprites() if s not in self._resting
+            )
+
+        else:
+            self._index.clear()
+
+        if self._static_dirty:
+            self._rebuild_static_index()
+
+    def _rebuild_static_index(self) -> None:
+        self._static_index.rebuild(self._resting)
+        self._resting_extent = max(
+            (self.extent_of(s) for s in self._resting), default=0.0
+        )
+        self._static_dirty = False
+
+    @staticmethod
+    def extent_of(sprite) -> float:
+        """
+        max. distance between a sprites position and a point of its rect
+        """
+        return float(np.hypot(
+            max(
+                abs(sprite.rect.left - sprite.position.x),
+                abs(sprite.rect.right - sprite.position.x)
+            ),
+            max(
+                abs(sprite.rect.top - sprite.position.y),
+                abs(sprite.rect.bottom - sprite.position.y)
+            )
+        ))
+
     def get_entities_in_circle(
         self,
         center: Vec2,
-        radius: float
+        radius: float,
+        coalition: tp.Any = ...,
+        exclude_coalition: tp.Any = ...
     ) -> list[tuple[float, tp.Any]]:
         """
         get all entities inside a circle, sorted by distance (closest first)
+
+        uses the spatial index if it has been built, positions are the ones
+        from the last `rebuild_index` call
         """
-        return self.entities_in_circle(self.sprites(), center, radius)
+        results = []
+        for index in self._get_indexes():
+            results.extend(index.query_circle(
+                center.xy, radius, coalition, exclude_coalition
+            ))
+
+        results.sort(key=lambda r: r[0])
+
+        return [
+            result for result in results
+            # entities killed since the last rebuild
+            if result[1] in self
+        ]
+
+    def get_nearest_entities(
+        self,
+        center: Vec2,
+        k: int,
+        radius: float = np.inf,
+        coalition: tp.Any = ...,
+        exclude_coalition: tp.Any = ...
+    ) -> list[tuple[float, tp.Any]]:
+        """
+        get the k closest entities, sorted by distance (closest first)
+        """
+        results = []
+        for index in self._get_indexes():
+            results.extend(index.k_nearest(
+                center.xy, k, radius, coalition, exclude_coalition
+            ))
+
+        results.sort(key=lambda r: r[0])
+
+        return [result for result in results if result[1] in self][:k]
+
+    def _get_indexes(self) -> tuple[SpatialGrid, ...]:
+        """
+        the spatial indexes (dynamic and resting), or a temporary one
+        if they haven't been built yet
+        """
+        if self._index is ...:
+            index = SpatialGrid()
+            index.rebuild(self.sprites())
+            return (index,)
+
+        return self._index, self._static_index
 
 
 class _Bullets(_BaseGroup):
@@ -95,6 +234,12 @@ class _Drawn(_BaseGroup):
     ...
 
 
+class _Sleeping(_BaseGroup):
+    """
+    entities that are currently not updated (see `Entity.sleep`)
+    """
+
+
 class _Walls(_BaseGroup):
     ...
 
@@ -354,53 +499,126 @@ class _CollisionDestroyed(_BaseGroup):
 
         return pg.sprite.collide_rect(a, b)
 
+    @staticmethod
+    def find_candidates(sprites: list[tp.Any]) -> np.ndarray:
+        """
+        vectorised broadphase: rect overlap combined with the relation and
+        collision-layer filters
+
+        :returns: n x n bool matrix, true if sprite i and j collide
+        """
+        rects = np.array(
+            [
+                (
+                    sprite.rect.x,
+                    sprite.rect.y,
+                    sprite.rect.w,
+                    sprite.rect.h
+                ) for sprite in sprites
+            ],
+            dtype=np.float64
+        )
+        relations = np.array(
+            [
+                (
+                    sprite.id,
+                    sprite.owner_id,
+                    sprite.coalition_id,
+                    sprite.collision_layer,
+                    sprite.collision_mask,
+                    sprite.friendly_mask
+                ) for sprite in sprites
+            ],
+            dtype=np.int64
+        ).T
+
+        left, top = rects[:, 0], rects[:, 1]
+        right, bottom = left + rects[:, 2], top + rects[:, 3]
+
+        # same as pg.Rect.colliderect (empty rects never collide)
+        not_empty = (rects[:, 2] > 0) & (rects[:, 3] > 0)
+        overlap = (
+            (left[:, None] < right[None, :])
+            & (left[None, :] < right[:, None])
+            & (top[:, None] < bottom[None, :])
+            & (top[None, :] < bottom[:, None])
+            & not_empty[:, None] & not_empty[None, :]
+        )
+
+        return overlap & interaction_matrix(*relations, depth=2)
+
+    def find_resting_candidates(self, sprite) -> list[tp.Any]:
+        """
+        resting sprites `sprite` collides with (uses the resting index)
+        """
+        if self._index is ...:
+            self.rebuild_index()
+
+        elif self._static_dirty:
+            self._rebuild_static_index()
+
+        if not self._resting:
+            return []
+
+        return [
+            other for _, other in self._static_index.query_circle(
+                sprite.position.xy,
+                self.extent_of(sprite) + self._resting_extent
+            )
+            if sprite.rect.colliderect(other.rect)
+            and can_interact(sprite, other)
+        ]
+
     # @profile
     def update(self) -> None:
-        # calculated: list[set] = []
-        for sprite in CollisionDestroyed.sprites():
-            # calculated.append({sprite, sprite})
-            # ic(sprite.__class__.__name__, sprite.rect)
+        # resting sprites never collide with each other, so only moving
+        # sprites go through the broadphase
+        moving = [s for s in self.sprites() if s not in self._resting]
+        if not moving:
+            return
 
-            with suppress(AttributeError):
-                for other in self.sprites():
-                    sprite: tp.Any
-                    other: tp.Any
+        hits: dict[tp.Any, list[tp.Any]] = {}
 
-                    # if {sprite, other} not in calculated:
-                    if 1:
-                        if all([
-                            pg.sprite.collide_rect(sprite, other),
-                            # self.dynamic_collide(sprite, other),
-                            not is_related(sprite, other, 2)
-                        ]):
-                            try:
-                                dmg = other.damage
+        if len(moving) > 1:
+            candidates = self.find_candidates(moving)
 
-                            except AttributeError:
-                                dmg = 0
+            for i, sprite in enumerate(moving):
+                others = [moving[j] for j in np.flatnonzero(candidates[i])]
 
-                            sprite.hit(dmg, other)
+                if others:
+                    hits[sprite] = others
 
-                            with suppress(AttributeError):
-                                hp = other.hp
-                                if dmg != 0:
-                                    sprite.hit_someone(target_hp=hp)
+        for sprite in moving:
+            for other in self.find_resting_candidates(sprite):
+                hits.setdefault(sprite, []).append(other)
+                hits.setdefault(other, []).append(sprite)
+
+        for sprite, candidates in hits.items():
+            sprite: tp.Any
 
-                            # bullet is sprite
-                            try:
-                                dmg = sprite.damage
+            # only sprites that are still alive at this point
+            others = [other for other in candidates if other in self]
+
+            with suppress(AttributeError):
+                for other in others:
+                    other: tp.Any
 
-                            except AttributeError:
-                                dmg = 0
+                    dmg = getattr(other, "damage", 0)
+                    sprite.hit(dmg, other)
 
-                            other.hit(dmg, sprite)
+                    with suppress(AttributeError):
+                        hp = other.hp
+                        if dmg != 0:
+                            sprite.hit_someone(target_hp=hp)
 
-                            with suppress(AttributeError):
-                                hp = sprite.hp
-                                if dmg != 0:
-                                    other.hit_someone(target_hp=hp)
+                    # bullet is sprite
+                    dmg = getattr(sprite, "damage", 0)
+                    other.hit(dmg, sprite)
 
-                    # calculated.append({sprite, other})
+                    with suppress(AttributeError):
+                        hp = sprite.hp
+                        if dmg != 0:
+                            other.hit_someone(target_hp=hp)
 
     @staticmethod
     def size_collide(sprite1, sprite2) -> bool:
@@ -446,6 +664,7 @@ Players = _Players()
 Bullets = _Bullets()
 HasBars = _HasBars()
 Updated = _Updated()
+Sleeping = _Sleeping()
 WallBouncer = _WallBouncer()
 WallCollider = _WallCollider()
 GravityAffected = _GravityAffected()
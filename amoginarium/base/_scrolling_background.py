@@ -88,6 +88,20 @@ class ParalaxBackground:
             self._textures.append(texture)
             self._sizes.append((self._screen_width, self._screen_height))
 
+        # backgrounds are large, so they may be unloaded if unused
+        textures.on_evict(self._scope, self._on_evict)
+
+    def _on_evict(self) -> None:
+        """
+        textures have been freed, reload on next draw
+        """
+        self._textures.clear()
+        self._sizes.clear()
+
+    @property
+    def scope(self) -> str:
+        return self._scope
+
     @property
     def loaded(self) -> bool:
         """
@@ -134,6 +148,8 @@ class ParalaxBackground:
             self.load_textures()
             return self.draw(delta)
 
+        textures.touch(self._scope)
+
         for layer in range(n_layers, -1, -1):
             image_pos = self._position + 10 % self._screen_width
             image_pos *= self._multiplier**(n_layers-layer)
@@ -0,0 +1,292 @@
+"""
+_static_layer.py
+19. October 2026
+
+bakes things that never move into one texture per world chunk
+
+Author:
+Nilusink
+"""
+import pygame as pg
+import typing as tp
+import math as m
+
+from ..render_bindings import renderer
+from ._linked import global_vars
+from ..logic import Vec2
+from ._groups import Updated, Drawn
+
+
+type chunk_t = tuple[int, int]
+
+
+class StaticDecal(tp.TypedDict):
+    """
+    what is left of a released sprite (the mirror is part of the texture)
+    """
+    texture: int
+    position: Vec2  # top left, world
+    size: Vec2
+
+
+class _StaticChunk:
+    def __init__(self, origin: Vec2) -> None:
+        self.origin = origin
+        self.items: dict[tp.Any, None] = {}  # ordered set
+        self.decals: list[StaticDecal] = []
+
+        # items and decals that still have to be drawn onto the texture
+        self.pending: list[tp.Any | StaticDecal] = []
+        self.dirty = True
+        self.target: tp.Any = ...
+
+    def __bool__(self) -> bool:
+        return bool(self.items or self.decals)
+
+
+class _StaticLayer:
+    """
+    requires::
+
+        rect: pg.Rect  # world bounds
+        gl_draw() -> None
+    """
+    chunk_size: int = 1024
+
+    def __init__(self) -> None:
+        self._chunks: dict[chunk_t, _StaticChunk] = {}
+        self._item_chunks: dict[tp.Any, list[chunk_t]] = {}
+        self._was_drawn: set[tp.Any] = set()
+
+    def __contains__(self, item: tp.Any) -> bool:
+        return item in self._item_chunks
+
+    def __len__(self) -> int:
+        return len(self._item_chunks)
+
+    def _chunks_of(self, rect: pg.Rect) -> list[chunk_t]:
+        """
+        all chunks a rect overlaps
+        """
+        return [
+            (x, y)
+            for x in range(
+                rect.left // self.chunk_size,
+                (rect.right - 1) // self.chunk_size + 1
+            )
+            for y in range(
+                rect.top // self.chunk_size,
+                (rect.bottom - 1) // self.chunk_size + 1
+            )
+        ]
+
+    def _get_chunk(self, key: chunk_t) -> _StaticChunk:
+        if key not in self._chunks:
+            self._chunks[key] = _StaticChunk(Vec2.from_cartesian(
+                key[0] * self.chunk_size, key[1] * self.chunk_size
+            ))
+
+        return self._chunks[key]
+
+    def add(self, item: tp.Any) -> None:
+        """
+        bake an item into the static layer (removes it from `Drawn`)
+        """
+        if item in self:
+            return
+
+        chunks = self._chunks_of(item.rect)
+        self._item_chunks[item] = chunks
+
+        for key in chunks:
+            chunk = self._get_chunk(key)
+            chunk.items[item] = None
+            chunk.pending.append(item)
+
+        if item in Drawn:
+            self._was_drawn.add(item)
+            item.remove(Drawn)
+
+    def remove(self, item: tp.Any) -> None:
+        """
+        remove an item from the static layer
+        (is drawn normally again if it was before)
+        """
+        if item not in self:
+            return
+
+        for key in self._item_chunks.pop(item):
+            chunk = self._chunks[key]
+            del chunk.items[item]
+            self._invalidate(key)
+
+        if item in self._was_drawn:
+            self._was_drawn.discard(item)
+            item.add(Drawn)
+
+    def add_decal(self, texture: int, position: Vec2, size: Vec2) -> None:
+        """
+        bake a texture into the static layer, used for sprites that are
+        killed afterwards (settled casings)
+
+        :param position: top left corner (world)
+        """
+        decal: StaticDecal = {
+            "texture": texture,
+            "position": position.copy(),
+            "size": size.copy()
+        }
+
+        for key in self._chunks_of(pg.Rect(position.xy, size.xy)):
+            chunk = self._get_chunk(key)
+            chunk.decals.append(decal)
+            chunk.pending.append(decal)
+
+    def take_decals(self, center: Vec2, radius: float) -> list[StaticDecal]:
+        """
+        remove and return all decals whose center is inside the circle
+        (only the affected chunks are re-baked)
+        """
+        reach = pg.Rect(
+            center.x - radius, center.y - radius, 2 * radius, 2 * radius
+        )
+
+        taken: dict[int, StaticDecal] = {}
+        for key in self._chunks_of(reach):
+            chunk = self._chunks.get(key)
+
+            if chunk is None or not chunk.decals:
+                continue
+
+            keep = []
+            for decal in chunk.decals:
+                if (
+                    decal["position"] + decal["size"] / 2 - center
+                ).length <= radius:
+                    taken[id(decal)] = decal
+
+                else:
+                    keep.append(decal)
+
+            if len(keep) < len(chunk.decals):
+                chunk.decals = keep
+                self._invalidate(key)
+
+        # decals spanning multiple chunks
+        for decal in taken.values():
+            for key in self._chunks_of(
+                    pg.Rect(decal["position"].xy, decal["size"].xy)
+            ):
+                chunk = self._chunks.get(key)
+
+                if chunk is None:
+                    continue
+
+                keep = [other for other in chunk.decals if other is not decal]
+
+                if len(keep) < len(chunk.decals):
+                    chunk.decals = keep
+                    self._invalidate(key)
+
+        return list(taken.values())
+
+    def _invalidate(self, key: chunk_t) -> None:
+        """
+        re-bake a chunk after something was removed (or drop it if empty)
+        """
+        chunk = self._chunks[key]
+
+        if not chunk:
+            self._delete_chunk(key)
+            return
+
+        chunk.pending.clear()
+        chunk.dirty = True
+
+    def clear(self) -> None:
+        """
+        drop all items and free all textures
+        """
+        for key in list(self._chunks):
+            self._delete_chunk(key)
+
+        self._item_chunks.clear()
+        self._was_drawn.clear()
+
+    def _delete_chunk(self, key: chunk_t) -> None:
+        chunk = self._chunks.pop(key)
+
+        if chunk.target is not ...:
+            renderer.delete_render_target(chunk.target)
+
+    def _bake(self, chunk: _StaticChunk) -> None:
+        """
+        draw all new items (or everything if dirty) onto the chunk texture
+        """
+        if chunk.target is ...:
+            chunk.target = renderer.create_render_target(
+                global_vars.translate_scale(
+                    Vec2.from_cartesian(self.chunk_size, self.chunk_size)
+                )
+            )
+            chunk.dirty = True
+
+        entries = [*chunk.items, *chunk.decals] if chunk.dirty \
+            else chunk.pending
+
+        # items draw relative to the world position, so move the world
+        # to the chunk origin while baking
+        world_position = Updated.world_position
+        background_position = global_vars.background_position
+        Updated.world_position = chunk.origin.copy()
+        global_vars.background_position = chunk.origin.x
+
+        renderer.begin_render_target(chunk.target, clear=chunk.dirty)
+
+        try:
+            for entry in entries:
+                if isinstance(entry, dict):
+                    renderer.draw_textured_quad(
+                        entry["texture"],
+                        entry["position"] - Updated.world_position,
+                        entry["size"]
+                    )
+
+                else:
+                    entry.gl_draw()
+
+        finally:
+            renderer.end_render_target()
+            Updated.world_position = world_position
+            global_vars.background_position = background_position
+
+        chunk.pending.clear()
+        chunk.dirty = False
+
+    def gl_draw(self) -> None:
+        """
+        draw all visible chunks (baking them if necessary)
+        """
+        view_size = global_vars.screen_size / global_vars.pixel_per_meter
+        view = pg.Rect(
+            Updated.world_position.xy,
+            (m.ceil(view_size.x), m.ceil(view_size.y))
+        )
+
+        for key in self._chunks_of(view):
+            chunk = self._chunks.get(key)
+
+            if chunk is None:
+                continue
+
+            if chunk.dirty or chunk.pending:
+                self._bake(chunk)
+
+            renderer.draw_render_target(
+                chunk.target,
+                chunk.origin - Updated.world_position,
+                (self.chunk_size, self.chunk_size)
+            )
+
+
+static_layer = _StaticLayer()
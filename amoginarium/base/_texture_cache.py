@@ -0,0 +1,223 @@
+"""
+_texture_cache.py
+19. October 2026
+
+on-disk cache for prepared (resized, flipped, RGBA) texture data
+
+Author:
+Nilusink
+"""
+from contextlib import suppress
+from hashlib import blake2b
+import numpy as np
+import typing as tp
+import struct
+import mmap
+import os
+
+from ..debugging import print_ic_style, get_fg_color
+
+
+# width, height
+_HEADER = struct.Struct("<II")
+
+
+def hash_source(data: bytes) -> str:
+    """
+    hash of an images source file (used as part of the cache key)
+    """
+    return blake2b(data, digest_size=16).hexdigest()
+
+
+class TextureCache:
+    debug: int = 1
+
+    # entries that weren't used for the longest time are removed by
+    # `prune` once the cache gets bigger than this (bytes)
+    max_size: int = 1024 * 2**20
+
+    def __init__(self, path: str = ".texture_cache") -> None:
+        self._path = path
+        self._sources: set[str] | None = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @staticmethod
+    def make_key(
+            source_hash: str,
+            size: tuple[int, int] | None,
+            mirror: str,
+            tag: str = ""
+    ) -> str:
+        """
+        build a cache key from the source hash and the load parameters
+
+        :param tag: should differ for different texture layouts
+            (e.g. the renderer name)
+        """
+        size_key = "none" if size is None else f"{size[0]}x{size[1]}"
+        mirror_key = "".join(sorted(set(mirror))) or "n"
+
+        return f"{source_hash}_{size_key}_{mirror_key}_{tag}"
+
+    def has_source(self, source_hash: str) -> bool:
+        """
+        true if any texture of this source has been cached
+        (the directory is only listed once)
+        """
+        if self._sources is None:
+            self._sources = set()
+
+            if os.path.isdir(self._path):
+                self._sources.update(
+                    file.split("_")[0] for file in os.listdir(self._path)
+                    if file.endswith(".rgba")
+                )
+
+        return source_hash in self._sources
+
+    def _file_of(self, key: str) -> str:
+        return os.path.join(self._path, key + ".rgba")
+
+    def get(self, key: str) -> tuple[np.ndarray, tuple[int, int]] | None:
+        """
+        memory-map a cached texture
+
+        :returns: pixel data, (width, height) or None if not cached
+        """
+        file = self._file_of(key)
+
+        if not os.path.isfile(file):
+            self.misses += 1
+            return None
+
+        if os.path.getsize(file) < _HEADER.size:
+            self.invalidate(key)
+            self.misses += 1
+            return None
+
+        with open(file, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        width, height = _HEADER.unpack_from(mapped)
+
+        # incomplete or corrupted entry
+        if len(mapped) != _HEADER.size + width * height * 4:
+            mapped.close()
+            self.invalidate(key)
+            self.misses += 1
+            return None
+
+        # the modification time marks when an entry was last used
+        with suppress(OSError):
+            os.utime(file)
+
+        self.hits += 1
+        data = np.frombuffer(mapped, dtype=np.uint8, offset=_HEADER.size)
+
+        return data, (width, height)
+
+    def put(
+            self,
+            key: str,
+            data: tp.Any,
+            size: tuple[int, int]
+    ) -> None:
+        """
+        store prepared texture data
+        """
+        try:
+            os.makedirs(self._path, exist_ok=True)
+
+            # write to a temporary file first, so a crash can't leave
+            # a half-written entry behind
+            file = self._file_of(key)
+            with open(file + ".tmp", "wb") as f:
+                f.write(_HEADER.pack(*size))
+                f.write(data)
+
+            os.replace(file + ".tmp", file)
+
+            if self._sources is not None:
+                self._sources.add(key.split("_")[0])
+
+        # the cache is optional
+        except OSError as e:
+            if self.debug:
+                print_ic_style(
+                    f"{get_fg_color(31)}unable to cache texture "
+                    f"{get_fg_color(36)}\"{key}\"{get_fg_color(247)}: {e}"
+                )
+
+    def invalidate(self, key: str) -> None:
+        """
+        remove a single entry
+        """
+        with suppress(OSError):
+            os.remove(self._file_of(key))
+
+    def prune(self, max_size: int | None = None) -> int:
+        """
+        remove the least recently used entries until the cache is smaller
+        than `max_size` (default: `TextureCache.max_size`)
+
+        :returns: number of removed entries
+        """
+        max_size = self.max_size if max_size is None else max_size
+
+        if not os.path.isdir(self._path):
+            return 0
+
+        entries: list[tuple[float, int, str]] = []
+        for file in os.listdir(self._path):
+            path = os.path.join(self._path, file)
+
+            with suppress(OSError):
+                # left behind by a crash
+                if file.endswith(".rgba.tmp"):
+                    os.remove(path)
+
+                elif file.endswith(".rgba"):
+                    stat = os.stat(path)
+                    entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+
+        # oldest first
+        for _, size, path in sorted(entries):
+            if total <= max_size:
+                break
+
+            with suppress(OSError):
+                os.remove(path)
+                total -= size
+                removed += 1
+
+        if removed:
+            self._sources = None
+
+            if self.debug:
+                print_ic_style(
+                    f"removed {get_fg_color(36)}{removed}{get_fg_color(247)}"
+                    f" unused textures from the cache"
+                )
+
+        return removed
+
+    def clear(self) -> None:
+        """
+        remove all cached textures
+        """
+        self._sources = None
+
+        if not os.path.isdir(self._path):
+            return
+
+        for file in os.listdir(self._path):
+            if file.endswith(".rgba") or file.endswith(".tmp"):
+                os.remove(os.path.join(self._path, file))
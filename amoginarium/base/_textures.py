@@ -8,15 +8,21 @@ Author:
 Nilusink
 """
 from ..debugging import print_ic_style, get_fg_color
-from ..logic import coord_t, convert_coord
+from ..logic import coord_t, convert_coord, AssetPack
 from ..render_bindings import renderer
+from ._texture_cache import TextureCache, hash_source
+from contextlib import suppress
+from time import perf_counter
 from PIL import Image
 import typing as tp
 import zipfile
+import json
+import io
 import os
 
 
 type mirror_t = tp.Literal["x", "y", "xy", "yx"]
+type texture_key_t = tuple[str, tuple[int, int] | None, str]
 
 
 class Texture(tp.TypedDict):
@@ -24,75 +30,255 @@ class Texture(tp.TypedDict):
     size: tuple[int, int]
     mirror: mirror_t
     id: int
+    bytes: int
 
 
 class FileImage(tp.TypedDict):
-    image: Image.Image
+    image: Image.Image | None  # None once uploaded or evicted
     name: str
+    source_hash: str
+    path: str  # zip file or directory
+    file: str  # file inside path
+    pack: AssetPack | None  # baked variants
+
+
+class ScopeMemory(tp.TypedDict):
+    loaded: bool
+    n_textures: int
+    vram: int
+    n_raw_images: int
+    ram: int
+    last_used: float
+
+
+def mirror_key(mirror: str) -> str:
+    """
+    normalised mirror string ("yx" and "xy" are the same)
+    """
+    return "".join(sorted(set(mirror)))
 
 
 class _Textures:
     _raw_images: dict[str, dict[str, FileImage]]
-    _textures: dict[str, list[Texture]]
+    _textures: dict[str, dict[texture_key_t, Texture]]
     debug: int = 1
 
+    # memory budgets in bytes
+    vram_budget: int = 512 * 2**20
+    ram_budget: int = 256 * 2**20
+
+    # baked packs (see bake_assets.py) and the variants requested
+    # by the game (used by the baker)
+    pack_dir: str | None = "assets/baked"
+    variants_file: str = ".texture_cache/variants.json"
+
     def __init__(self) -> None:
         self._raw_images = {}
         self._textures = {}
+        self.cache: TextureCache | None = TextureCache()
 
-    def load_images(self, path: str) -> None:
+        # registered, but not loaded yet (scope: path / names)
+        self._lazy_scopes: dict[str, str] = {}
+        self._lazy_names: dict[str, set[str]] = {}
+
+        self._scope_used: dict[str, float] = {}
+        self._on_evict: dict[str, list[tp.Callable[[], tp.Any]]] = {}
+
+        # name: first scope containing it
+        self._name_index: dict[str, str] = {}
+        self._lazy_name_index: dict[str, str] = {}
+
+        # every variant loaded so far (kept after eviction)
+        self._requested: dict[str, set[texture_key_t]] = {}
+
+        # lookup counters (for profiling)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _list_files(path: str) -> tuple[str, list[str]]:
         """
-        load all textures from a zip file or a directory
+        list all images in a zip file or a directory
+
+        :returns: scope, file names
         """
         if not os.path.exists(path):
             raise FileNotFoundError(f"{path} doesn't exist!")
 
-        is_zip = os.path.isfile(path)
-
         path = path.rstrip("/")
 
-        if is_zip:
-            imgzip = zipfile.ZipFile(path)
-            files = sorted(imgzip.infolist(), key=lambda f: f.filename)
+        if os.path.isfile(path):
+            with zipfile.ZipFile(path) as imgzip:
+                files = sorted(f.filename for f in imgzip.infolist())
+
             scope = path.split(".")[0].split("/")[-1]
 
         else:
             files = sorted(os.listdir(path))
             scope = path.split("/")[-1]
 
+        return scope, [
+            f for f in files if f.split(".")[-1].lower() in ("png", "jpg")
+        ]
+
+    @staticmethod
+    def _read_file(path: str, file: str) -> bytes:
+        """
+        read a single file from a zip file or a directory
+        """
+        path = path.rstrip("/")
+
+        if os.path.isfile(path):
+            with zipfile.ZipFile(path) as imgzip:
+                return imgzip.read(file)
+
+        with open(path + "/" + file, "rb") as f:
+            return f.read()
+
+    def register_scope(self, path: str) -> str:
+        """
+        make a scope known without loading it,
+        it is loaded on the first `get_texture`
+
+        :returns: the scope name
+        """
+        scope, files = self._list_files(path)
+
+        if scope not in self._raw_images:
+            self._lazy_scopes[scope] = path
+            self._lazy_names[scope] = set(f.split(".")[-2] for f in files)
+
+            for name in self._lazy_names[scope]:
+                self._lazy_name_index.setdefault(name, scope)
+
+        return scope
+
+    def _ensure_scope(self, scope: str) -> None:
+        """
+        load a lazy scope if it hasn't been loaded yet
+        """
+        if scope in self._lazy_scopes:
+            self.load_images(self._lazy_scopes[scope])
+
+    def _unregister_lazy(self, scope: str) -> None:
+        self._lazy_scopes.pop(scope, None)
+
+        for name in self._lazy_names.pop(scope, ()):
+            if self._lazy_name_index.get(name) != scope:
+                continue
+
+            # fall back to the next lazy scope containing the name
+            del self._lazy_name_index[name]
+            for s, names in self._lazy_names.items():
+                if name in names:
+                    self._lazy_name_index[name] = s
+                    break
+
+    def _find_scope(self, name: str) -> str | None:
+        """
+        find the first scope containing `name` (loaded scopes first)
+        """
+        scope = self._name_index.get(name)
+
+        if scope is None:
+            return self._lazy_name_index.get(name)
+
+        return scope
+
+    def load_images(self, path: str) -> None:
+        """
+        load all textures from a zip file or a directory
+        """
+        self.add_images(*self.read_images(path))
+
+    def read_images(self, path: str) -> tuple[str, list[FileImage]]:
+        """
+        read (and decode) all images from a zip file or a directory
+        without registering them (thread safe)
+
+        :returns: scope, images
+        """
+        scope, files = self._list_files(path)
+
         if self.debug >= 2:
             print_ic_style(f"loading texture scope "
                            f"{get_fg_color(36)}\"{scope}\"")
 
-        for f in files:
-            parts = (f.filename if is_zip else f).split(".")
-            ending = parts[-1]
-            filename = parts[-2]
+        pack = AssetPack.open(
+            self.pack_dir,
+            "images",
+            scope,
+            path,
+            renderer.__class__.__name__
+        )
 
-            # only load images
-            if ending.lower() not in ("png", "jpg"):
-                continue
+        # baked, images are only read if a variant is missing
+        if pack is not None:
+            return scope, [
+                {
+                    "name": image["name"],
+                    "image": None,
+                    "source_hash": image["source_hash"],
+                    "path": path,
+                    "file": image["file"],
+                    "pack": pack
+                } for image in pack.manifest["images"]
+            ]
+
+        imgzip = zipfile.ZipFile(path) if os.path.isfile(path) else None
+
+        images: list[FileImage] = []
+        for f in files:
+            filename = f.split(".")[-2]
 
             if self.debug >= 2:
                 print_ic_style(
                     f"- texture: {get_fg_color(36)}\"{filename}\""
                 )
 
-            if is_zip:
-                file = imgzip.open(f)
+            if imgzip is not None:
+                data = imgzip.read(f)
 
             else:
-                file = path + "/" + f
+                data = self._read_file(path, f)
 
-            img = Image.open(file)
+            # decoding is lazy, so cached textures never get decoded
+            img = Image.open(io.BytesIO(data))
+            source_hash = hash_source(data)
 
-            if scope not in self._raw_images:
-                self._raw_images[scope] = {}
+            if self.cache is None or not self.cache.has_source(source_hash):
+                img.load()
 
-            self._raw_images[scope][filename] = {
+            images.append({
                 "name": filename,
-                "image": img
-            }
+                "image": img,
+                "source_hash": source_hash,
+                "path": path,
+                "file": f,
+                "pack": None
+            })
+
+        if imgzip is not None:
+            imgzip.close()
+
+        return scope, images
+
+    def add_images(self, scope: str, images: list[FileImage]) -> None:
+        """
+        register images returned by `read_images`
+        """
+        # loaded explicitly, so no longer lazy
+        self._unregister_lazy(scope)
+
+        if scope not in self._raw_images:
+            self._raw_images[scope] = {}
+
+        for image in images:
+            self._raw_images[scope][image["name"]] = image
+            self._name_index.setdefault(image["name"], scope)
+
+        self._touch(scope)
+        self._enforce_budgets(keep=scope)
 
         if self.debug:
             print_ic_style(
@@ -105,34 +291,26 @@ class _Textures:
             self,
             name: str,
             mirror: str,
-            size: tuple | None,
+            size: tuple[int, int] | None,
             scope: str | None = None
     ) -> Texture | None:
         """
         returns a texture if it already exists
         """
-        if scope not in self._textures:
-            return None
+        if scope is None:
+            scope = self._name_index.get(name)
 
-        for scope in self._raw_images if scope is None else [scope]:
-            for texture in self._textures[scope]:
-                if texture["size"] is None:
-                    is_same_size = size is None
-
-                elif size is None:
-                    is_same_size = False
+        texture = self._textures.get(scope, {}).get(
+            (name, size, mirror_key(mirror))
+        )
 
-                else:
-                    is_same_size = set(texture["size"]) == set(size)
+        if texture is None:
+            self.misses += 1
 
-                if all([
-                    texture["name"] == name,
-                    set(texture["mirror"]) == set(mirror),
-                    is_same_size
-                ]):
-                    return Texture
+        else:
+            self.hits += 1
 
-        return None
+        return texture
 
     def get_texture(
             self,
@@ -150,9 +328,12 @@ class _Textures:
         texture = self._check_texture(name, mirror, size, scope)
 
         if texture is not None:
+            self._touch(scope or self._name_index[name])
             return texture["id"], texture["size"]
 
         if scope is not None:
+            self._ensure_scope(scope)
+
             if scope not in self._raw_images:
                 raise ValueError(f"scope \"{scope}\" not found")
 
@@ -160,38 +341,104 @@ class _Textures:
                 raise ValueError(f"\"{name}\" not found in scope \"{scope}\"")
 
         else:
-            for s in self._raw_images:
-                if name in self._raw_images[s]:
-                    if self.debug >= 3:
-                        print_ic_style(
-                            f"{get_fg_color(36)}\"{name}\"{get_fg_color(247)} "
-                            f"found in scope {get_fg_color(36)}\"{s}\""
-                        )
-
-                    scope = s
-                    break
+            scope = self._find_scope(name)
 
-            else:
+            if scope is None:
                 raise ValueError(f"\"{name}\" not found in any loaded scope")
 
-        texture, size = renderer.load_texture(
-            image=self._raw_images[scope][name]["image"],
-            size=size,
-            mirror=mirror
-        )
+            if self.debug >= 3:
+                print_ic_style(
+                    f"{get_fg_color(36)}\"{name}\"{get_fg_color(247)} "
+                    f"found in scope {get_fg_color(36)}\"{scope}\""
+                )
+
+            self._ensure_scope(scope)
+
+        image = self._raw_images[scope][name]
+        key = (name, size, mirror_key(mirror))
+        texture, size = self._load_texture(image, size, mirror)
+
+        # the raw image can be re-read from the source if needed
+        image["image"] = None
 
         if scope not in self._textures:
-            self._textures[scope] = []
+            self._textures[scope] = {}
 
-        self._textures[scope].append({
+        self._requested.setdefault(scope, set()).add(key)
+        self._textures[scope][key] = {
             "id": texture,
             "mirror": mirror,
             "name": name,
-            "size": size
-        })
+            "size": size,
+            "bytes": size[0] * size[1] * 4
+        }
+
+        self._touch(scope)
+        self._enforce_budgets(keep=scope)
 
         return texture, size
 
+    def _get_image(self, image: FileImage) -> Image.Image:
+        """
+        the decoded image (re-read from the source if it was dropped)
+        """
+        if image["image"] is None:
+            data = self._read_file(image["path"], image["file"])
+            image["image"] = Image.open(io.BytesIO(data))
+
+        return image["image"]
+
+    def _load_texture(
+            self,
+            image: FileImage,
+            size: tuple[int, int] | None,
+            mirror: mirror_t
+    ) -> tuple[int, tuple[int, int]]:
+        """
+        upload a texture, using the baked pack or the on-disk cache
+        if possible
+        """
+        if image["pack"] is not None:
+            packed = image["pack"].get_texture(
+                image["name"], size, mirror_key(mirror)
+            )
+
+            if packed is not None:
+                return renderer.upload_texture(*packed), packed[1]
+
+        if self.cache is None:
+            return renderer.load_texture(
+                image=self._get_image(image),
+                size=size,
+                mirror=mirror
+            )
+
+        key = self.cache.make_key(
+            image["source_hash"],
+            size,
+            mirror,
+            renderer.__class__.__name__
+        )
+        cached = self.cache.get(key)
+
+        if cached is not None:
+            if self.debug >= 3:
+                print_ic_style(
+                    f"cached texture {get_fg_color(36)}\"{image["name"]}\""
+                )
+
+            data, size = cached
+
+        else:
+            data, size = renderer.prepare_texture(
+                image=self._get_image(image),
+                size=size,
+                mirror=mirror
+            )
+            self.cache.put(key, data, size)
+
+        return renderer.upload_texture(data, size), size
+
     def get_all_from_scope(
             self,
             scope: str,
@@ -201,6 +448,8 @@ class _Textures:
         """
         get all textures from a scope
         """
+        self._ensure_scope(scope)
+
         if scope not in self._raw_images:
             raise ValueError(f"scope \"{scope}\" not found")
 
@@ -225,5 +474,159 @@ class _Textures:
 
         return out
 
+    def touch(self, scope: str) -> None:
+        """
+        mark a scope as used (call if its textures are used without
+        calling `get_texture`, e.g. every frame)
+        """
+        self._touch(scope)
+
+    def _touch(self, scope: str | None) -> None:
+        if scope is not None:
+            self._scope_used[scope] = perf_counter()
+
+    def on_evict(self, scope: str, callback: tp.Callable[[], tp.Any]) -> None:
+        """
+        allow a scopes textures to be evicted if the vram budget is
+        exceeded, `callback` is called after eviction (the texture ids
+        are invalid from then on and have to be requested again)
+        """
+        if scope not in self._on_evict:
+            self._on_evict[scope] = []
+
+        self._on_evict[scope].append(callback)
+
+    def evict_scope(self, scope: str) -> None:
+        """
+        free all textures and raw images of a scope
+        (it will be loaded again on demand)
+        """
+        if self.debug:
+            print_ic_style(
+                f"evicting texture scope {get_fg_color(36)}\"{scope}\""
+            )
+
+        for texture in self._textures.pop(scope, {}).values():
+            renderer.delete_texture(texture["id"])
+
+        self._drop_raw_images(scope)
+
+        for callback in self._on_evict.pop(scope, []):
+            callback()
+
+    def _drop_raw_images(self, scope: str) -> None:
+        for image in self._raw_images.get(scope, {}).values():
+            image["image"] = None
+
+    @staticmethod
+    def _raw_size(image: FileImage) -> int:
+        if image["image"] is None:
+            return 0
+
+        return image["image"].width * image["image"].height * 4
+
+    def _scope_vram(self, scope: str) -> int:
+        return sum(
+            t["bytes"] for t in self._textures.get(scope, {}).values()
+        )
+
+    def _scope_ram(self, scope: str) -> int:
+        return sum(
+            self._raw_size(i) for i in self._raw_images.get(scope, {}).values()
+        )
+
+    def _enforce_budgets(self, keep: str | None = None) -> None:
+        """
+        evict the least recently used scopes until both budgets are met
+
+        :param keep: never evict this scope
+        """
+        def lru(scopes: tp.Iterable[str]) -> list[str]:
+            return sorted(
+                (s for s in scopes if s != keep),
+                key=lambda s: self._scope_used.get(s, 0)
+            )
+
+        # only scopes that can reload their textures are evicted
+        vram = sum(self._scope_vram(s) for s in self._textures)
+        for scope in lru(s for s in self._on_evict if s in self._textures):
+            if vram <= self.vram_budget:
+                break
+
+            vram -= self._scope_vram(scope)
+            self.evict_scope(scope)
+
+        # raw images can always be re-read from their source
+        ram = sum(self._scope_ram(s) for s in self._raw_images)
+        for scope in lru(self._raw_images):
+            if ram <= self.ram_budget:
+                break
+
+            ram -= self._scope_ram(scope)
+            self._drop_raw_images(scope)
+
+    def memory_report(self) -> dict[str, ScopeMemory]:
+        """
+        memory used by each scope (in bytes)
+        """
+        report: dict[str, ScopeMemory] = {}
+        for scope in [*self._raw_images, *self._lazy_scopes]:
+            report[scope] = {
+                "loaded": scope in self._raw_images,
+                "n_textures": len(self._textures.get(scope, {})),
+                "vram": self._scope_vram(scope),
+                "n_raw_images": sum(
+                    i["image"] is not None
+                    for i in self._raw_images.get(scope, {}).values()
+                ),
+                "ram": self._scope_ram(scope),
+                "last_used": self._scope_used.get(scope, 0)
+            }
+
+        if self.debug:
+            for scope, usage in report.items():
+                print_ic_style(
+                    f"- scope {get_fg_color(36)}\"{scope}\""
+                    f"{get_fg_color(247)}: "
+                    f"vram {get_fg_color(37)}{usage["vram"] / 2**20:.1f}MB"
+                    f"{get_fg_color(247)} ({usage["n_textures"]}), "
+                    f"ram {get_fg_color(37)}{usage["ram"] / 2**20:.1f}MB"
+                    f"{get_fg_color(247)} ({usage["n_raw_images"]})"
+                    + ("" if usage["loaded"] else " (not loaded)")
+                )
+
+        return report
+
+    def save_variants(self) -> None:
+        """
+        add all requested (size, mirror) variants to `variants_file`
+        """
+        variants: dict[str, list] = {}
+        with suppress(OSError, ValueError):
+            with open(self.variants_file, "r") as f:
+                variants = json.load(f)
+
+        for scope, requested in self._requested.items():
+            known = variants.setdefault(scope, [])
+
+            for name, size, mirror in requested:
+                variant = [name, None if size is None else list(size), mirror]
+
+                if variant not in known:
+                    known.append(variant)
+
+        try:
+            os.makedirs(os.path.dirname(self.variants_file), exist_ok=True)
+
+            with open(self.variants_file, "w") as f:
+                json.dump(variants, f, indent=1)
+
+        except OSError as e:
+            if self.debug:
+                print_ic_style(
+                    f"{get_fg_color(31)}unable to save texture variants"
+                    f"{get_fg_color(247)}: {e}"
+                )
+
 
 textures = _Textures()
@@ -1 +1,5 @@
-from ._tcp_server import TCPServer
\ No newline at end of file
+from ._tcp_server import TCPServer, ServerStats
+from ._amogistick_client import SessionStats
+from ._udp_server import UDPServer
+from ._feedback import FeedbackQueue, FeedbackStats
+from ._spectator import SpectatorPublisher
@@ -9,14 +9,16 @@ melektron
 """
 
 import asyncio
-import collections
 import dataclasses
 from icecream import ic
-import queue
+import socket
 import struct
+import typing as tp
 import time
 import enum
 from ..controllers._amogistick_controller import AmogistickController
+from ..logic import SimpleLock
+from ._feedback import FeedbackQueue, FeedbackStats
 
 
 msg_identify_struct = struct.Struct(">20s")
@@ -26,8 +28,12 @@ class MsgIdentify:
 
     @classmethod
     def from_bytes(cls, data: bytes) -> "MsgIdentify":
+        return cls.unpack_from(data, 0)
+
+    @classmethod
+    def unpack_from(cls, buffer, offset: int) -> "MsgIdentify":
         # grab all bytes from string until the null terminator and convert to string
-        id_bytes: bytes = msg_identify_struct.unpack(data)[0]
+        id_bytes: bytes = msg_identify_struct.unpack_from(buffer, offset)[0]
         return cls(id_bytes.split(bytes([0]))[0].decode())
         
 
@@ -46,6 +52,18 @@ class MsgUpdate:
         return cls(*msg_update_struct.unpack(data))
 
 
+# UDP update datagram: b"u", identifier, sequence number, client time (ms), MsgUpdate
+msg_datagram_struct = struct.Struct(">20sII")
+datagram_size = 1 + msg_datagram_struct.size + msg_update_struct.size
+
+
+def serial_diff(a: int, b: int) -> int:
+    """
+    a - b for wrapping 32 bit counters (sequence numbers, timestamps)
+    """
+    return (a - b + 2**31) % 2**32 - 2**31
+
+
 class AnimCode(enum.Enum):
     INACTIVE = 0
     STATIC = 1
@@ -84,126 +102,494 @@ class MsgAnimCmd:
         )
 
 
-class AmogistickClient:
+CMD_IDENTIFY = ord("i")
+CMD_UPDATE = ord("u")
+
+
+class SessionStats(tp.TypedDict):
+    identifier: str | None
+    peer: tuple[str, int] | None
+    connected_for: float  # s
+    idle_for: float  # s since the last received message
+    bytes_in: int
+    bytes_out: int
+    messages_in: int
+    messages_out: int
+    udp_received: int
+    udp_stale: int
+    dropped: int  # outgoing, buffer full
 
-    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+
+class AmogistickClient(asyncio.BufferedProtocol):
+    """
+    one connected amogistick
+
+    received data is written directly into a reusable buffer by the
+    transport, outgoing messages are collected (from any thread) and
+    written once per event loop iteration
+
+    LED feedback is merged per animation layer and rate-limited
+    (see `FeedbackQueue`)
+    """
+    # max. bytes received per wakeup
+    read_size = 4096
+    # max. bytes waiting to be sent, further messages are dropped
+    max_pending = 4096
+    # max. seconds a UDP update may arrive later than the fastest one, older ones are dropped
+    max_udp_delay = .1
+    # window (s) the client clock offset is re-estimated in (compensates clock drift)
+    udp_sync_window = 5
+    # feedback commands per second, per layer (default: FeedbackQueue.max_rate)
+    feedback_rates: dict[int, float] = {
+        3: 5,  # heal, may flip every tick
+    }
+
+    def __init__(
+            self,
+            on_close: tp.Callable[["AmogistickClient"], None] = ...,
+            on_identify: tp.Callable[["AmogistickClient"], None] = ...
+    ) -> None:
         super().__init__()
-        self._reader = reader
-        self._writer = writer
+        self._transport: asyncio.Transport = None
+        self._loop: asyncio.AbstractEventLoop = None
+        self._on_close = on_close
+        self._on_identify = on_identify
         self._controller: AmogistickController = None
+        # feedback callbacks this client set on its controller
+        self._callbacks: dict[str, tp.Callable] = {}
+
+        # session
+        self._peer: tuple[str, int] = None
+        self._connected_at = time.perf_counter()
+        self._last_received = self._connected_at
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.messages_in = 0
+        self.messages_out = 0
+
+        # received bytes, only the first `_length` are valid
+        self._buffer = bytearray(self.read_size)
+        self._length = 0
+
+        # outgoing messages
+        self._pending = bytearray()
+        self._pending_lock = SimpleLock()
+        self._pending_messages = 0
+        self._flush_scheduled = False
+        self._paused = False
+        self.n_dropped = 0
 
-        self._in_timeout = False
-        self._is_closed = False
+        # LED feedback, sent once its layer may be updated again
+        self._feedback = FeedbackQueue(self.feedback_rates)
+        self._feedback_timer: asyncio.TimerHandle = None
 
-    async def run(self) -> None:
+        # UDP input, once a datagram was accepted TCP updates are ignored
+        self._udp_active = False
+        self._udp_seq = 0
+        # server time, client timestamp of the fastest datagram
+        self._udp_ref: tuple[float, int] = None
+        self._udp_window_start = 0.0
+        self._udp_window_min = 0.0
+        self.n_udp_received = 0
+        self.n_udp_stale = 0
+
+    def _identify(self, msg: MsgIdentify) -> None:
         """
-        processes communication
+        link the client to its controller
         """
-        measure_span = 10
-        times = collections.deque([time.perf_counter()] * measure_span, measure_span)
+        if self._controller is not None:
+            ic(f"Warning: repeated Identity message received ({len(msg.identifier)}b): {msg.identifier}")
+            return
 
-        try:
-            # first complete the identification procedure
-            if chr((await self._reader.readexactly(1))[0]) != "i":
+        ic(f"Identity ({len(msg.identifier)}b): {msg.identifier}")
+
+        # create or get the controller (re-binds it after a reconnect)
+        self._controller = AmogistickController.get(msg.identifier)
+        self._bind()
+
+        # reset all currently running controller animations
+        self.send_feedback(MsgAnimCmd(0, AnimCode.INACTIVE, (0, 0, 0), (0, 0, 0), 0, 0, False))
+        self.send_feedback(MsgAnimCmd(1, AnimCode.INACTIVE, (0, 0, 0), (0, 0, 0), 0, 0, False))
+        self.send_feedback(MsgAnimCmd(2, AnimCode.INACTIVE, (0, 0, 0), (0, 0, 0), 0, 0, False))
+        self.send_feedback(MsgAnimCmd(3, AnimCode.INACTIVE, (0, 0, 0), (0, 0, 0), 0, 0, False))
+
+        if self._on_identify is not ...:
+            self._on_identify(self)
+
+    def _bind(self) -> None:
+        """
+        link the controllers animation callbacks to this client
+        """
+        self._callbacks = {}
+        self._callbacks["on_feedback_hit"] = lambda: self.send_feedback(MsgAnimCmd(
+            0, 
+            AnimCode.FLASH, 
+            (255, 0, 0), 
+            (0, 0, 0),
+            8, 
+            0,
+            False
+        ))
+        self._callbacks["on_feedback_shoot"] = lambda: self.send_feedback(MsgAnimCmd(
+            1, 
+            AnimCode.FLASH, 
+            (0, 0, 255), 
+            (0, 0, 0),
+            2, 
+            0,
+            False
+        ))
+        self._callbacks["on_feedback_heal_start"] = lambda: self.send_feedback(MsgAnimCmd(
+            3, 
+            AnimCode.CYCLIC_FADE, 
+            (0, 0, 0),
+            (40, 180, 0),
+            60,
+            200,
+            True
+        ))
+        self._callbacks["on_feedback_heal_stop"] = lambda: self.send_feedback(MsgAnimCmd(
+            3, 
+            AnimCode.INACTIVE, 
+            (0, 0, 0), 
+            (0, 0, 0),
+            0, 
+            0,
+            False
+        ))
+
+        for name, callback in self._callbacks.items():
+            setattr(self._controller, name, callback)
+
+    def _unbind(self) -> None:
+        """
+        remove this clients callbacks from the controller, unless a newer
+        connection of the same controller already replaced them
+        """
+        if self._controller is None:
+            return
+
+        for name, callback in self._callbacks.items():
+            if getattr(self._controller, name) is callback:
+                setattr(self._controller, name, ...)
+
+        self._callbacks = {}
+
+    @property
+    def identifier(self) -> str | None:
+        if self._controller is None:
+            return None
+
+        return self._controller.id
+
+    @property
+    def peer_host(self) -> str | None:
+        if self._transport is None:
+            return None
+
+        return self._peer[0]
+
+    def idle_for(self, now: float = ...) -> float:
+        """
+        seconds since the last message was received (TCP or UDP)
+        """
+        now = time.perf_counter() if now is ... else now
+        return now - self._last_received
+
+    def stats(self) -> SessionStats:
+        now = time.perf_counter()
+
+        return {
+            "identifier": self.identifier,
+            "peer": self._peer,
+            "connected_for": now - self._connected_at,
+            "idle_for": self.idle_for(now),
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "messages_in": self.messages_in,
+            "messages_out": self.messages_out,
+            "udp_received": self.n_udp_received,
+            "udp_stale": self.n_udp_stale,
+            "dropped": self.n_dropped
+        }
+
+    def _udp_lateness(self, timestamp: int, now: float) -> float:
+        """
+        how much later than the fastest datagram this one arrived (s)
+        """
+        if self._udp_ref is None:
+            self._udp_ref = (now, timestamp)
+            self._udp_window_start = now
+            self._udp_window_min = 0.0
+
+        ref_now, ref_timestamp = self._udp_ref
+        lateness = (now - ref_now) - serial_diff(timestamp, ref_timestamp) / 1000
+
+        # faster than the reference, use this one instead
+        if lateness < 0:
+            self._udp_ref = (now, timestamp)
+            self._udp_window_min = 0.0
+            lateness = 0.0
+
+        self._udp_window_min = min(self._udp_window_min, lateness)
+
+        # clocks drift apart, move the reference to the fastest datagram of the window
+        if now - self._udp_window_start > self.udp_sync_window:
+            self._udp_ref = (self._udp_ref[0] + self._udp_window_min, self._udp_ref[1])
+            lateness -= self._udp_window_min
+            self._udp_window_start = now
+            self._udp_window_min = lateness
+
+        return lateness
+
+    def process_datagram(self, seq: int, timestamp: int, view: memoryview, offset: int, received: float) -> bool:
+        """
+        apply an update received over UDP, unless it is out of order or stale
+
+        :param seq: sequence number of the datagram
+        :param timestamp: client time (ms) the datagram was sent at
+        :param offset: where the MsgUpdate starts in `view`
+        :param received: when the datagram arrived (perf_counter)
+        :returns: if the update was applied
+        """
+        if self._controller is None:
+            return False
+
+        self.n_udp_received += 1
+        self.bytes_in += datagram_size
+        self.messages_in += 1
+        self._last_received = received
+
+        if self._udp_active and serial_diff(seq, self._udp_seq) <= 0:
+            self.n_udp_stale += 1
+            return False
+
+        if self._udp_lateness(timestamp, received) > self.max_udp_delay:
+            self.n_udp_stale += 1
+            return False
+
+        self._udp_seq = seq
+        self._udp_active = True
+        self._apply_update(view, offset, received)
+
+        return True
+
+    def _apply_update(self, view: memoryview, offset: int, received: float) -> None:
+        """
+        apply the update message at `offset` (without the command byte)
+
+        :param received: when the message arrived (perf_counter)
+        """
+        x_value, y_value, joystick_pressed, trigger_pressed, aux_l_pressed, aux_r_pressed = \
+            msg_update_struct.unpack_from(view, offset)
+
+        self._controller.update_controls(
+            trigger_pressed,
+            aux_l_pressed,
+            aux_r_pressed,
+            joystick_pressed,
+            x_value,
+            y_value,
+            received
+        )
+
+    def process(self, view: memoryview, received: float = ...) -> int:
+        """
+        decodes all complete messages in `view`, if multiple updates
+        are queued up only the newest one is applied
+
+        :param received: when the data arrived (default: now)
+        :returns: number of bytes consumed
+        """
+        received = time.perf_counter() if received is ... else received
+        offset = 0
+        latest_update = -1
+
+        while offset < len(view):
+            cmd = view[offset]
+
+            # the first message has to identify the controller
+            if self._controller is None and cmd != CMD_IDENTIFY:
                 raise RuntimeError("Amogistick started with invalid initialization sequence")
-            # read remaining 20 bytes of identify message
-            msg = MsgIdentify.from_bytes(await self._reader.readexactly(msg_identify_struct.size))
-            ic(f"Identity ({len(msg.identifier)}b): {msg.identifier}")
-
-            # create or get the controller
-            self._controller = AmogistickController.get(msg.identifier)
-            # link animation callbacks
-            self._controller.on_feedback_hit = lambda: self.send_message(MsgAnimCmd(
-                0, 
-                AnimCode.FLASH, 
-                (255, 0, 0), 
-                (0, 0, 0),
-                8, 
-                0,
-                False
-            ))
-            self._controller.on_feedback_shoot = lambda: self.send_message(MsgAnimCmd(
-                1, 
-                AnimCode.FLASH, 
-                (0, 0, 255), 
-                (0, 0, 0),
-                2, 
-                0,
-                False
-            ))
-            self._controller.on_feedback_heal_start = lambda: self.send_message(MsgAnimCmd(
-                3, 
-                AnimCode.CYCLIC_FADE, 
-                (0, 0, 0),
-                (40, 180, 0),
-                60,
-                200,
-                True
-            ))
-            self._controller.on_feedback_heal_stop = lambda: self.send_message(MsgAnimCmd(
-                3, 
-                AnimCode.INACTIVE, 
-                (0, 0, 0), 
-                (0, 0, 0),
-                0, 
-                0,
-                False
-            ))
-
-            # reset all currently running controller animations
-            self.send_message(MsgAnimCmd(0, AnimCode.INACTIVE, (0, 0, 0), (0, 0, 0), 0, 0, False))
-            self.send_message(MsgAnimCmd(1, AnimCode.INACTIVE, (0, 0, 0), (0, 0, 0), 0, 0, False))
-            self.send_message(MsgAnimCmd(2, AnimCode.INACTIVE, (0, 0, 0), (0, 0, 0), 0, 0, False))
-            self.send_message(MsgAnimCmd(3, AnimCode.INACTIVE, (0, 0, 0), (0, 0, 0), 0, 0, False))
-
-            while True:
-                cmd = chr((await self._reader.readexactly(1))[0])
-                
-                match cmd:
-                    case "i":
-                        # read remaining 20 bytes
-                        msg = MsgIdentify.from_bytes(await self._reader.readexactly(msg_identify_struct.size))
-                        ic(f"Warning: repeated Identity message received ({len(msg.identifier)}b): {msg.identifier}")
-                    case "u":
-                        # read remaining bytes
-                        msg = MsgUpdate.from_bytes(await self._reader.readexactly(msg_update_struct.size))
-                        times.appendleft(time.perf_counter())
-                        t10 = times[0] - times[-1]
-                        t = int((t10 / measure_span) * 1000)
-                        #ic(f"Update {t:03}ms: {msg}")
-                        self._controller.update_controls(
-                            msg.trigger_pressed,
-                            msg.aux_l_pressed,
-                            msg.aux_r_pressed,
-                            msg.joystick_pressed,
-                            msg.x_value,
-                            msg.y_value
-                        )
-            
-        except asyncio.IncompleteReadError:
-            ic("amogistick: closed ended during read, disconnecting")
-            await self.close()
-
-        except TimeoutError:
+
+            if cmd == CMD_IDENTIFY:
+                if len(view) - offset - 1 < msg_identify_struct.size:
+                    break
+
+                self._identify(MsgIdentify.unpack_from(view, offset + 1))
+                offset += 1 + msg_identify_struct.size
+                self.messages_in += 1
+
+            elif cmd == CMD_UPDATE:
+                if len(view) - offset - 1 < msg_update_struct.size:
+                    break
+
+                latest_update = offset + 1
+                offset += 1 + msg_update_struct.size
+                self.messages_in += 1
+
+            else:
+                # unknown command, skip it
+                offset += 1
+
+        if latest_update >= 0 and not self._udp_active:
+            self._apply_update(view, latest_update, received)
+
+        return offset
+
+    # asyncio.BufferedProtocol
+    def connection_made(self, transport: asyncio.Transport) -> None:
+        self._transport = transport
+        self._loop = asyncio.get_running_loop()
+        self._peer = transport.get_extra_info("peername")
+        self._connected_at = self._last_received = time.perf_counter()
+
+        # configure keepalive
+        sock: socket.socket = transport.get_extra_info("socket")
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, True)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 2)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 2)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, 2)
+        # feedback messages are tiny and should be sent right away
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, True)
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        return memoryview(self._buffer)[self._length:]
+
+    def buffer_updated(self, nbytes: int) -> None:
+        received = time.perf_counter()
+        self._length += nbytes
+        self.bytes_in += nbytes
+        self._last_received = received
+
+        try:
+            with memoryview(self._buffer) as view:
+                consumed = self.process(view[:self._length], received)
+
+        except RuntimeError as e:
+            ic(f"amogistick: {e}, disconnecting")
+            self.close()
+            return
+
+        # move the incomplete rest to the front
+        rest = self._length - consumed
+        self._buffer[:rest] = self._buffer[consumed:self._length]
+        self._length = rest
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        if isinstance(exc, TimeoutError):
             ic("amogistick: client timed out, disconnecting")
-            self._in_timeout = True
-            await self.close()
-    
-    def send_message(self, msg: MsgAnimCmd ) -> None:  # and possibly more in the future
-        self._writer.write(msg.to_bytes())
-        # ic("send: ", msg.to_bytes())
-        asyncio.get_event_loop().create_task(self._writer.drain())
-    
-    async def close(self) -> None:
+
+        else:
+            ic("amogistick: connection closed, disconnecting")
+
+        self._transport = None
+        self._unbind()
+
+        if self._feedback_timer is not None:
+            self._feedback_timer.cancel()
+            self._feedback_timer = None
+
+        stats = self._feedback.stats
+        ic(f"amogistick feedback: {stats['sent']} sent, {stats['merged']} merged, {stats['dropped']} dropped ({self.n_dropped} overflowed, {self._pending_lock.stats['contended']} lock waits)")
+
+        if self._on_close is not ...:
+            self._on_close(self)
+
+    def pause_writing(self) -> None:
+        # the transports buffer is full, keep messages until it drained
+        self._paused = True
+
+    def resume_writing(self) -> None:
+        self._paused = False
+        self._flush()
+
+    @property
+    def feedback_stats(self) -> FeedbackStats:
+        return self._feedback.stats
+
+    def send_message(self, msg: MsgAnimCmd) -> None:  # and possibly more in the future
         """
-        closes the client cleanly if possible and not done already, or just let's it rot if there's no other way
+        queue a message, can be called from any thread
         """
-        # TODO: make sure the client instance is actually deleted and properly garbage collected (server needs to give up it's reference for that)
+        data = msg.to_bytes()
 
-        if self._is_closed: # already closed
-            return
-        self._writer.close()
-        if not self._in_timeout:    # If we are already in a timeout, trying again will just throw another timeout error.
-            await self._writer.wait_closed()
-        self._is_closed = True
+        with self._pending_lock:
+            if len(self._pending) + len(data) > self.max_pending:
+                self.n_dropped += 1
+                return
+
+            self._pending += data
+            self._pending_messages += 1
+
+        self._request_flush()
+
+    def send_feedback(self, msg: MsgAnimCmd) -> None:
+        """
+        queue an LED command, replaces the one not yet sent on the same layer,
+        can be called from any thread
+        """
+        self._feedback.push(msg)
+        self._request_flush()
+
+    def _request_flush(self) -> None:
+        with self._pending_lock:
+            if self._flush_scheduled or self._loop is None:
+                return
+
+            self._flush_scheduled = True
+
+        self._loop.call_soon_threadsafe(self._flush)
+
+    def _on_feedback_timer(self) -> None:
+        self._feedback_timer = None
+        self._flush()
 
+    def _flush(self) -> None:
+        """
+        write all queued messages at once (on the event loop)
+        """
+        with self._pending_lock:
+            self._flush_scheduled = False
+
+            if self._transport is None or self._paused:
+                return
+
+            for msg in self._feedback.pop_ready():
+                data = msg.to_bytes()
+
+                if len(self._pending) + len(data) > self.max_pending:
+                    self.n_dropped += 1
+                    continue
+
+                self._pending += data
+                self._pending_messages += 1
+
+            data = bytes(self._pending)
+            self._pending.clear()
+            self.messages_out += self._pending_messages
+            self._pending_messages = 0
+
+        # wake up again once the next layer may be updated
+        delay = self._feedback.next_ready_in()
+        if delay is not None and self._feedback_timer is None:
+            self._feedback_timer = self._loop.call_later(delay, self._on_feedback_timer)
+
+        if data:
+            self.bytes_out += len(data)
+            self._transport.write(data)
+
+    def close(self) -> None:
+        """
+        closes the client if not done already
+        """
+        if self._transport is not None:
+            self._transport.close()
+
+    def abort(self) -> None:
+        """
+        closes the client without sending buffered data, so a dead peer
+        doesn't keep the connection around until keepalive gives up
+        """
+        if self._transport is not None:
+            self._transport.abort()
@@ -0,0 +1,119 @@
+"""
+_feedback.py
+19. October 2026
+
+merges and rate-limits LED feedback commands per animation layer
+
+Author:
+melektron
+"""
+
+from time import perf_counter
+import threading
+import typing as tp
+
+if tp.TYPE_CHECKING:
+    from ._amogistick_client import MsgAnimCmd
+
+
+class FeedbackStats(tp.TypedDict):
+    pushed: int
+    sent: int
+    merged: int     # replaced by a newer command before being sent
+    dropped: int    # same state as the one already shown
+
+
+class FeedbackQueue:
+    """
+    keeps only the newest command per animation layer and sends each
+    layer at most `max_rate` times per second
+
+    can be pushed to from any thread
+    """
+    # default commands per second and layer
+    max_rate: float = 15
+
+    # animations that restart with every command (AnimCode values for
+    # FLASH and SINGLE_FADE), all others are states that don't have to
+    # be sent twice
+    one_shot: set[int] = {2, 4}
+
+    def __init__(self, layer_rates: dict[int, float] = ...) -> None:
+        """
+        :param layer_rates: per layer overrides of `max_rate`
+        """
+        self._layer_rates = {} if layer_rates is ... else layer_rates
+        self._lock = threading.Lock()
+
+        self._pending: dict[int, "MsgAnimCmd"] = {}
+        self._last_sent: dict[int, tuple["MsgAnimCmd", float]] = {}
+
+        self._stats: FeedbackStats = {
+            "pushed": 0,
+            "sent": 0,
+            "merged": 0,
+            "dropped": 0
+        }
+
+    @property
+    def stats(self) -> FeedbackStats:
+        return self._stats.copy()
+
+    def _interval(self, layer: int) -> float:
+        return 1 / self._layer_rates.get(layer, self.max_rate)
+
+    def push(self, msg: "MsgAnimCmd") -> None:
+        """
+        queue a command, replacing a not yet sent one on the same layer
+        """
+        with self._lock:
+            self._stats["pushed"] += 1
+
+            if msg.layer in self._pending:
+                self._stats["merged"] += 1
+
+            self._pending[msg.layer] = msg
+
+    def pop_ready(self, now: float = ...) -> list["MsgAnimCmd"]:
+        """
+        all commands whose layer may be sent again
+        """
+        now = perf_counter() if now is ... else now
+        out: list["MsgAnimCmd"] = []
+
+        with self._lock:
+            for layer, msg in list(self._pending.items()):
+                last = self._last_sent.get(layer)
+
+                if last is not None and now - last[1] < self._interval(layer):
+                    continue
+
+                del self._pending[layer]
+
+                if last is not None and last[0] == msg \
+                        and msg.anim_code.value not in self.one_shot:
+                    self._stats["dropped"] += 1
+                    continue
+
+                self._last_sent[layer] = (msg, now)
+                self._stats["sent"] += 1
+                out.append(msg)
+
+        return out
+
+    def next_ready_in(self, now: float = ...) -> float | None:
+        """
+        seconds until the next pending command may be sent
+        (None if nothing is pending)
+        """
+        now = perf_counter() if now is ... else now
+
+        with self._lock:
+            if not self._pending:
+                return None
+
+            return max(min(
+                self._last_sent[layer][1] + self._interval(layer) - now
+                if layer in self._last_sent else 0
+                for layer in self._pending
+            ), 0)
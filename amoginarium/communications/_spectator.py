@@ -0,0 +1,319 @@
+"""
+_spectator.py
+19. October 2026
+
+streams the world state to local spectator clients (see spectator.py),
+so a second screen doesn't have to run its own simulation
+
+Author:
+melektron
+"""
+
+from icecream import ic
+import typing as tp
+import socket
+import struct
+import time
+
+
+# viewer -> game
+# b"h": subscribe / change the view: x, y, w, h relative to the game camera
+#   (w == 0: the games view, w < 0: everything)
+msg_hello_struct = struct.Struct(">ffff")
+# b"a": acknowledge a snapshot: tick
+msg_ack_struct = struct.Struct(">I")
+# b"k": request a keyframe (no payload, the viewer lost track)
+
+# game -> viewer
+# b"s": snapshot: tick, base tick (KEYFRAME: no base), camera x, y, w, h,
+#   number of entity updates, number of removed entities
+msg_snapshot_struct = struct.Struct(">IIffffHH")
+KEYFRAME = 0xffffffff
+
+# entity update: id, field mask, then only the fields in the mask
+entity_header_struct = struct.Struct(">IB")
+FIELD_TYPE = 1
+FIELD_POSITION = 2
+FIELD_VELOCITY = 4
+FIELD_HP = 8
+FIELD_FACING = 16
+ALL_FIELDS = 31
+
+field_structs: tuple[tuple[int, struct.Struct], ...] = (
+    (FIELD_TYPE, struct.Struct(">B")),
+    (FIELD_POSITION, struct.Struct(">ff")),
+    (FIELD_VELOCITY, struct.Struct(">ff")),
+    (FIELD_HP, struct.Struct(">h")),
+    (FIELD_FACING, struct.Struct(">b")),
+)
+removed_struct = struct.Struct(">I")
+
+# entity types by class name (0: anything else)
+ENTITY_TYPES: tuple[str, ...] = (
+    "Entity",
+    "Player",
+    "Bullet",
+    "Island",
+    "SniperTurret",
+    "AkTurret",
+    "MinigunTurret",
+    "MortarTurret",
+    "FlakTurret",
+    "CRAMTurret",
+)
+_type_ids = {name: i for i, name in enumerate(ENTITY_TYPES)}
+
+# type, (x, y), (vx, vy), hp, facing
+type entity_state_t = tuple[int, tuple[float, float], tuple[float, float], int, int]
+
+
+def encode_entity(entity_id: int, state: entity_state_t, base: entity_state_t | None) -> bytes:
+    """
+    only the fields that changed compared to `base` (all if None)
+    """
+    mask = 0
+    for i, (field, _) in enumerate(field_structs):
+        if base is None or state[i] != base[i]:
+            mask |= field
+
+    out = [entity_header_struct.pack(entity_id, mask)]
+    for i, (field, field_struct) in enumerate(field_structs):
+        if mask & field:
+            value = state[i]
+            out.append(field_struct.pack(*value) if isinstance(value, tuple) else field_struct.pack(value))
+
+    return b"".join(out)
+
+
+def decode_entity(buffer, offset: int, base: dict[int, entity_state_t]) -> tuple[int, entity_state_t, int]:
+    """
+    :param base: states the update is relative to
+    :returns: entity id, its new state, offset after the entity
+    """
+    entity_id, mask = entity_header_struct.unpack_from(buffer, offset)
+    offset += entity_header_struct.size
+
+    values = list(base[entity_id]) if entity_id in base else [0, (0.0, 0.0), (0.0, 0.0), 0, 1]
+    for i, (field, field_struct) in enumerate(field_structs):
+        if mask & field:
+            value = field_struct.unpack_from(buffer, offset)
+            values[i] = value if len(value) > 1 else value[0]
+            offset += field_struct.size
+
+    return entity_id, tuple(values), offset
+
+
+class _Viewer(tp.TypedDict):
+    view: tuple[float, float, float, float]
+    last_seen: float
+    acked: int | None
+    # what was sent in the last snapshots (tick: id: state)
+    sent: dict[int, dict[int, entity_state_t]]
+
+
+class SpectatorPublisher:
+    """
+    sends one snapshot per tick to every subscribed viewer (UDP),
+    each snapshot only contains what changed since the last snapshot
+    the viewer acknowledged and only entities inside the viewers view
+
+    everything runs on the game thread (non-blocking socket), nothing
+    is encoded while nobody is watching
+    """
+    # snapshots kept per viewer to diff against
+    history: int = 32
+    # viewers that don't send anything are dropped
+    timeout: float = 5
+    # extra space around the view (world units)
+    margin: float = 100
+    # localhost datagrams may be large, entities that don't fit are sent next tick
+    max_datagram: int = 60000
+
+    # quantization, smaller changes aren't sent
+    position_step: float = .1
+    velocity_step: float = 1
+
+    def __init__(self, address: tuple[str, int]) -> None:
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.setblocking(False)
+        self._socket.bind(address)
+
+        self._viewers: dict[tuple[str, int], _Viewer] = {}
+        self._tick = 0
+
+        self.bytes_sent = 0
+        self.n_keyframes = 0
+
+        ic(f"spectators: serving on {address}")
+
+    @property
+    def n_viewers(self) -> int:
+        return len(self._viewers)
+
+    def _receive(self, now: float) -> None:
+        """
+        handle subscriptions and acks of all viewers
+        """
+        while True:
+            try:
+                data, addr = self._socket.recvfrom(64)
+
+            except (BlockingIOError, ConnectionError):
+                break
+
+            if data[:1] == b"h" and len(data) == 1 + msg_hello_struct.size:
+                if addr not in self._viewers:
+                    ic(f"spectators: {addr} joined")
+                    self._viewers[addr] = {"view": (0, 0, 0, 0), "last_seen": now, "acked": None, "sent": {}}
+
+                self._viewers[addr]["view"] = msg_hello_struct.unpack_from(data, 1)
+                self._viewers[addr]["last_seen"] = now
+
+            elif data[:1] == b"a" and len(data) == 1 + msg_ack_struct.size and addr in self._viewers:
+                viewer = self._viewers[addr]
+                tick = msg_ack_struct.unpack_from(data, 1)[0]
+
+                if tick in viewer["sent"] and (viewer["acked"] is None or tick > viewer["acked"]):
+                    viewer["acked"] = tick
+
+                viewer["last_seen"] = now
+
+            elif data == b"k" and addr in self._viewers:
+                self._viewers[addr]["acked"] = None
+                self._viewers[addr]["last_seen"] = now
+
+        for addr, viewer in list(self._viewers.items()):
+            if now - viewer["last_seen"] > self.timeout:
+                ic(f"spectators: {addr} timed out")
+                del self._viewers[addr]
+
+    def _state(self, entity) -> entity_state_t:
+        p, v = self.position_step, self.velocity_step
+
+        return (
+            _type_ids.get(entity.__class__.__name__, 0),
+            (round(entity.position.x / p) * p, round(entity.position.y / p) * p),
+            (round(entity.velocity.x / v) * v, round(entity.velocity.y / v) * v),
+            int(getattr(entity, "hp", 0)),
+            -1 if entity.facing.x < 0 else 1
+        )
+
+    def _visible(
+            self,
+            world: dict[int, tuple[float, float, entity_state_t]],
+            camera: tuple[float, float, float, float],
+            view: tuple[float, float, float, float]
+    ) -> dict[int, entity_state_t]:
+        """
+        all entities inside the viewers view (+ margin)
+        """
+        if view[2] < 0:
+            return {entity_id: state for entity_id, (_, _, state) in world.items()}
+
+        if view[2] == 0:
+            x0, y0, w, h = camera
+
+        else:
+            x0, y0, w, h = camera[0] + view[0], camera[1] + view[1], view[2], view[3]
+
+        x0, y0 = x0 - self.margin, y0 - self.margin
+        x1, y1 = x0 + w + 2 * self.margin, y0 + h + 2 * self.margin
+
+        return {
+            entity_id: state for entity_id, (x, y, state) in world.items()
+            if x0 <= x <= x1 and y0 <= y <= y1
+        }
+
+    def _encode(
+            self,
+            viewer: _Viewer,
+            visible: dict[int, entity_state_t],
+            camera: tuple[float, float, float, float]
+    ) -> bytes:
+        base_tick = viewer["acked"] if viewer["acked"] in viewer["sent"] else None
+
+        # the viewer only keeps the last `history` states, older bases
+        # may already be gone
+        if base_tick is not None and self._tick - base_tick >= self.history:
+            base_tick = None
+        base = viewer["sent"][base_tick] if base_tick is not None else {}
+
+        if base_tick is None:
+            self.n_keyframes += 1
+
+        removed = [entity_id for entity_id in base if entity_id not in visible]
+        size = 1 + msg_snapshot_struct.size + len(removed) * removed_struct.size
+
+        updates: list[bytes] = []
+        sent: dict[int, entity_state_t] = {}
+
+        for entity_id, state in visible.items():
+            old = base.get(entity_id)
+
+            if old == state:
+                sent[entity_id] = state
+                continue
+
+            data = encode_entity(entity_id, state, old)
+
+            # doesn't fit, the viewer keeps the base state until next tick
+            if size + len(data) > self.max_datagram:
+                if old is not None:
+                    sent[entity_id] = old
+
+                continue
+
+            size += len(data)
+            updates.append(data)
+            sent[entity_id] = state
+
+        viewer["sent"][self._tick] = sent
+
+        # forget snapshots too old to be used as a base
+        for tick in [t for t in viewer["sent"] if t <= self._tick - self.history]:
+            del viewer["sent"][tick]
+
+        return b"".join((
+            b"s",
+            msg_snapshot_struct.pack(
+                self._tick,
+                KEYFRAME if base_tick is None else base_tick,
+                *camera,
+                len(updates),
+                len(removed)
+            ),
+            *updates,
+            *(removed_struct.pack(entity_id) for entity_id in removed)
+        ))
+
+    def publish(self, entities: tp.Iterable, camera: tuple[float, float, float, float]) -> None:
+        """
+        send the current world state (call once per tick)
+
+        :param camera: position and size of the games view (world units)
+        """
+        now = time.perf_counter()
+        self._receive(now)
+
+        if not self._viewers:
+            return
+
+        self._tick += 1
+        world = {
+            entity.id: (entity.position.x, entity.position.y, self._state(entity))
+            for entity in entities
+        }
+
+        for addr, viewer in list(self._viewers.items()):
+            data = self._encode(viewer, self._visible(world, camera, viewer["view"]), camera)
+
+            try:
+                self._socket.sendto(data, addr)
+                self.bytes_sent += len(data)
+
+            except (BlockingIOError, ConnectionError):
+                # skipped, the next delta still refers to the acked snapshot
+                pass
+
+    def close(self) -> None:
+        self._socket.close()
@@ -11,62 +11,162 @@ melektron
 from icecream import ic
 import typing as tp
 import asyncio
-import socket
 
-from ._amogistick_client import AmogistickClient
+from ._amogistick_client import AmogistickClient, SessionStats
+from ._udp_server import UDPServer
+
+
+class ServerStats(tp.TypedDict):
+    clients: list[SessionStats]
+    connected: int
+    closed: int  # sessions that ended (incl. evicted and replaced)
+    evicted: int  # idle for too long
+    replaced: int  # the same controller connected again
+    bytes_in: int  # all sessions, incl. closed ones
+    bytes_out: int
 
 
 class TCPServer:
+    """
+    keeps track of all connected amogisticks, a controller that connects
+    again replaces its old session
+
+    dead connections are detected by TCP keepalive (see
+    `AmogistickClient.connection_made`), if `idle_timeout` is set, clients
+    that don't send anything for that long are disconnected as well. this
+    requires every amogistick to send periodically (e.g. its state every
+    second), a stick that only sends on change would be disconnected
+    """
     running = True
+    idle_timeout: float | None = None
+    # seconds between two idle checks
+    check_interval: float = 1
 
     def __init__(
             self,
-            address: tuple[str, int]
+            address: tuple[str, int],
+            udp_port: int | None = None
     ) -> None:
+        """
+        :param udp_port: also accept input updates via UDP on this port
+        """
         self._host = address[0]
-        self._ip = address[1]
+        self._port = address[1]
+        self._udp_port = udp_port
+        self._udp: UDPServer = None
 
         self._stop: asyncio.Future = ...
+
+        # all connections and the identified ones by controller id
         self._clients: list[AmogistickClient] = []
+        self._sessions: dict[str, AmogistickClient] = {}
 
-    async def _client_handler(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
-        # configure keepalive
-        # https://stackoverflow.com/questions/75326508/set-socket-options-on-python-asyncio-streams-api
-        sock: socket.socket = writer.get_extra_info("socket")
-        #print(f"SO_KEEPALIVE={sock.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE)}")
-        #print(f"TCP_KEEPIDLE={sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE)}")
-        #print(f"TCP_KEEPINTVL={sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL)}")
-        #print(f"TCP_KEEPCNT={sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT)}")
-        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, True)
-        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 2)
-        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 2)
-        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, 2)
-        #print(f"SO_KEEPALIVE={sock.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE)}")
-        #print(f"TCP_KEEPIDLE={sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE)}")
-        #print(f"TCP_KEEPINTVL={sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL)}")
-        #print(f"TCP_KEEPCNT={sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT)}")
-
-        # create client instance
-        client = AmogistickClient(reader, writer)
+        self._n_closed = 0
+        self._n_evicted = 0
+        self._n_replaced = 0
+        # traffic of closed sessions
+        self._closed_bytes_in = 0
+        self._closed_bytes_out = 0
+
+    def _create_client(self) -> AmogistickClient:
+        client = AmogistickClient(
+            on_close=self._remove_client,
+            on_identify=self._register_session
+        )
         self._clients.append(client)
-        await client.run()
+
+        return client
+
+    def _register_session(self, client: AmogistickClient) -> None:
+        """
+        a client identified, close the old connection of its controller
+        """
+        old = self._sessions.get(client.identifier)
+
+        if old is not None and old is not client:
+            ic(f"amogistick {client.identifier} reconnected, closing old session")
+            self._n_replaced += 1
+            old.abort()
+
+        self._sessions[client.identifier] = client
+
+    def _remove_client(self, client: AmogistickClient) -> None:
+        self._clients.remove(client)
+
+        if self._sessions.get(client.identifier) is client:
+            del self._sessions[client.identifier]
+
+        self._n_closed += 1
+        self._closed_bytes_in += client.bytes_in
+        self._closed_bytes_out += client.bytes_out
+
+    def _find_client(self, identifier: str, host: str) -> AmogistickClient | None:
+        client = self._sessions.get(identifier)
+
+        if client is None or client.peer_host != host:
+            return None
+
+        return client
+
+    async def _evict_idle(self) -> None:
+        """
+        disconnect clients that didn't send anything for `idle_timeout`
+        seconds (incl. clients that never identified)
+        """
+        while True:
+            await asyncio.sleep(self.check_interval)
+
+            for client in list(self._clients):
+                if client.idle_for() > self.idle_timeout:
+                    ic(f"amogistick {client.identifier} idle for {client.idle_for():.1f}s, disconnecting")
+                    self._n_evicted += 1
+                    client.abort()
+
+    def stats(self) -> ServerStats:
+        """
+        traffic per session, can be called from any thread
+        """
+        clients = list(self._clients)
+
+        return {
+            "clients": [client.stats() for client in clients],
+            "connected": len(clients),
+            "closed": self._n_closed,
+            "evicted": self._n_evicted,
+            "replaced": self._n_replaced,
+            "bytes_in": self._closed_bytes_in + sum(c.bytes_in for c in clients),
+            "bytes_out": self._closed_bytes_out + sum(c.bytes_out for c in clients)
+        }
 
     async def run(self) -> None:
         """
         run the server continuously
         """
         # start server
-        server = await asyncio.start_server(lambda r, w: self._client_handler(r, w), '0.0.0.0', 12345)
-    
+        loop = asyncio.get_running_loop()
+        server = await loop.create_server(self._create_client, self._host, self._port)
+
         # create future for clean exit
-        loop = asyncio.get_event_loop()
         self._stop = loop.create_future()
         
         # host address overview
         addrs = ', '.join(str(sock.getsockname()) for sock in server.sockets)
         ic(f'amogistick TCP serving on {addrs}')
 
+        # optional UDP input channel
+        if self._udp_port is not None:
+            _, self._udp = await loop.create_datagram_endpoint(
+                lambda: UDPServer(self._find_client),
+                local_addr=(self._host, self._udp_port)
+            )
+            ic(f'amogistick UDP serving on {(self._host, self._udp_port)}')
+
         await server.start_serving()
+
+        evict = None
+        if self.idle_timeout is not None:
+            evict = asyncio.create_task(self._evict_idle())
+
         try:
             await self._stop
 
@@ -74,10 +174,14 @@ class TCPServer:
             ic("amogistick TCP server canceled")
         finally:
             ic("amogistick TCP server closing...")
+            if evict is not None:
+                evict.cancel()
             # stop receiving new connections
             server.close()
+            if self._udp is not None:
+                self._udp.close()
             # close all existing connections
-            for c in self._clients: await c.close()
+            for c in list(self._clients): c.close()
             await server.wait_closed()
 
     def close(self) -> None:
@@ -85,4 +189,5 @@ class TCPServer:
             raise RuntimeError(
                 "tried running Server.close before running Server.run"
             )
-        self._stop.set_result(None)
+        # called from a different thread than the event loop
+        self._stop.get_loop().call_soon_threadsafe(self._stop.set_result, None)
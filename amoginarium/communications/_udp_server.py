@@ -0,0 +1,63 @@
+"""
+_udp_server.py
+19. October 2026
+
+receives amogistick input updates via UDP, so a lost packet doesn't
+hold back the following ones (identify and feedback stay on TCP)
+
+Author:
+melektron
+"""
+
+from icecream import ic
+import typing as tp
+import time
+import asyncio
+
+from ._amogistick_client import AmogistickClient, msg_datagram_struct, datagram_size, CMD_UPDATE
+
+
+# identifier, host the datagram came from
+type client_getter_t = tp.Callable[[str, str], AmogistickClient | None]
+
+
+class UDPServer(asyncio.DatagramProtocol):
+    """
+    passes update datagrams to the TCP client with the same identifier
+    (and host), datagrams of unknown controllers are ignored
+    """
+
+    def __init__(self, get_client: client_getter_t) -> None:
+        super().__init__()
+        self._get_client = get_client
+        self._transport: asyncio.DatagramTransport = None
+
+        self.n_invalid = 0
+        self.n_unknown = 0
+
+    def connection_made(self, transport: asyncio.DatagramTransport) -> None:
+        self._transport = transport
+
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+        received = time.perf_counter()
+
+        if len(data) != datagram_size or data[0] != CMD_UPDATE:
+            self.n_invalid += 1
+            return
+
+        id_bytes, seq, timestamp = msg_datagram_struct.unpack_from(data, 1)
+        client = self._get_client(id_bytes.split(bytes([0]))[0].decode(errors="replace"), addr[0])
+
+        if client is None:
+            self.n_unknown += 1
+            return
+
+        client.process_datagram(seq, timestamp, data, 1 + msg_datagram_struct.size, received)
+
+    def error_received(self, exc: Exception) -> None:
+        ic(f"amogistick UDP: {exc}")
+
+    def close(self) -> None:
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
@@ -8,11 +8,18 @@ Author:
 Nilusink
 """
 
+from time import perf_counter
 from icecream import ic
-from ._base_controller import Controller
+from ._base_controller import Controller, controls
 
 
 class AmogistickController(Controller):
+    """
+    the comms thread never writes the controls the game is reading,
+    every update builds a new snapshot which is published by replacing
+    a single reference and picked up by `update` at the start of the
+    players tick (so a tick never sees a half-written update)
+    """
     x_dead_zone: float = .1
     y_dead_zone: float = .1
     joy_thresh: float = 5e3
@@ -20,12 +27,15 @@ class AmogistickController(Controller):
     def __init__(self, controller_id: str) -> None:
         super().__init__(controller_id)
 
+        # newest snapshot written by the communications thread
+        self._latest = self._keys
+
     def update(self, delta):
         """
         updates are provided by the communications thread,
-        so the default update funcion is ignored
+        only the newest complete snapshot is taken over
         """
-        pass
+        self._keys = self._latest
 
     def update_controls(
             self,
@@ -34,24 +44,35 @@ class AmogistickController(Controller):
             aux_r_btn: bool = ...,
             joy_btn: bool = ...,
             joy_x: float = ...,
-            joy_y: float = ...
+            joy_y: float = ...,
+            received: float = ...
     ) -> None:
         """
         controls updates provided by the server
+
+        :param received: when the update arrived (perf_counter)
         """
+        keys = controls()
+
         # apply a curve to the controller values
-        self._keys.joy_x = self.joy_curve(
+        keys.joy_x = self.joy_curve(
             (joy_x - self.joy_thresh) / self.joy_thresh,
             self.x_dead_zone
         )
-        self._keys.joy_y = self.joy_curve(
+        keys.joy_y = self.joy_curve(
             (joy_y - self.joy_thresh) / self.joy_thresh,
             self.y_dead_zone
         )
-        #ic(self._keys.joy_x, self._keys.joy_y)
+        #ic(keys.joy_x, keys.joy_y)
         #ic(joy_x, joy_y)
 
         # write button
-        self._keys.jump = self._keys.joy_y > .3 or aux_r_btn or aux_l_btn
-        self._keys.shoot = trigger_btn
-        self._keys.reload = joy_btn  # map joy click to reload
+        keys.jump = keys.joy_y > .3 or aux_r_btn or aux_l_btn
+        keys.shoot = trigger_btn
+        keys.reload = joy_btn  # map joy click to reload
+
+        # publish (a single reference assignment is atomic)
+        self._latest = keys
+
+        if received is not ...:
+            self.latency.received(received, perf_counter())
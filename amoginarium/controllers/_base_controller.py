@@ -7,11 +7,11 @@ all controller types should inherit from this
 Author:
 Nilusink
 """
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from icecream import ic
 import typing as tp
 
-from ..logic import Vec2
+from ..logic import Vec2, InputLatency
 
 
 @dataclass
@@ -134,6 +134,7 @@ class Controller:
         self.on_feedback_heal_start: tp.Callable = ...
         self.on_feedback_heal_stop: tp.Callable = ...
         self._heal_running = False
+        self.latency = InputLatency()
 
     @property
     def id(self) -> str:
@@ -172,7 +173,7 @@ class Controller:
 
     @property
     def controls(self) -> controls:
-        return self._keys.copy()
+        return replace(self._keys)
 
     # @classmethod  # making this a classmethod didn't work for some reason
     @staticmethod
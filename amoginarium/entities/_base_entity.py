@@ -15,7 +15,10 @@ import math as m
 
 # from ..base._linked import global_vars
 from ..render_bindings import renderer
-from ..base import Updated, Drawn
+from ..logic import CollisionLayer, COLLISION_TABLE, FRIENDLY_FIRE_TABLE
+from ..logic import coalition_to_id
+from ..base import Updated, Drawn, Sleeping
+from ..base import GravityAffected, FrictionXAffected
 from ..logic import Vec2
 
 
@@ -27,6 +30,10 @@ class Entity(pg.sprite.Sprite):
     position: Vec2
     velocity: Vec2
     acceleration: Vec2
+    collision_layer: CollisionLayer = CollisionLayer.ENTITY
+    is_static: bool = False
+    _sleeping: bool = False
+    _sleep_groups: tuple[pg.sprite.AbstractGroup, ...] = ()
 
     def __init__(
         self,
@@ -44,6 +51,12 @@ class Entity(pg.sprite.Sprite):
 
         self._coalition = coalition
 
+        # precomputed for fast relation / collision filtering
+        self._coalition_id = coalition_to_id(coalition)
+        self._owner_id = self._find_owner_id()
+        self._collision_mask = COLLISION_TABLE[self.collision_layer]
+        self._friendly_mask = FRIENDLY_FIRE_TABLE[self.collision_layer]
+
         self.size = Vec2.from_cartesian(1, 1) if size is ... else size
         self.facing = Vec2.from_cartesian(1, 0) if facing is ... else facing
         self.position = Vec2() if initial_position is ... else initial_position
@@ -92,6 +105,56 @@ class Entity(pg.sprite.Sprite):
     def coalition(self) -> tp.Any:
         return self._coalition
 
+    @property
+    def sleeping(self) -> bool:
+        return self._sleeping
+
+    @property
+    def resting(self) -> bool:
+        """
+        true if the entity currently doesn't move (static or sleeping)
+        """
+        return self.is_static or self._sleeping
+
+    @property
+    def coalition_id(self) -> int:
+        """
+        small integer representing the coalition
+        """
+        return self._coalition_id
+
+    @property
+    def owner_id(self) -> int:
+        """
+        id of the root owner (own id if the entity has no parent)
+        """
+        return self._owner_id
+
+    @property
+    def collision_mask(self) -> int:
+        """
+        layers this entity can interact with
+        """
+        return self._collision_mask
+
+    @property
+    def friendly_mask(self) -> int:
+        """
+        layers this entity can interact with in the same coalition
+        """
+        return self._friendly_mask
+
+    def _find_owner_id(self) -> int:
+        """
+        walk up the parents once to find the root owner
+        """
+        parent = getattr(self, "parent", self)
+
+        if parent is self:
+            return self.id
+
+        return getattr(parent, "owner_id", getattr(parent, "id", self.id))
+
     def _generate_collision_mask(self) -> None:
         """
         generate the mask used for precise collision
@@ -109,7 +172,65 @@ class Entity(pg.sprite.Sprite):
             self.size.y
         )
 
+    def sleep(self) -> None:
+        """
+        stop updating the entity until it is woken up
+        (by `wake` or `apply_impulse`)
+        """
+        if self._sleeping:
+            return
+
+        self._sleeping = True
+        self._sleep_groups = tuple(
+            group for group in (Updated, GravityAffected, FrictionXAffected)
+            if self in group
+        )
+        self.remove(*self._sleep_groups)
+        self.add(Sleeping)
+
+        self.update_rect()
+        self._update_resting()
+
+    def wake(self) -> None:
+        """
+        continue updating a sleeping entity
+        """
+        if not self._sleeping:
+            return
+
+        self._sleeping = False
+        self.remove(Sleeping)
+        self.add(*self._sleep_groups)
+
+        self._update_resting()
+
+    def apply_impulse(self, impulse: Vec2) -> None:
+        """
+        change the velocity by `impulse` (wakes sleeping entities)
+        """
+        # static entities never move
+        if self.is_static:
+            return
+
+        if self._sleeping:
+            self.velocity = Vec2()
+            self.wake()
+
+        self.velocity += impulse
+
+    def _update_resting(self) -> None:
+        """
+        let all groups know that the resting state changed
+        """
+        for group in self.groups():
+            if hasattr(group, "update_resting"):
+                group.update_resting(self)
+
     def update(self, delta: float) -> None:
+        # static entities never move
+        if self.is_static:
+            return
+
         # update velocity and position
         self.velocity += self.acceleration * delta
         self.position += self.velocity * delta
@@ -15,6 +15,7 @@ import random
 
 from ..base._linked import global_vars
 from ..render_bindings import renderer
+from ..base._static_layer import static_layer
 from ..base._textures import textures
 from ..entities import VisibleEntity
 from ..base import Walls
@@ -36,6 +37,7 @@ class _PolyMatcher:
 
 
 class Island(VisibleEntity):
+    is_static = True
     _island_single_texture: int = ...
 
     _island_single_right_texture: int = ...
@@ -193,6 +195,10 @@ class Island(VisibleEntity):
         self.add(Walls)
         self.update_rect()
 
+        # islands don't do anything on their own
+        self.sleep()
+        static_layer.add(self)
+
     @classmethod
     def random_between(
         cls,
@@ -216,6 +222,10 @@ class Island(VisibleEntity):
 
         return cls(start, size)
 
+    def kill(self, killed_by: tp.Self = ...) -> None:
+        static_layer.remove(self)
+        super().kill(killed_by)
+
     def update_rect(self) -> None:
         self.rect = pg.Rect(
             self.position.x,
@@ -21,7 +21,7 @@ from ..render_bindings import renderer
 from ..base._textures import textures
 from ..controllers import Controller
 from ._island import Island
-from ..logic import Vec2
+from ..logic import Vec2, CollisionLayer
 
 
 PLAYER_RIGHT_64_PATH = "gunogus64right"
@@ -48,6 +48,7 @@ class Player(LRImageEntity):
     _hp: int = 0
 
     on_wall: bool = False
+    collision_layer = CollisionLayer.PLAYER
 
     def __new__(cls, *args, **kwargs):
         # only load texture once
@@ -7,14 +7,14 @@ defines a player
 Author:
 Nilusink
 """
-from contextlib import suppress
 # from icecream import ic
 import typing as tp
 
 from ..base import HasBars, CollisionDestroyed, Players, Updated, Bullets
 from ..base import GravityAffected
 from ._weapons import BaseWeapon, Sniper, Ak47, Minigun, Mortar, Flak, CRAM
-from ..logic import Vec2, calculate_launch_angle, Color, is_related
+from ..logic import Vec2, calculate_launch_angle, Color, are_related
+from ..logic import CollisionLayer
 from ._base_entity import VisibleEntity
 from ..render_bindings import renderer
 from ..base._linked import global_vars
@@ -38,6 +38,8 @@ class BaseTurret(VisibleEntity):
     available_targets: dict = ...
     _high_tof_multiplier: float = 1.1
     _low_tof_multiplier: float = 1
+    collision_layer = CollisionLayer.TURRET
+    is_static = True
 
     def __new__(cls, *args, **kwargs):
         # only load texture once
@@ -125,31 +127,29 @@ class BaseTurret(VisibleEntity):
         self.weapon.update(delta)
 
         # scan for targets and engage the closest one
-        targets = []
-        if self.intercept_players:
-            # only add living playerse
-            targets.extend(
-                [p for p in Players.sprites() if p.alive]
-            )
-
-        if self.intercept_bullets:
-            targets.extend(Bullets.sprites())
-
-        targets = Players.entities_in_circle(
-            targets,
-            self.position,
-            self.engagement_range
-        )
+        targets = [
+            target for target in CollisionDestroyed.get_entities_in_circle(
+                self.position,
+                self.engagement_range,
+                exclude_coalition=self.coalition
+            ) if any([
+                # only add living players
+                self.intercept_players and target[1] in Players
+                and target[1].alive,
+                self.intercept_bullets and target[1] in Bullets
+            ])
+        ]
 
         # filter stuff shot by myself
-        targets = [e for e in targets if not is_related(self, e[1], depth=4)]
+        targets = [e for e in targets if not are_related(self, e[1], depth=4)]
         # targets = []
 
         for target in targets:
             if target[1] not in self.available_targets:
                 self.available_targets[target[1]] = {
                     "shot_at": -1,
-                    "distance": target[0]
+                    "distance": target[0],
+                    "tof": ...
                 }
 
         # make list only contain the entities
@@ -189,19 +189,29 @@ class BaseTurret(VisibleEntity):
 
             # try to predict where the player is going to be
             self._target_predict = ...
-            with suppress(ValueError):
-                magic = player_velocity.length > self.weapon._bullet_speed
-
-                aiming_angle, tof, predict = calculate_launch_angle(
-                    position_delta,
-                    player_velocity * .9 if magic else player_velocity,
-                    player_acceleration,
-                    self.weapon.bullet_speed,
-                    10,
-                    self._aim_type,
-                    # *2 because for some reaseon I gave bullets 2x gravity
-                    g=GravityAffected.gravity * 2
-                )
+            magic = player_velocity.length > self.weapon._bullet_speed
+
+            # re-use last tick's solution as a starting point
+            target_state = self.available_targets[new_target]
+            solution = calculate_launch_angle(
+                position_delta,
+                player_velocity * .9 if magic else player_velocity,
+                player_acceleration,
+                self.weapon.bullet_speed,
+                10,
+                self._aim_type,
+                # *2 because for some reaseon I gave bullets 2x gravity
+                g=GravityAffected.gravity * 2,
+                initial_tof=target_state["tof"]
+            )
+
+            if solution is None:
+                # target can't be reached, start from scratch next time
+                target_state["tof"] = ...
+
+            else:
+                aiming_angle, tof, predict = solution
+                target_state["tof"] = tof
 
                 aiming_angle.y *= -1
                 predict.y *= -1
@@ -227,8 +237,7 @@ class BaseTurret(VisibleEntity):
                 )
 
                 if shot:
-                    self.available_targets[new_target]["shot_at"] = \
-                        self.weapon._reload_time - .01
+                    target_state["shot_at"] = self.weapon._reload_time - .01
 
         else:
             self._target = ...
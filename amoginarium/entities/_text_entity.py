@@ -13,6 +13,7 @@ import pygame as pg
 
 from ..logic import coord_t, Color, Vec2, convert_coord
 from ..render_bindings import renderer, tColor
+from ..base._static_layer import static_layer
 from ..base import Drawn, Updated
 
 
@@ -57,6 +58,9 @@ class TextEntity(pg.sprite.Sprite):
         # generate text surface once
         self._regenerate_surface()
 
+        # the text never moves, so it only has to be drawn once
+        static_layer.add(self)
+
     def _regenerate_surface(self) -> None:
         """
         update the pygame surface (on parameter change)
@@ -71,6 +75,21 @@ class TextEntity(pg.sprite.Sprite):
             self._italic,
         )
 
+        # draw_pg_surf draws upwards from the given position
+        width, height = self._text_surf.get_size()
+        self.rect = pg.Rect(
+            self._pos.x, self._pos.y - height, width, height
+        )
+
+        # re-bake if the text changed
+        if self in static_layer:
+            static_layer.remove(self)
+            static_layer.add(self)
+
+    def kill(self) -> None:
+        static_layer.remove(self)
+        super().kill()
+
     def gl_draw(self):
         now = self._pos - Updated.world_position
         renderer.draw_pg_surf(
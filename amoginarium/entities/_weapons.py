@@ -15,14 +15,16 @@ from icecream import ic
 # import time
 
 from ..base import GravityAffected, CollisionDestroyed, Bullets, Updated, Drawn
+from ..base import Players
 from ..audio import PresetEffect, LargeExplosion, Shotgun, sound_effect_wrapper
 from ..audio import ContinuousSoundEffect, Minigun as MinigunSound
 from ._base_entity import ImageEntity, Entity
 from ..render_bindings import renderer
 from ..base._linked import global_vars
+from ..base._static_layer import static_layer
 from ..base._textures import textures
 from ..animations import explosion
-from ..logic import Vec2, Color
+from ..logic import Vec2, Color, CollisionLayer
 from ..base import WallCollider
 
 
@@ -61,9 +63,12 @@ class Bullet(ImageEntity):
     ) -> None:
         size = Vec2.from_cartesian(size, size)
         self._casing = casing
+        self.collision_layer = CollisionLayer.CASING if casing \
+            else CollisionLayer.BULLET
         self._parent = parent
         self._base_damage = base_damage
         self._ttl = time_to_life
+        self._time_to_life = time_to_life
         self._initial_velocity = initial_velocity
         self._explosion_radius = explosion_radius
         self._explosion_damage = explosion_damage
@@ -148,11 +153,16 @@ class Bullet(ImageEntity):
             not Updated.out_of_bounds_x(self)
         ]):
             self.position.y -= self.size.y / 2
-            self.remove(
-                Updated,
-                CollisionDestroyed,
-                GravityAffected
+            self.update_rect()
+
+            # settled casings only live on as part of the static layer
+            static_layer.add_decal(
+                self._texture_id,
+                Vec2.from_cartesian(*self.rect.topleft),
+                self.size
             )
+            self.remove(Drawn)
+            super().kill()
             return
 
         # explode
@@ -171,6 +181,25 @@ class Bullet(ImageEntity):
                         hit_by=self
                     )
 
+            # throw settled casings around (they become casings again)
+            for decal in static_layer.take_decals(
+                self.position,
+                self._explosion_radius
+            ):
+                position = decal["position"] + decal["size"] / 2
+                push = position - self.position
+                push.length = (1 - push.length / self._explosion_radius) \
+                    * self._explosion_damage * 10
+
+                Bullet(
+                    self,
+                    self.coalition,
+                    position,
+                    push,
+                    casing=True,
+                    size=int(decal["size"].x)
+                )
+
             explosion.draw(
                 delay=.05,
                 size=Vec2.from_cartesian(
@@ -181,9 +210,9 @@ class Bullet(ImageEntity):
             )
 
             if self._explosion_radius > 64:
-                exp = LargeExplosion()
-                exp.volume = .35
-                exp.play()
+                LargeExplosion.from_pool(volume=.35).play(
+                    position=self.position
+                )
 
             # sounds like shit
             # elif self._explosion_radius < 16:
@@ -271,6 +300,13 @@ class BaseWeapon:
     def mag_size(self) -> int:
         return self.mag_size
 
+    @property
+    def sound_category(self) -> str:
+        """
+        the players own weapons may use reserved channels
+        """
+        return "player" if self.parent in Players else "effect"
+
     @property
     def recoil_factor(self) -> float:
         return self.recoil_factor
@@ -313,9 +349,9 @@ class BaseWeapon:
         if self._current_reload_time < 0 and self._mag_state <= 0:
             self._current_reload_time = 0
             self._mag_state = self._mag_size
-            sound_effect = sound_effect_wrapper("reload_generic")
-            sound_effect.volume = .4
-            sound_effect.play()
+            sound_effect_wrapper(
+                "reload_generic", .4, self.sound_category
+            ).play(position=self.parent.position)
 
         # recoil time
         if self._current_recoil_time > 0:
@@ -364,16 +400,20 @@ class BaseWeapon:
         if self._sound_effect is not ...:
             if hasattr(self._sound_effect, "stage_one_done"):
                 if self.__sound_effect is ...:
-                    self.__sound_effect = self._sound_effect()
+                    self.__sound_effect = self._sound_effect(
+                        self.sound_category,
+                        self.parent.position
+                    )
                     return False
 
                 if not self.__sound_effect.stage_one_done:
                     return False
 
             else:
-                exp = self._sound_effect()
-                exp.volume = .7
-                exp.play()
+                self._sound_effect.from_pool(
+                    volume=.7,
+                    category=self.sound_category
+                ).play(position=self.parent.position)
 
         # inacuracy
         offset = randint(-255, 255) / 255
@@ -1,5 +1,12 @@
-from ._utility_classes import BetterDict, SimpleLock, WDTimer, Color
+from ._utility_classes import BetterDict, WDTimer, Color
+from ._sync import SimpleLock, MPSCQueue, OneShotEvent, SeqLock, SyncStats
 from ._utility_functions import is_parent, is_related, classname, convert_coord
 from ._utility_functions import coord_t
 from ._calculations import calculate_launch_angle
 from ._vectors import Vec2
+from ._spatial import SpatialGrid
+from ._relations import CollisionLayer, are_related, coalition_to_id
+from ._relations import can_interact
+from ._relations import interaction_matrix, COLLISION_TABLE, FRIENDLY_FIRE_TABLE
+from ._asset_pack import AssetPack, PackWriter, PackManifest, PACK_VERSION
+from ._latency import LatencyHistogram, InputLatency, HistogramSummary
@@ -0,0 +1,266 @@
+"""
+_asset_pack.py
+19. October 2026
+
+pre-baked asset packs (see bake_assets.py)
+
+Author:
+Nilusink
+"""
+from contextlib import suppress
+import typing as tp
+import json
+import mmap
+import os
+
+
+PACK_VERSION: int = 1
+
+type pack_kind_t = tp.Literal["images", "sounds"]
+
+
+class PackedImage(tp.TypedDict):
+    name: str
+    file: str  # file inside the source
+    source_hash: str
+
+
+class PackedTexture(tp.TypedDict):
+    name: str
+    size: tuple[int, int] | None  # requested size
+    mirror: str
+    width: int
+    height: int
+    offset: int
+    length: int
+
+
+class PackedSound(tp.TypedDict):
+    name: str
+    offset: int
+    length: int
+
+
+class PackManifest(tp.TypedDict):
+    version: int
+    kind: pack_kind_t
+    scope: str
+    source_stamp: float
+    format: str  # renderer name or mixer format, must match at runtime
+    images: list[PackedImage]
+    textures: list[PackedTexture]
+    sounds: list[PackedSound]
+
+
+def source_stamp(path: str) -> float:
+    """
+    newest modification time of a zip file or a directory
+    """
+    path = path.rstrip("/")
+    stamp = os.path.getmtime(path)
+
+    if os.path.isdir(path):
+        for file in os.listdir(path):
+            stamp = max(stamp, os.path.getmtime(path + "/" + file))
+
+    return stamp
+
+
+def pack_files(pack_dir: str, kind: pack_kind_t, scope: str) -> tuple[str, str]:
+    """
+    :returns: manifest file, data file
+    """
+    base = os.path.join(pack_dir, f"{scope}.{kind}")
+
+    return base + ".json", base + ".pack"
+
+
+class PackWriter:
+    """
+    writes a pack, the files are only replaced once `close` is called
+    """
+    def __init__(
+            self,
+            pack_dir: str,
+            kind: pack_kind_t,
+            scope: str,
+            source: str,
+            fmt: str
+    ) -> None:
+        os.makedirs(pack_dir, exist_ok=True)
+
+        self._manifest_file, self._data_file = pack_files(
+            pack_dir, kind, scope
+        )
+        self._data = open(self._data_file + ".tmp", "wb")
+        self._offset = 0
+
+        self.manifest: PackManifest = {
+            "version": PACK_VERSION,
+            "kind": kind,
+            "scope": scope,
+            "source_stamp": source_stamp(source),
+            "format": fmt,
+            "images": [],
+            "textures": [],
+            "sounds": []
+        }
+
+    @property
+    def length(self) -> int:
+        return self._offset
+
+    def _write(self, data: tp.Any) -> tuple[int, int]:
+        offset = self._offset
+        length = len(memoryview(data).cast("B"))
+
+        self._data.write(data)
+        self._offset += length
+
+        return offset, length
+
+    def add_image(self, name: str, file: str, source_hash: str) -> None:
+        self.manifest["images"].append({
+            "name": name,
+            "file": file,
+            "source_hash": source_hash
+        })
+
+    def add_texture(
+            self,
+            name: str,
+            size: tuple[int, int] | None,
+            mirror: str,
+            data: tp.Any,
+            prepared_size: tuple[int, int]
+    ) -> None:
+        offset, length = self._write(data)
+
+        self.manifest["textures"].append({
+            "name": name,
+            "size": size,
+            "mirror": mirror,
+            "width": prepared_size[0],
+            "height": prepared_size[1],
+            "offset": offset,
+            "length": length
+        })
+
+    def add_sound(self, name: str, data: bytes) -> None:
+        offset, length = self._write(data)
+
+        self.manifest["sounds"].append({
+            "name": name,
+            "offset": offset,
+            "length": length
+        })
+
+    def close(self) -> None:
+        self._data.close()
+        os.replace(self._data_file + ".tmp", self._data_file)
+
+        with open(self._manifest_file + ".tmp", "w") as f:
+            json.dump(self.manifest, f, indent=1)
+
+        os.replace(self._manifest_file + ".tmp", self._manifest_file)
+
+
+class AssetPack:
+    """
+    a memory-mapped pack
+    """
+    def __init__(self, manifest: PackManifest, data: mmap.mmap) -> None:
+        self.manifest = manifest
+        self._data = data
+
+        self._textures: dict[tuple, PackedTexture] = {
+            (t["name"], t["size"], t["mirror"]): t
+            for t in manifest["textures"]
+        }
+
+    @classmethod
+    def open(
+            cls,
+            pack_dir: str | None,
+            kind: pack_kind_t,
+            scope: str,
+            source: str,
+            fmt: str
+    ) -> tp.Self | None:
+        """
+        open a pack if one exists and is up to date
+
+        :param source: the zip file or directory the pack was baked from
+        :param fmt: the renderer name or mixer format the pack was
+            baked for
+        """
+        if pack_dir is None:
+            return None
+
+        manifest_file, data_file = pack_files(pack_dir, kind, scope)
+
+        if not (os.path.isfile(manifest_file) and os.path.isfile(data_file)):
+            return None
+
+        try:
+            with open(manifest_file, "r") as f:
+                manifest: PackManifest = json.load(f)
+
+            if any([
+                manifest["version"] != PACK_VERSION,
+                manifest["kind"] != kind,
+                manifest["format"] != fmt,
+                manifest["source_stamp"] < source_stamp(source)
+            ]):
+                return None
+
+            # json doesn't know tuples
+            for texture in manifest["textures"]:
+                if texture["size"] is not None:
+                    texture["size"] = tuple(texture["size"])
+
+            with open(data_file, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return None
+
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        except (OSError, ValueError, KeyError):
+            return None
+
+        return cls(manifest, data)
+
+    def _read(self, offset: int, length: int) -> memoryview:
+        return memoryview(self._data)[offset:offset + length]
+
+    def get_texture(
+            self,
+            name: str,
+            size: tuple[int, int] | None,
+            mirror: str
+    ) -> tuple[memoryview, tuple[int, int]] | None:
+        """
+        prepared texture data of a variant
+
+        :param mirror: has to be normalised
+        :returns: data, (width, height) or None if it wasn't baked
+        """
+        texture = self._textures.get((name, size, mirror))
+
+        if texture is None:
+            return None
+
+        return (
+            self._read(texture["offset"], texture["length"]),
+            (texture["width"], texture["height"])
+        )
+
+    def get_sound(self, sound: PackedSound) -> memoryview:
+        """
+        raw sample data of a sound
+        """
+        return self._read(sound["offset"], sound["length"])
+
+    def close(self) -> None:
+        with suppress(BufferError):
+            self._data.close()
@@ -0,0 +1,171 @@
+"""
+_latency.py
+19. October 2026
+
+latency histograms for controller input (from the socket to the screen)
+
+Author:
+Nilusink
+"""
+from bisect import bisect_left
+import typing as tp
+
+
+# upper bucket edges in ms, everything above goes into the last bucket
+BUCKET_EDGES: tuple[float, ...] = (
+    .5, 1, 2, 3, 4, 5, 7.5, 10, 15, 20, 30, 50, 75, 100, 150, 250
+)
+
+
+class HistogramSummary(tp.TypedDict):
+    n: int
+    mean: float  # ms
+    jitter: float  # standard deviation, ms
+    min: float
+    max: float
+    p50: float
+    p99: float
+    edges: tuple[float, ...]
+    counts: list[int]
+
+
+class LatencyHistogram:
+    """
+    counts samples in fixed buckets, so adding a sample is cheap and
+    the memory use doesn't grow with the game duration
+    """
+    def __init__(self) -> None:
+        self._counts = [0] * (len(BUCKET_EDGES) + 1)
+        self._n = 0
+        self._sum = 0.0
+        self._sum_sq = 0.0
+        self._min = float("inf")
+        self._max = 0.0
+        self.latest = 0.0
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def mean(self) -> float:
+        return self._sum / self._n if self._n else 0
+
+    @property
+    def jitter(self) -> float:
+        if self._n < 2:
+            return 0
+
+        return max(self._sum_sq / self._n - self.mean**2, 0)**.5
+
+    def add(self, seconds: float) -> None:
+        ms = seconds * 1000
+
+        self._counts[bisect_left(BUCKET_EDGES, ms)] += 1
+        self._n += 1
+        self._sum += ms
+        self._sum_sq += ms**2
+        self._min = min(self._min, ms)
+        self._max = max(self._max, ms)
+        self.latest = ms
+
+    def percentile(self, p: float) -> float:
+        """
+        upper edge of the bucket containing the p-th percentile
+        (the maximum for the last bucket)
+        """
+        target = p / 100 * self._n
+        total = 0
+
+        for i, count in enumerate(self._counts):
+            total += count
+
+            if total >= target and count:
+                return BUCKET_EDGES[i] if i < len(BUCKET_EDGES) else self._max
+
+        return 0
+
+    def summary(self) -> HistogramSummary:
+        return {
+            "n": self._n,
+            "mean": self.mean,
+            "jitter": self.jitter,
+            "min": self._min if self._n else 0,
+            "max": self._max,
+            "p50": self.percentile(50),
+            "p99": self.percentile(99),
+            "edges": BUCKET_EDGES,
+            "counts": self._counts.copy()
+        }
+
+
+class InputLatency:
+    """
+    follows the newest input of a controller through the game:
+
+    * interval: time between two received updates
+    * applied: receive -> written to the controls (`update_controls`)
+    * consumed: receive -> first logic tick using the new controls
+    * displayed: receive -> first frame showing the result
+
+    `received` is written by the comms thread, `consume` and `display`
+    are called by the game loop
+    """
+    stages: tuple[str, ...] = ("interval", "applied", "consumed", "displayed")
+
+    def __init__(self) -> None:
+        self.histograms: dict[str, LatencyHistogram] = {
+            stage: LatencyHistogram() for stage in self.stages
+        }
+
+        self._last_received: float | None = None
+        self._pending: float | None = None  # not yet consumed
+        self._consumed: float | None = None  # not yet displayed
+
+    def received(self, received: float, applied: float) -> None:
+        """
+        new controls were written
+
+        :param received: when the data arrived at the socket
+        :param applied: when it was written to the controls
+        """
+        if self._last_received is not None:
+            self.histograms["interval"].add(received - self._last_received)
+
+        self._last_received = received
+        self.histograms["applied"].add(applied - received)
+
+        # an input that was never consumed is simply replaced
+        self._pending = received
+
+    def consume(self, now: float) -> None:
+        """
+        a logic tick is about to read the controls
+        """
+        received, self._pending = self._pending, None
+
+        if received is None:
+            return
+
+        self.histograms["consumed"].add(now - received)
+        self._consumed = received
+
+    def display(self, now: float) -> float | None:
+        """
+        a frame was shown
+
+        :returns: the end-to-end latency if the frame shows a new input
+        """
+        received, self._consumed = self._consumed, None
+
+        if received is None:
+            return None
+
+        self.histograms["displayed"].add(now - received)
+        return now - received
+
+    def summary(self) -> dict[str, HistogramSummary]:
+        return {
+            stage: histogram.summary()
+            for stage, histogram in self.histograms.items()
+            if len(histogram)
+        }
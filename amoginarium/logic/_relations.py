@@ -0,0 +1,147 @@
+"""
+_relations.py
+19. October 2026
+
+integer based relationship and collision-layer filtering
+
+Author:
+Nilusink
+"""
+from enum import Enum, IntFlag
+import typing as tp
+import numpy as np
+
+
+NO_COALITION: int = -1
+
+
+class CollisionLayer(IntFlag):
+    NONE = 0
+    ENTITY = 1
+    PLAYER = 2
+    TURRET = 4
+    BULLET = 8
+    CASING = 16
+    ALL = ENTITY | PLAYER | TURRET | BULLET | CASING
+
+
+# which layers a layer can interact with (collision or explosion)
+# everything interacts with everything, except casings: they are purely
+# visual and deliberately never collide (not even with each other)
+COLLISION_TABLE: dict[CollisionLayer, CollisionLayer] = {
+    CollisionLayer.NONE: CollisionLayer.NONE,
+    CollisionLayer.ENTITY: CollisionLayer.ALL,
+    CollisionLayer.PLAYER: CollisionLayer.ALL,
+    CollisionLayer.TURRET: CollisionLayer.ALL,
+    CollisionLayer.BULLET: CollisionLayer.ALL,
+    CollisionLayer.CASING: CollisionLayer.NONE,
+}
+
+# which layers a layer can interact with if both are in the same coalition
+# (casings never collide, see above)
+FRIENDLY_FIRE_TABLE: dict[CollisionLayer, CollisionLayer] = {
+    CollisionLayer.NONE: CollisionLayer.NONE,
+    CollisionLayer.ENTITY: CollisionLayer.ALL,
+    CollisionLayer.PLAYER: CollisionLayer.ALL,
+    CollisionLayer.TURRET: CollisionLayer.ALL,
+    CollisionLayer.BULLET: CollisionLayer.ALL,
+    CollisionLayer.CASING: CollisionLayer.NONE,
+}
+
+
+def coalition_to_id(coalition: tp.Any) -> int:
+    """
+    convert a coalition to a small integer (NO_COALITION if not set)
+    """
+    if isinstance(coalition, Enum):
+        return int(coalition.value)
+
+    if isinstance(coalition, int):
+        return coalition
+
+    return NO_COALITION
+
+
+def are_related(a: tp.Any, b: tp.Any, depth: int = 2) -> bool:
+    """
+    same as `is_related`, but only compares the precomputed integer ids
+    (`id`, `owner_id` and `coalition_id`)
+
+    depths:
+    1: true if a == b
+    2: true if a == b or parent
+    3: true if all of the above or siblings
+    4: coalition
+    """
+    if a.id == b.id:
+        return True
+
+    if depth <= 1:
+        return False
+
+    if a.owner_id == b.id or b.owner_id == a.id:
+        return True
+
+    if depth <= 2:
+        return False
+
+    if a.owner_id == b.owner_id:
+        return True
+
+    if depth <= 3:
+        return False
+
+    return a.coalition_id == b.coalition_id
+
+
+def can_interact(a: tp.Any, b: tp.Any, depth: int = 2) -> bool:
+    """
+    single pair version of `interaction_matrix`
+    """
+    if a.coalition_id == b.coalition_id:
+        mask_a, mask_b = a.friendly_mask, b.friendly_mask
+
+    else:
+        mask_a, mask_b = a.collision_mask, b.collision_mask
+
+    if not (mask_a & b.collision_layer and mask_b & a.collision_layer):
+        return False
+
+    return not are_related(a, b, depth)
+
+
+def interaction_matrix(
+        ids: np.ndarray,
+        owner_ids: np.ndarray,
+        coalition_ids: np.ndarray,
+        layers: np.ndarray,
+        masks: np.ndarray,
+        friendly_masks: np.ndarray,
+        depth: int = 2
+) -> np.ndarray:
+    """
+    vectorised version of `are_related` and the collision tables
+
+    :returns: n x n bool matrix, true if entity i and j may interact
+    """
+    same_coalition = coalition_ids[:, None] == coalition_ids[None, :]
+
+    # can i hit j and j hit i
+    mask_i = np.where(same_coalition, friendly_masks[:, None], masks[:, None])
+    mask_j = np.where(same_coalition, friendly_masks[None, :], masks[None, :])
+    out = ((mask_i & layers[None, :]) != 0) & ((mask_j & layers[:, None]) != 0)
+
+    # remove related pairs
+    related = ids[:, None] == ids[None, :]
+
+    if depth >= 2:
+        related |= owner_ids[:, None] == ids[None, :]
+        related |= ids[:, None] == owner_ids[None, :]
+
+    if depth >= 3:
+        related |= owner_ids[:, None] == owner_ids[None, :]
+
+    if depth >= 4:
+        related |= same_coalition
+
+    return out & ~related
@@ -0,0 +1,214 @@
+"""
+_spatial.py
+19. October 2026
+
+a uniform grid for fast radius and nearest-neighbour queries
+
+Author:
+Nilusink
+"""
+import typing as tp
+import math as m
+
+from ._utility_functions import coord_t, convert_coord
+
+
+type cell_t = tuple[int, int]
+type grid_entry_t = tuple[float, float, tp.Any, tp.Any]
+
+
+class SpatialGrid:
+    """
+    buckets entities into square cells, so queries only have to look at
+    the cells around the query position instead of every entity
+
+    the grid is meant to be rebuilt once per tick with `rebuild`
+    """
+    def __init__(self, cell_size: float = 256) -> None:
+        self._cell_size = cell_size
+        self._cells: dict[cell_t, list[grid_entry_t]] = {}
+        self._n_entries = 0
+
+        # bounds of all occupied cells (limits nearest-neighbour search)
+        self._min_cell: cell_t = (0, 0)
+        self._max_cell: cell_t = (0, 0)
+
+    def __len__(self) -> int:
+        return self._n_entries
+
+    @property
+    def cell_size(self) -> float:
+        return self._cell_size
+
+    def _cell_of(self, x: float, y: float) -> cell_t:
+        return int(x // self._cell_size), int(y // self._cell_size)
+
+    def clear(self) -> None:
+        """
+        remove all entries
+        """
+        self._cells.clear()
+        self._n_entries = 0
+        self._min_cell = (0, 0)
+        self._max_cell = (0, 0)
+
+    def insert(
+            self,
+            item: tp.Any,
+            position: coord_t,
+            coalition: tp.Any = ...
+    ) -> None:
+        """
+        add a single item at the given position
+        """
+        x, y = convert_coord(position)
+        cell = self._cell_of(x, y)
+
+        if self._n_entries == 0:
+            self._min_cell = cell
+            self._max_cell = cell
+
+        else:
+            self._min_cell = (
+                min(self._min_cell[0], cell[0]),
+                min(self._min_cell[1], cell[1])
+            )
+            self._max_cell = (
+                max(self._max_cell[0], cell[0]),
+                max(self._max_cell[1], cell[1])
+            )
+
+        if cell not in self._cells:
+            self._cells[cell] = []
+
+        self._cells[cell].append((x, y, item, coalition))
+        self._n_entries += 1
+
+    def rebuild(self, entities: tp.Iterable[tp.Any]) -> None:
+        """
+        clear the grid and insert all entities (requires `.position`)
+        """
+        self.clear()
+
+        for entity in entities:
+            self.insert(
+                entity,
+                entity.position.xy,
+                getattr(entity, "coalition", ...)
+            )
+
+    @staticmethod
+    def _matches(
+            entry: grid_entry_t,
+            coalition: tp.Any,
+            exclude_coalition: tp.Any
+    ) -> bool:
+        if coalition is not ... and entry[3] != coalition:
+            return False
+
+        if exclude_coalition is not ... and entry[3] == exclude_coalition:
+            return False
+
+        return True
+
+    def query_circle(
+            self,
+            center: coord_t,
+            radius: float,
+            coalition: tp.Any = ...,
+            exclude_coalition: tp.Any = ...
+    ) -> list[tuple[float, tp.Any]]:
+        """
+        get all items inside a circle, sorted by distance (closest first)
+
+        :param coalition: only return items of this coalition
+        :param exclude_coalition: don't return items of this coalition
+        """
+        cx, cy = convert_coord(center)
+        min_x, min_y = self._cell_of(cx - radius, cy - radius)
+        max_x, max_y = self._cell_of(cx + radius, cy + radius)
+        radius_sq = radius ** 2
+
+        out = []
+        for cell_x in range(min_x, max_x + 1):
+            for cell_y in range(min_y, max_y + 1):
+                cell = self._cells.get((cell_x, cell_y))
+
+                if cell is None:
+                    continue
+
+                for entry in cell:
+                    dist_sq = (entry[0] - cx) ** 2 + (entry[1] - cy) ** 2
+
+                    if dist_sq <= radius_sq and self._matches(
+                            entry, coalition, exclude_coalition
+                    ):
+                        out.append((m.sqrt(dist_sq), entry[2]))
+
+        out.sort(key=lambda r: r[0])
+        return out
+
+    def k_nearest(
+            self,
+            center: coord_t,
+            k: int,
+            radius: float = m.inf,
+            coalition: tp.Any = ...,
+            exclude_coalition: tp.Any = ...
+    ) -> list[tuple[float, tp.Any]]:
+        """
+        get the `k` closest items (optionally limited to `radius`),
+        sorted by distance (closest first)
+        """
+        if radius != m.inf:
+            return self.query_circle(
+                center, radius, coalition, exclude_coalition
+            )[:k]
+
+        if k <= 0 or self._n_entries == 0:
+            return []
+
+        cx, cy = convert_coord(center)
+        center_cell = self._cell_of(cx, cy)
+
+        # rings needed to cover every occupied cell
+        max_ring = max(
+            abs(center_cell[0] - self._min_cell[0]),
+            abs(center_cell[0] - self._max_cell[0]),
+            abs(center_cell[1] - self._min_cell[1]),
+            abs(center_cell[1] - self._max_cell[1]),
+        )
+
+        found: list[tuple[float, tp.Any]] = []
+        for ring in range(max_ring + 1):
+            for cell_x in range(
+                    center_cell[0] - ring,
+                    center_cell[0] + ring + 1
+            ):
+                for cell_y in range(
+                        center_cell[1] - ring,
+                        center_cell[1] + ring + 1
+                ):
+                    # only visit the outline of the ring
+                    if ring and ring not in (
+                        abs(cell_x - center_cell[0]),
+                        abs(cell_y - center_cell[1])
+                    ):
+                        continue
+
+                    for entry in self._cells.get((cell_x, cell_y), ()):
+                        if self._matches(entry, coalition, exclude_coalition):
+                            found.append((
+                                m.hypot(entry[0] - cx, entry[1] - cy),
+                                entry[2]
+                            ))
+
+            # everything closer than this distance has already been visited
+            if len(found) >= k:
+                found.sort(key=lambda r: r[0])
+
+                if found[k - 1][0] <= ring * self._cell_size:
+                    return found[:k]
+
+        found.sort(key=lambda r: r[0])
+        return found[:k]
@@ -0,0 +1,265 @@
+"""
+_sync.py
+19. October 2026
+
+synchronisation primitives for handing data between threads, all of
+them count how often (and how long) a thread had to wait
+
+Author:
+Nilusink
+"""
+from contextlib import contextmanager
+from collections import deque
+from time import perf_counter, sleep
+import threading
+import typing as tp
+import copy
+
+
+class SyncStats(tp.TypedDict):
+    acquired: int
+    contended: int  # had to wait
+    timed_out: int
+    wait_time: float  # total, s
+    max_wait: float  # s
+
+
+def _new_stats() -> SyncStats:
+    return {
+        "acquired": 0,
+        "contended": 0,
+        "timed_out": 0,
+        "wait_time": 0.0,
+        "max_wait": 0.0
+    }
+
+
+def _add_wait(stats: SyncStats, waited: float) -> None:
+    stats["contended"] += 1
+    stats["wait_time"] += waited
+    stats["max_wait"] = max(stats["max_wait"], waited)
+
+
+class SimpleLock:
+    """
+    a `threading.Lock` (blocks without spinning) that keeps statistics,
+    can be used as a context manager
+    """
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stats = _new_stats()
+
+    def __enter__(self) -> tp.Self:
+        self.aquire()
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.release()
+
+    @property
+    def stats(self) -> SyncStats:
+        return self._stats.copy()
+
+    @property
+    def locked(self) -> bool:
+        return self._lock.locked()
+
+    def aquire(
+        self,
+        timeout: float = 0
+    ) -> bool:
+        """
+        :param timeout: timeout in seconds (0: wait forever)
+        :returns: if the lock was acquired
+        """
+        # uncontended, no time measurement needed
+        if self._lock.acquire(blocking=False):
+            self._stats["acquired"] += 1
+            return True
+
+        start = perf_counter()
+        acquired = self._lock.acquire(timeout=timeout if timeout > 0 else -1)
+
+        if not acquired:
+            self._stats["timed_out"] += 1
+            return False
+
+        # stats are only written while holding the lock
+        self._stats["acquired"] += 1
+        _add_wait(self._stats, perf_counter() - start)
+
+        return True
+
+    acquire = aquire
+
+    def release(self) -> None:
+        """
+        release the lock (from any thread)
+        """
+        self._lock.release()
+
+
+class MPSCQueue[T]:
+    """
+    multiple producers, a single consumer
+
+    `put` never blocks (deque appends are atomic), the consumer takes
+    everything that is waiting at once with `drain`
+    """
+    def __init__(self) -> None:
+        self._items: deque[T] = deque()
+
+        # only written by the consumer
+        self.n_taken = 0
+        self.max_depth = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(self, item: T) -> None:
+        self._items.append(item)
+
+    def drain(self) -> list[T]:
+        """
+        take all items that are currently waiting (oldest first)
+        """
+        n = len(self._items)
+        if n == 0:
+            return []
+
+        self.max_depth = max(self.max_depth, n)
+        self.n_taken += n
+
+        return [self._items.popleft() for _ in range(n)]
+
+
+class OneShotEvent[T]:
+    """
+    set exactly once (with an optional value), waiting threads and
+    callbacks are released when it is set
+    """
+    def __init__(self) -> None:
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._value: T = None
+        self._callbacks: list[tp.Callable[[T], tp.Any]] = []
+        self._stats = _new_stats()
+
+    @property
+    def is_set(self) -> bool:
+        return self._event.is_set()
+
+    @property
+    def stats(self) -> SyncStats:
+        return self._stats.copy()
+
+    def set(self, value: T = None) -> bool:
+        """
+        :returns: False if it already was set (the value is ignored)
+        """
+        with self._lock:
+            if self._event.is_set():
+                return False
+
+            self._value = value
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+
+        for callback in callbacks:
+            callback(value)
+
+        return True
+
+    def on_set(self, callback: tp.Callable[[T], tp.Any]) -> None:
+        """
+        call `callback` with the value once set (right now if it already is)
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+
+        callback(self._value)
+
+    def wait(self, timeout: float | None = None) -> T:
+        """
+        :raises TimeoutError: if it wasn't set within `timeout` seconds
+        """
+        if self._event.is_set():
+            self._stats["acquired"] += 1
+            return self._value
+
+        start = perf_counter()
+
+        if not self._event.wait(timeout):
+            self._stats["timed_out"] += 1
+            raise TimeoutError("event wasn't set in time")
+
+        self._stats["acquired"] += 1
+        _add_wait(self._stats, perf_counter() - start)
+
+        return self._value
+
+
+class SeqLock[T]:
+    """
+    a single writer changes `value` in place (inside `write`), readers
+    copy it and retry if a write happened in the meantime, so the writer
+    never waits and readers never see a half-written value
+    """
+    def __init__(
+            self,
+            value: T,
+            copy_value: tp.Callable[[T], T] = copy.copy
+    ) -> None:
+        self._value = value
+        self._copy = copy_value
+        self._seq = 0  # odd while writing
+
+        # only written by the reader
+        self._stats = _new_stats()
+
+    @property
+    def stats(self) -> SyncStats:
+        return self._stats.copy()
+
+    @contextmanager
+    def write(self) -> tp.Iterator[T]:
+        """
+        only one thread may write
+        """
+        self._seq += 1
+
+        try:
+            yield self._value
+
+        finally:
+            self._seq += 1
+
+    def read(self) -> T:
+        """
+        a consistent copy of the value
+        """
+        start = ...
+
+        while True:
+            seq = self._seq
+
+            if not seq & 1:
+                snapshot = self._copy(self._value)
+
+                if seq == self._seq:
+                    break
+
+            # a write is in progress, let the writer finish
+            if start is ...:
+                start = perf_counter()
+
+            sleep(0)
+
+        self._stats["acquired"] += 1
+
+        if start is not ...:
+            _add_wait(self._stats, perf_counter() - start)
+
+        return snapshot
@@ -7,11 +7,9 @@ defines a few useful classes
 Author:
 Nilusink, melektron
 """
-from time import perf_counter
 import typing as tp
 import math as m
 import asyncio
-import inspect
 
 
 class BetterDict:
@@ -32,42 +30,6 @@ class BetterDict:
         delattr(self, key)
 
 
-class SimpleLock:
-    def __init__(self) -> None:
-        self.__locked_by: str = ...
-
-    def aquire(
-        self,
-        timeout: float = 0
-    ) -> bool:
-        """
-        :param timeout: timeout in seconds
-        """
-        start = perf_counter()
-
-        curframe = inspect.currentframe()
-        called_by = inspect.getouterframes(curframe, 2)[1][3]
-
-        while perf_counter() - start > timeout or timeout == 0:
-            if self.__locked_by is ...:
-                self.__locked_by = called_by
-                return True
-
-        return False
-
-    def release(self) -> None:
-        """
-        release a lock (only works from same function)
-        """
-        curframe = inspect.currentframe()
-        called_by = inspect.getouterframes(curframe, 2)[1][3]
-
-        if called_by != self.__locked_by:
-            raise NameError("Lock can't be released from different function!")
-
-        self.__locked_by = ...
-
-
 class _BaseTimer:
     @staticmethod
     def _run_callback(cb: tp.Union[tp.Callable, None]):
@@ -21,6 +21,7 @@ type tColor = Color3 | Color4
 
 # depending on the renderer, TextureID will be a different type
 type TextureID = tp.Any
+type RenderTarget = tp.Any
 
 
 class BaseRenderer:
@@ -43,6 +44,37 @@ class BaseRenderer:
         """
         raise NotImplementedError
 
+    @staticmethod
+    def prepare_texture(
+            image: Image.Image,
+            size: coord_t | None = None,
+            mirror: tp.Literal["x", "y", "xy", "yx"] = "",
+    ) -> tuple[tp.Any, tuple[int, int]]:
+        """
+        resize, mirror and convert an image to the renderers pixel format
+        (can be cached and passed to `upload_texture`)
+
+        :returns: pixel data, (width, height)
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def upload_texture(
+            data: tp.Any,
+            size: tuple[int, int]
+    ) -> TextureID:
+        """
+        create a texture from data returned by `prepare_texture`
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def delete_texture(texture_id: TextureID) -> None:
+        """
+        free a texture
+        """
+        raise NotImplementedError
+
     @staticmethod
     def draw_textured_quad(
             texture_id: TextureID,
@@ -55,6 +87,47 @@ class BaseRenderer:
         """
         raise NotImplementedError
 
+    def create_render_target(self, size: coord_t) -> RenderTarget:
+        """
+        create an (empty) offscreen texture that can be drawn to
+        """
+        raise NotImplementedError
+
+    def delete_render_target(self, target: RenderTarget) -> None:
+        """
+        free the resources of a render target
+        """
+        raise NotImplementedError
+
+    def begin_render_target(
+            self,
+            target: RenderTarget,
+            clear: bool = False
+    ) -> None:
+        """
+        redirect all following draw calls to the render target
+        (coordinates start at the targets top-left corner)
+        """
+        raise NotImplementedError
+
+    def end_render_target(self) -> None:
+        """
+        continue drawing to the screen
+        """
+        raise NotImplementedError
+
+    def draw_render_target(
+            self,
+            target: RenderTarget,
+            pos: coord_t,
+            size: coord_t,
+            convert_global: bool = True
+    ) -> None:
+        """
+        draw the contents of a render target
+        """
+        raise NotImplementedError
+
     @staticmethod
     def check_out_of_screen(
             pos,
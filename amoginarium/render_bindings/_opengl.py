@@ -16,7 +16,13 @@ from OpenGL.GL import GL_UNSIGNED_BYTE, GL_MODELVIEW, GL_ONE_MINUS_SRC_ALPHA
 from OpenGL.GL import GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_REPEAT, GL_LINES
 from OpenGL.GL import GL_TEXTURE_WRAP_T, GL_TEXTURE_MIN_FILTER, GL_POLYGON
 from OpenGL.GL import GL_TEXTURE_MAG_FILTER, GL_LINEAR, GL_RGBA, GL_QUADS
-from OpenGL.GL import GL_PROJECTION, GL_SRC_ALPHA, GL_BLEND
+from OpenGL.GL import GL_PROJECTION, GL_SRC_ALPHA, GL_BLEND, GL_ONE
+from OpenGL.GL import glGenFramebuffers, glBindFramebuffer, glViewport
+from OpenGL.GL import glFramebufferTexture2D, glCheckFramebufferStatus
+from OpenGL.GL import glDeleteFramebuffers, glDeleteTextures, glClear
+from OpenGL.GL import glPushMatrix, glPopMatrix, glBlendFuncSeparate
+from OpenGL.GL import GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_CLAMP_TO_EDGE
+from OpenGL.GL import GL_FRAMEBUFFER_COMPLETE, GL_COLOR_BUFFER_BIT
 from OpenGL.GLU import gluOrtho2D
 from pygame.locals import DOUBLEBUF, OPENGL
 from icecream import ic
@@ -32,9 +38,22 @@ from ..base._linked import global_vars
 
 # define types
 type TextureID = int
+type RenderTarget = tuple[int, TextureID, tuple[int, int]]
 
 
 class OpenGLRenderer(BaseRenderer):
+    _target: RenderTarget | None = None
+
+    @property
+    def target_size(self) -> tuple[int, int]:
+        """
+        pixel size of what is currently being drawn to
+        """
+        if self._target is not None:
+            return self._target[2]
+
+        return global_vars.screen_size.xy
+
     def _get_font(
             self,
             size: int,
@@ -150,11 +169,11 @@ class OpenGLRenderer(BaseRenderer):
         ])
 
     @staticmethod
-    def load_texture(
+    def prepare_texture(
             image,
             size,
             mirror=""
-    ) -> tuple[TextureID, tuple[int, int]]:
+    ) -> tuple[bytes, tuple[int, int]]:
         # for debugging
         if size is not None:
             image = image.resize(convert_coord(size))
@@ -169,6 +188,12 @@ class OpenGLRenderer(BaseRenderer):
         width, height = image.size[0], image.size[1]
         img_data = image.convert("RGBA").tobytes("raw", "RGBA", 0, -1)
 
+        return img_data, (width, height)
+
+    @staticmethod
+    def upload_texture(data, size) -> TextureID:
+        width, height = size
+
         texture_id = glGenTextures(1)
         glBindTexture(GL_TEXTURE_2D, texture_id)
         glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_REPEAT)
@@ -184,11 +209,25 @@ class OpenGLRenderer(BaseRenderer):
             0,
             GL_RGBA,
             GL_UNSIGNED_BYTE,
-            img_data
+            data
         )
         glEnable(GL_TEXTURE_2D)
 
-        return texture_id, (width, height)
+        return texture_id
+
+    @staticmethod
+    def delete_texture(texture_id):
+        glDeleteTextures([texture_id])
+
+    @staticmethod
+    def load_texture(
+            image,
+            size,
+            mirror=""
+    ) -> tuple[TextureID, tuple[int, int]]:
+        data, size = OpenGLRenderer.prepare_texture(image, size, mirror)
+
+        return OpenGLRenderer.upload_texture(data, size), size
 
     @staticmethod
     def draw_textured_quad(
@@ -234,6 +273,140 @@ class OpenGLRenderer(BaseRenderer):
         glDisable(GL_TEXTURE_2D)
         glFlush()
 
+    def create_render_target(self, size):
+        width, height = (int(v) for v in convert_coord(size))
+
+        texture_id = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, texture_id)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        glTexImage2D(
+            GL_TEXTURE_2D,
+            0,
+            GL_RGBA,
+            width,
+            height,
+            0,
+            GL_RGBA,
+            GL_UNSIGNED_BYTE,
+            None
+        )
+
+        fbo = glGenFramebuffers(1)
+        glBindFramebuffer(GL_FRAMEBUFFER, fbo)
+        glFramebufferTexture2D(
+            GL_FRAMEBUFFER,
+            GL_COLOR_ATTACHMENT0,
+            GL_TEXTURE_2D,
+            texture_id,
+            0
+        )
+
+        if glCheckFramebufferStatus(GL_FRAMEBUFFER) \
+                != GL_FRAMEBUFFER_COMPLETE:
+            glBindFramebuffer(GL_FRAMEBUFFER, 0)
+            glDeleteFramebuffers(1, [fbo])
+            glDeleteTextures([texture_id])
+            raise RuntimeError("unable to create render target")
+
+        # new targets start out transparent
+        glClearColor(0, 0, 0, 0)
+        glClear(GL_COLOR_BUFFER_BIT)
+        glClearColor(0, 0, 0, 1)
+
+        glBindFramebuffer(GL_FRAMEBUFFER, 0)
+
+        return fbo, texture_id, (width, height)
+
+    def delete_render_target(self, target):
+        if target is self._target:
+            self.end_render_target()
+
+        glDeleteFramebuffers(1, [target[0]])
+        glDeleteTextures([target[1]])
+
+    def begin_render_target(self, target, clear=False):
+        if self._target is not None:
+            raise RuntimeError("already drawing to a render target")
+
+        self._target = target
+        width, height = target[2]
+
+        glBindFramebuffer(GL_FRAMEBUFFER, target[0])
+        glViewport(0, 0, width, height)
+
+        if clear:
+            glClearColor(0, 0, 0, 0)
+            glClear(GL_COLOR_BUFFER_BIT)
+            glClearColor(0, 0, 0, 1)
+
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glLoadIdentity()
+        gluOrtho2D(0, width, height, 0)
+        glMatrixMode(GL_MODELVIEW)
+
+        # keep alpha correct when drawing onto a transparent texture
+        # (the result is premultiplied, see draw_render_target)
+        glBlendFuncSeparate(
+            GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA,
+            GL_ONE, GL_ONE_MINUS_SRC_ALPHA
+        )
+
+    def end_render_target(self):
+        if self._target is None:
+            return
+
+        self._target = None
+
+        glBindFramebuffer(GL_FRAMEBUFFER, 0)
+        width, height = global_vars.screen_size.xy
+        glViewport(0, 0, int(width), int(height))
+
+        glMatrixMode(GL_PROJECTION)
+        glPopMatrix()
+        glMatrixMode(GL_MODELVIEW)
+
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+
+    def draw_render_target(self, target, pos, size, convert_global=True):
+        pos = convert_coord(pos, Vec2)
+        size = convert_coord(size, Vec2)
+
+        if convert_global:
+            pos = global_vars.translate_screen_coord(pos)
+            size = global_vars.translate_scale(size)
+
+        glColor3f(1, 1, 1)
+
+        glMatrixMode(GL_MODELVIEW)
+        glLoadIdentity()
+        glTranslate(*pos.xy, 0)
+
+        # render targets contain premultiplied alpha
+        glBlendFunc(GL_ONE, GL_ONE_MINUS_SRC_ALPHA)
+
+        glEnable(GL_TEXTURE_2D)
+        glBindTexture(GL_TEXTURE_2D, target[1])
+        glBegin(GL_QUADS)
+
+        # the texture's first row is the bottom of the target
+        glTexCoord2f(0, 1)
+        glVertex(0, 0, 0)
+        glTexCoord2f(1, 1)
+        glVertex(size.x, 0, 0)
+        glTexCoord2f(1, 0)
+        glVertex(size.x, size.y, 0)
+        glTexCoord2f(0, 0)
+        glVertex(0, size.y, 0)
+
+        glEnd()
+        glDisable(GL_TEXTURE_2D)
+
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+
     def draw_circle(
             self,
             center,
@@ -503,7 +676,7 @@ class OpenGLRenderer(BaseRenderer):
         text_data = pg.image.tostring(surface, "RGBA", True)
         text_size: tuple[int, int] = surface.get_size()
 
-        pos.y = global_vars.screen_size.y - pos.y
+        pos.y = self.target_size[1] - pos.y
 
         if centered:
             pos.x -= text_size[0] / 2
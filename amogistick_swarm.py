@@ -0,0 +1,216 @@
+"""
+amogistick_swarm.py
+19. October 2026
+
+load generator: connects many simulated amogisticks to the game and
+measures how long it takes until pressing the trigger results in a
+shoot feedback (so input lag can be found under load)
+
+Author:
+melektron
+"""
+
+from argparse import ArgumentParser
+from collections import Counter
+import asyncio
+import socket
+import random
+import math
+import time
+
+from amoginarium.communications._amogistick_client import (
+    msg_identify_struct, msg_update_struct, msg_datagram_struct,
+    msg_anim_cmd_struct, AnimCode
+)
+from amoginarium.logic import LatencyHistogram
+
+
+# layer and animation the game uses for shoot feedback
+SHOOT_FEEDBACK = (1, AnimCode.FLASH.value)
+
+
+class FakeStick:
+    """
+    one simulated amogistick
+    """
+
+    def __init__(self, identifier: str, args, total: LatencyHistogram) -> None:
+        self.identifier = identifier
+        self.args = args
+        self._total = total
+
+        self.latency = LatencyHistogram()
+        self.feedback: Counter[tuple[int, int]] = Counter()
+        self.n_sent = 0
+        self.n_lost = 0
+        self.n_presses = 0
+        # released before any shoot feedback (empty magazine, reloading)
+        self.n_unanswered = 0
+        self.connected = False
+
+        # when the trigger was pressed, until the feedback arrived
+        # or the trigger was released
+        self._pressed_at: float | None = None
+
+    async def _read_feedback(self, reader: asyncio.StreamReader) -> None:
+        while True:
+            try:
+                data = await reader.readexactly(msg_anim_cmd_struct.size)
+
+            except (asyncio.IncompleteReadError, ConnectionError):
+                self.connected = False
+                return
+
+            _, layer, anim, *_ = msg_anim_cmd_struct.unpack(data)
+            self.feedback[(layer, anim)] += 1
+
+            if (layer, anim) == SHOOT_FEEDBACK and self._pressed_at is not None:
+                latency = time.perf_counter() - self._pressed_at
+                self.latency.add(latency)
+                self._total.add(latency)
+                self._pressed_at = None
+
+    def _update(self, t: float, trigger: bool) -> bytes:
+        # wander around a bit so the players don't stand still
+        phase = hash(self.identifier) % 100
+        x = int(5e3 + 4e3 * math.sin(t * .7 + phase))
+        y = int(5e3 + 2e3 * math.sin(t * 2.3 + phase))
+        return msg_update_struct.pack(x, y, False, trigger, False, False)
+
+    async def run(self, start: float) -> None:
+        args = self.args
+
+        try:
+            reader, writer = await asyncio.open_connection(args.host, args.port)
+
+        except OSError as e:
+            print(f"{self.identifier}: {e}")
+            return
+
+        self.connected = True
+        writer.write(b"i" + msg_identify_struct.pack(self.identifier.encode()))
+        feedback = asyncio.create_task(self._read_feedback(reader))
+
+        udp: socket.socket = None
+        if args.udp_port is not None:
+            udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            udp.setblocking(False)
+
+        seq = 0
+        trigger = False
+        next_toggle = time.perf_counter() + random.random() * args.press_interval
+
+        try:
+            while self.connected and time.perf_counter() - start < args.duration:
+                now = time.perf_counter()
+
+                # press and release the trigger alternately
+                if now >= next_toggle:
+                    trigger = not trigger
+                    next_toggle = now + args.press_interval / 2
+
+                    if trigger:
+                        self._pressed_at = now
+                        self.n_presses += 1
+
+                    # the game only flashes if it actually shot, so
+                    # waiting longer would count the reload as input lag
+                    elif self._pressed_at is not None:
+                        self._pressed_at = None
+                        self.n_unanswered += 1
+
+                update = self._update(now - start, trigger)
+
+                if udp is None:
+                    writer.write(b"u" + update)
+                    await writer.drain()
+
+                elif random.random() < args.loss:
+                    self.n_lost += 1
+
+                else:
+                    seq = (seq + 1) % 2**32
+                    udp.sendto(b"u" + msg_datagram_struct.pack(
+                        self.identifier.encode(), seq, int(now * 1000) % 2**32
+                    ) + update, (args.host, args.udp_port))
+
+                self.n_sent += 1
+
+                # jitter the send interval like a real (wifi) controller
+                interval = 1 / args.rate + random.uniform(-1, 1) * args.jitter / 1000
+                await asyncio.sleep(max(interval, 0))
+
+        except ConnectionError:
+            self.connected = False
+
+        finally:
+            feedback.cancel()
+            writer.close()
+            if udp is not None:
+                udp.close()
+
+
+def print_report(sticks: list[FakeStick], total: LatencyHistogram, duration: float) -> None:
+    feedback: Counter[tuple[int, int]] = Counter()
+    for stick in sticks:
+        feedback.update(stick.feedback)
+
+    n_sent = sum(stick.n_sent for stick in sticks)
+    print(f"\n{len(sticks)} sticks, {n_sent} updates in {duration:.1f}s ({n_sent / duration:.0f}/s)")
+    print(f"disconnected early: {sum(not stick.connected for stick in sticks)}")
+    print(
+        f"trigger presses: {sum(stick.n_presses for stick in sticks)}, "
+        f"without shoot feedback: {sum(stick.n_unanswered for stick in sticks)}"
+    )
+    print("feedback received: " + ", ".join(
+        f"layer {layer} {AnimCode(anim).name}: {count}"
+        for (layer, anim), count in sorted(feedback.items())
+    ))
+
+    print("\ntrigger -> shoot feedback (ms):")
+    print(f"{'stick':>20} {'n':>5} {'mean':>7} {'jitter':>7} {'p50':>6} {'p99':>6} {'max':>7}")
+    for name, histogram in [*((stick.identifier, stick.latency) for stick in sticks), ("total", total)]:
+        s = histogram.summary()
+        print(f"{name:>20} {s['n']:>5} {s['mean']:>7.1f} {s['jitter']:>7.1f} {s['p50']:>6} {s['p99']:>6} {s['max']:>7.1f}")
+
+
+async def main() -> int:
+    parser = ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("host", nargs="?", default="127.0.0.1")
+    parser.add_argument("-p", "--port", type=int, default=12345, help="TCP port (default: %(default)s)")
+    parser.add_argument("-u", "--udp-port", type=int, default=None, help="send updates via UDP on this port")
+    parser.add_argument("-n", "--sticks", type=int, default=8, help="number of simulated sticks (default: %(default)s)")
+    parser.add_argument("-r", "--rate", type=float, default=100, help="updates per second and stick (default: %(default)s)")
+    parser.add_argument("-j", "--jitter", type=float, default=2, help="max. random change of the send interval in ms (default: %(default)s)")
+    parser.add_argument("-l", "--loss", type=float, default=0, help="fraction of UDP updates that are lost")
+    parser.add_argument("-d", "--duration", type=float, default=20, help="seconds to run (default: %(default)s)")
+    parser.add_argument("--ramp", type=float, default=.1, help="seconds between connecting two sticks (default: %(default)s)")
+    parser.add_argument("--press-interval", type=float, default=1, help="seconds between two trigger presses (default: %(default)s)")
+    parser.add_argument("--prefix", default="swarm", help="identifier prefix (default: %(default)s)")
+    args = parser.parse_args()
+
+    total = LatencyHistogram()
+    sticks = [FakeStick(f"{args.prefix}-{i}", args, total) for i in range(args.sticks)]
+    start = time.perf_counter()
+
+    tasks = []
+    for stick in sticks:
+        tasks.append(asyncio.create_task(stick.run(time.perf_counter())))
+        await asyncio.sleep(args.ramp)
+
+    try:
+        await asyncio.gather(*tasks)
+
+    except asyncio.CancelledError:
+        pass
+
+    print_report(sticks, total, time.perf_counter() - start)
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        exit(asyncio.run(main()))
+
+    except KeyboardInterrupt:
+        pass
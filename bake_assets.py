@@ -0,0 +1,180 @@
+#! venv/bin/python
+"""
+bake_assets.py
+19. October 2026
+
+bakes the asset packs into packs the game can memory-map and upload
+without decoding (prepared texture variants, sounds in the mixers
+sample format)
+
+Author:
+Nilusink
+"""
+from argparse import ArgumentParser
+from time import perf_counter
+import json
+import io
+import os
+
+import pygame as pg
+
+from amoginarium.base._asset_manifest import ASSET_MANIFEST
+from amoginarium.base._textures import textures, mirror_key
+from amoginarium.audio._sounds import sounds, mixer_format, init_mixer
+from amoginarium.debugging import print_ic_style, get_fg_color
+from amoginarium.render_bindings import renderer
+from amoginarium.logic import PackWriter
+
+
+def load_variants(path: str) -> dict[str, set[tuple]]:
+    """
+    variants requested by the game (written by `textures.save_variants`)
+    """
+    if not os.path.isfile(path):
+        print_ic_style(
+            f"{get_fg_color(33)}no variants file at {get_fg_color(36)}"
+            f"\"{path}\"{get_fg_color(247)}, only baking original sizes"
+            f" (run the game once first)"
+        )
+        return {}
+
+    with open(path, "r") as f:
+        variants = json.load(f)
+
+    return {
+        scope: {
+            (name, None if size is None else tuple(size), mirror)
+            for name, size, mirror in scope_variants
+        }
+        for scope, scope_variants in variants.items()
+    }
+
+
+def bake_images(
+        path: str,
+        out: str,
+        variants: dict[str, set[tuple]]
+) -> None:
+    start = perf_counter()
+    scope, images = textures.read_images(path)
+
+    pack = PackWriter(
+        out, "images", scope, path, renderer.__class__.__name__
+    )
+
+    for image in images:
+        pack.add_image(image["name"], image["file"], image["source_hash"])
+
+        # the original size is always baked
+        image_variants = {(None, "")} | {
+            (size, mirror_key(mirror))
+            for name, size, mirror in variants.get(scope, ())
+            if name == image["name"]
+        }
+
+        for size, mirror in image_variants:
+            data, prepared_size = renderer.prepare_texture(
+                image["image"], size, mirror
+            )
+            pack.add_texture(
+                image["name"], size, mirror, data, prepared_size
+            )
+
+    pack.close()
+    print_result("images", scope, len(pack.manifest["textures"]),
+                 pack.length, perf_counter() - start)
+
+
+def bake_sounds(path: str, out: str) -> None:
+    start = perf_counter()
+    scope, files = sounds.read_sounds(path)
+
+    pack = PackWriter(out, "sounds", scope, path, mixer_format())
+
+    for file in files:
+        sound = pg.mixer.Sound(io.BytesIO(file["data"]))
+        pack.add_sound(file["name"], sound.get_raw())
+
+    pack.close()
+    print_result("sounds", scope, len(pack.manifest["sounds"]),
+                 pack.length, perf_counter() - start)
+
+
+def print_result(
+        kind: str,
+        scope: str,
+        n: int,
+        length: int,
+        took: float
+) -> None:
+    print_ic_style(
+        f"baked {kind} {get_fg_color(36)}\"{scope}\"{get_fg_color(247)}"
+        f" ({n}): {get_fg_color(37)}{length / 2**20:.1f}MB"
+        f"{get_fg_color(247)} in {get_fg_color(37)}{took * 1000:.0f}ms"
+    )
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        help="zip files or directories to bake (default: all packs in "
+             "the asset manifest), directories containing sounds are "
+             "baked as sound packs"
+    )
+    parser.add_argument(
+        "-o", "--out",
+        default=textures.pack_dir,
+        help="output directory (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--variants",
+        default=textures.variants_file,
+        help="texture variants requested by the game "
+             "(default: %(default)s)"
+    )
+    parser.add_argument(
+        "--no-audio",
+        action="store_true",
+        help="don't bake sound packs"
+    )
+    args = parser.parse_args()
+
+    # bake from the source files, not from existing packs
+    textures.pack_dir = None
+    textures.cache = None
+    sounds.pack_dir = None
+    textures.debug = sounds.debug = 0
+
+    if args.paths:
+        entries = [
+            (
+                "sounds" if os.path.isdir(p) and any(
+                    f.split(".")[-1].lower() in sounds.filetypes
+                    for f in os.listdir(p)
+                ) else "images",
+                p
+            )
+            for p in args.paths
+        ]
+
+    else:
+        entries = [(e["kind"], e["path"]) for e in ASSET_MANIFEST]
+
+    # same setup as BaseGame, baked sounds must match the mixer
+    if not args.no_audio:
+        init_mixer()
+
+    variants = load_variants(args.variants)
+
+    for kind, path in entries:
+        if kind == "images":
+            bake_images(path, args.out, variants)
+
+        elif not args.no_audio:
+            bake_sounds(path, args.out)
+
+
+if __name__ == "__main__":
+    main()
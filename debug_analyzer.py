@@ -35,6 +35,23 @@ for value in data["total"]:
     comms_ys.append(value[1] * 1000)
 
 
+latency_xs = []
+latency_ys = []
+for value in data["comms"]:
+    latency_xs.append(value[0])
+    latency_ys.append(value[1] * 1000)
+
+# input latency per controller
+for controller, stages in data.get("latency", {}).items():
+    print(f"{controller}:")
+    for stage, summary in stages.items():
+        print(
+            f"  {stage:>9}: {summary['mean']:6.1f}ms mean, "
+            f"{summary['jitter']:5.1f}ms jitter, "
+            f"p99 {summary['p99']}ms (n={summary['n']})"
+        )
+
+
 bullets_xs = []
 n_bullets = []
 bullets_ys = []
@@ -88,6 +105,7 @@ ax2.grid()
 
 ax1.plot(pygame_xs, pygame_ys, label="pygame")
 ax1.plot(logic_xs, logic_ys, label="logic")
+ax1.plot(latency_xs, latency_ys, label="input latency")
 # ax1.plot(comms_xs, comms_ys, label="total")
 
 ax1.set_xlabel("time since start in s")
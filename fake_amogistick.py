@@ -0,0 +1,127 @@
+"""
+fake_amogistick.py
+19. October 2026
+
+pretends to be an amogistick: identifies via TCP, prints the received
+LED commands and sends input updates via TCP or UDP (with simulated
+packet loss, jitter and reordering)
+
+Author:
+melektron
+"""
+
+from argparse import ArgumentParser
+import asyncio
+import socket
+import random
+import math
+import time
+
+from amoginarium.communications._amogistick_client import (
+    msg_identify_struct, msg_update_struct, msg_datagram_struct,
+    msg_anim_cmd_struct, AnimCode
+)
+
+
+def update_values(t: float) -> tuple[int, int, bool, bool, bool, bool]:
+    """
+    walk left and right, jump and shoot every now and then
+    """
+    x = int(5e3 + 5e3 * math.sin(t * 1.5))
+    y = int(5e3 + 2e3 * math.sin(t * 4))
+    return x, y, False, math.sin(t * 3) > .5, False, False
+
+
+async def read_feedback(reader: asyncio.StreamReader) -> None:
+    while True:
+        try:
+            data = await reader.readexactly(msg_anim_cmd_struct.size)
+
+        except asyncio.IncompleteReadError:
+            print("server closed the connection")
+            return
+
+        m, layer, anim, *colors, prim_period, sec_period, keep = msg_anim_cmd_struct.unpack(data)
+        print(f"led layer {layer}: {AnimCode(anim).name} {tuple(colors[:3])} {prim_period}ms keep={keep}")
+
+
+async def send_datagram(sock: socket.socket, address: tuple[str, int], data: bytes, delay: float) -> None:
+    if delay > 0:
+        await asyncio.sleep(delay)
+
+    sock.sendto(data, address)
+
+
+async def main() -> int:
+    parser = ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("host", nargs="?", default="127.0.0.1")
+    parser.add_argument("-p", "--port", type=int, default=12345, help="TCP port (default: %(default)s)")
+    parser.add_argument("-u", "--udp-port", type=int, default=None, help="send updates via UDP on this port")
+    parser.add_argument("-i", "--id", default="fake-amogistick", help="controller identifier (max. 20 bytes)")
+    parser.add_argument("-r", "--rate", type=float, default=100, help="updates per second (default: %(default)s)")
+    parser.add_argument("-l", "--loss", type=float, default=0, help="fraction of UDP updates that are lost")
+    parser.add_argument("-j", "--jitter", type=float, default=0, help="max. random UDP delay in ms (reorders packets)")
+    parser.add_argument("-d", "--duration", type=float, default=None, help="stop after this many seconds")
+    args = parser.parse_args()
+
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    writer.write(b"i" + msg_identify_struct.pack(args.id.encode()))
+    await writer.drain()
+    feedback = asyncio.create_task(read_feedback(reader))
+
+    udp: socket.socket = None
+    if args.udp_port is not None:
+        udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        udp.setblocking(False)
+
+    start = time.perf_counter()
+    seq = 0
+    sent = lost = 0
+    pending: set[asyncio.Task] = set()
+
+    try:
+        while not feedback.done():
+            now = time.perf_counter()
+            if args.duration is not None and now - start > args.duration:
+                break
+
+            update = msg_update_struct.pack(*update_values(now - start))
+
+            if udp is None:
+                writer.write(b"u" + update)
+                await writer.drain()
+
+            else:
+                seq = (seq + 1) % 2**32
+                data = b"u" + msg_datagram_struct.pack(
+                    args.id.encode(), seq, int(now * 1000) % 2**32
+                ) + update
+
+                if random.random() < args.loss:
+                    lost += 1
+
+                else:
+                    task = asyncio.create_task(send_datagram(
+                        udp, (args.host, args.udp_port), data, random.random() * args.jitter / 1000
+                    ))
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+
+            sent += 1
+            await asyncio.sleep(1 / args.rate)
+
+    except KeyboardInterrupt:
+        pass
+
+    finally:
+        print(f"sent {sent} updates ({lost} lost)")
+        feedback.cancel()
+        writer.close()
+        if udp is not None:
+            udp.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(asyncio.run(main()))
@@ -0,0 +1,236 @@
+"""
+spectator.py
+19. October 2026
+
+shows a running game on a second screen using the snapshots the game
+streams when started with `spectator_port`, with --headless only the
+stream statistics are printed
+
+Author:
+melektron
+"""
+
+from argparse import ArgumentParser
+import pygame as pg
+import socket
+import time
+
+from amoginarium.communications._spectator import (
+    msg_hello_struct, msg_ack_struct, msg_snapshot_struct, removed_struct,
+    decode_entity, entity_state_t, ENTITY_TYPES, KEYFRAME
+)
+
+
+# color, radius (world units)
+STYLES: dict[str, tuple[tuple[int, int, int], float]] = {
+    "Entity": ((200, 200, 200), 10),
+    "Player": ((80, 120, 255), 25),
+    "Bullet": ((255, 220, 80), 3),
+    "Island": ((120, 90, 60), 40),
+}
+TURRET_STYLE = ((255, 80, 80), 20)
+
+
+class SpectatorView:
+    """
+    rebuilds the world from delta snapshots
+    """
+    # states kept to apply deltas to (more than the game keeps)
+    history = 64
+    # request a keyframe after this many snapshots with an unknown base
+    resync_after = 10
+
+    def __init__(self) -> None:
+        self._states: dict[int, dict[int, entity_state_t]] = {}
+        self.tick = -1
+        self.camera = (0.0, 0.0, 1920.0, 1080.0)
+
+        self.n_snapshots = 0
+        self.n_keyframes = 0
+        self.n_skipped = 0  # late or base unknown
+        self.n_resets = 0
+        self.n_resyncs = 0
+        # snapshots in a row whose base was unknown
+        self._unknown_base = 0
+        self.bytes_received = 0
+
+    @property
+    def entities(self) -> dict[int, entity_state_t]:
+        return self._states.get(self.tick, {})
+
+    @property
+    def needs_keyframe(self) -> bool:
+        """
+        true if a keyframe should be requested (b"k"), resets itself
+        """
+        if self._unknown_base < self.resync_after:
+            return False
+
+        self._unknown_base = 0
+        self.n_resyncs += 1
+        return True
+
+    def apply(self, data: bytes) -> int | None:
+        """
+        :returns: the snapshots tick (to acknowledge) or None if skipped
+        """
+        self.bytes_received += len(data)
+        tick, base_tick, *camera, n_updates, n_removed = msg_snapshot_struct.unpack_from(data, 1)
+
+        # the game restarted its stream (ticks start at 1 again)
+        if base_tick == KEYFRAME and tick < self.tick:
+            self._states.clear()
+            self.tick = -1
+            self.n_resets += 1
+
+        if tick <= self.tick:
+            self.n_skipped += 1
+            return None
+
+        if base_tick == KEYFRAME:
+            base = {}
+            self.n_keyframes += 1
+
+        elif base_tick in self._states:
+            base = self._states[base_tick]
+
+        else:
+            self.n_skipped += 1
+            self._unknown_base += 1
+            return None
+
+        self._unknown_base = 0
+        state = dict(base)
+        offset = 1 + msg_snapshot_struct.size
+
+        for _ in range(n_updates):
+            entity_id, entity, offset = decode_entity(data, offset, base)
+            state[entity_id] = entity
+
+        for _ in range(n_removed):
+            state.pop(removed_struct.unpack_from(data, offset)[0], None)
+            offset += removed_struct.size
+
+        self._states[tick] = state
+        self.tick = tick
+        self.camera = tuple(camera)
+        self.n_snapshots += 1
+
+        for old in [t for t in self._states if t <= tick - self.history]:
+            del self._states[old]
+
+        return tick
+
+
+def draw(surface: pg.Surface, font: pg.font.Font, view: SpectatorView) -> None:
+    surface.fill((20, 20, 30))
+    cam_x, cam_y, cam_w, cam_h = view.camera
+    scale = surface.get_width() / cam_w
+
+    for entity_type, (x, y), (vx, vy), hp, facing in view.entities.values():
+        name = ENTITY_TYPES[entity_type] if entity_type < len(ENTITY_TYPES) else "Entity"
+        color, radius = STYLES.get(name, TURRET_STYLE if name.endswith("Turret") else STYLES["Entity"])
+
+        sx, sy = (x - cam_x) * scale, (y - cam_y) * scale
+        pg.draw.circle(surface, color, (sx, sy), max(radius * scale, 1))
+
+        if name == "Player":
+            pg.draw.line(surface, color, (sx, sy), (sx + facing * radius * 1.5 * scale, sy), 2)
+
+        if hp > 0:
+            surface.blit(font.render(str(hp), True, (230, 230, 230)), (sx - 8, sy - radius * scale - 16))
+
+    surface.blit(font.render(
+        f"tick {view.tick}  {len(view.entities)} entities", True, (230, 230, 230)
+    ), (8, 8))
+
+
+def main() -> int:
+    parser = ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("port", type=int, help="spectator port of the game")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--size", default="960x540", help="window size (default: %(default)s)")
+    parser.add_argument("--all", action="store_true", help="receive every entity, not only the ones in the games view")
+    parser.add_argument("--headless", action="store_true", help="don't open a window, only print statistics")
+    parser.add_argument("-d", "--duration", type=float, default=None, help="stop after this many seconds")
+    args = parser.parse_args()
+
+    address = (args.host, args.port)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setblocking(False)
+    sock.bind((args.host, 0))
+
+    # w < 0: everything, w == 0: same view as the game
+    hello = b"h" + msg_hello_struct.pack(0, 0, -1 if args.all else 0, 0)
+
+    surface = font = clock = None
+    if not args.headless:
+        pg.init()
+        surface = pg.display.set_mode(tuple(int(v) for v in args.size.split("x")))
+        pg.display.set_caption("amoginarium spectator")
+        font = pg.font.SysFont(None, 20)
+        clock = pg.time.Clock()
+
+    view = SpectatorView()
+    start = last_hello = last_print = time.perf_counter()
+    last_bytes = last_snapshots = 0
+    sock.sendto(hello, address)
+
+    try:
+        while args.duration is None or time.perf_counter() - start < args.duration:
+            now = time.perf_counter()
+
+            # also keeps the subscription alive
+            if now - last_hello > 1:
+                sock.sendto(hello, address)
+                last_hello = now
+
+            while True:
+                try:
+                    data = sock.recv(65536)
+
+                except (BlockingIOError, ConnectionError):
+                    break
+
+                if data[:1] != b"s":
+                    continue
+
+                tick = view.apply(data)
+                if tick is not None:
+                    sock.sendto(b"a" + msg_ack_struct.pack(tick), address)
+
+                elif view.needs_keyframe:
+                    sock.sendto(b"k", address)
+
+            if args.headless:
+                if now - last_print > 1:
+                    print(
+                        f"tick {view.tick}: {len(view.entities)} entities, "
+                        f"{(view.n_snapshots - last_snapshots) / (now - last_print):.0f} snapshots/s, "
+                        f"{(view.bytes_received - last_bytes) / (now - last_print) / 1000:.1f}kB/s, "
+                        f"{view.n_keyframes} keyframes, {view.n_skipped} skipped, "
+                        f"{view.n_resets} resets, {view.n_resyncs} resyncs"
+                    )
+                    last_print, last_bytes, last_snapshots = now, view.bytes_received, view.n_snapshots
+
+                time.sleep(.002)
+                continue
+
+            if any(event.type == pg.QUIT for event in pg.event.get()):
+                break
+
+            draw(surface, font, view)
+            pg.display.flip()
+            clock.tick(60)
+
+    except KeyboardInterrupt:
+        pass
+
+    finally:
+        sock.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())